@@ -0,0 +1,80 @@
+"""Throughput benchmark for job relevance scoring.
+
+Scores synthetic postings (titles plus a short description) against a profile
+and prints postings per second and the score spread.
+
+Usage:
+    python benchmarks/bench_job_scorer.py [--metadata PATH] [--postings N]
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.config.settings import settings
+from src.core.job_scorer import JobScorer
+
+SENIORITY = ["", "Junior", "Senior", "Lead", "Principal", "Head of", "VP of"]
+ROLES = [
+    "Product Manager",
+    "Product Owner",
+    "Software Engineer",
+    "Data Analyst",
+    "Account Executive",
+    "Registered Nurse",
+    "Warehouse Associate",
+    "Marketing Manager",
+    "UX Designer",
+    "Customer Success Manager",
+]
+TOPICS = ["SaaS", "e-commerce", "healthcare", "logistics", "fintech", "SQL", "APIs"]
+
+
+def synthetic_postings(n, seed):
+    rng = random.Random(seed)
+    titles = [f"{rng.choice(SENIORITY)} {rng.choice(ROLES)}".strip() for _ in range(n)]
+    descriptions = [
+        f"Join our {rng.choice(TOPICS)} team working with {', '.join(rng.sample(TOPICS, 3))}"
+        for _ in range(n)
+    ]
+    return titles, descriptions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--metadata", type=Path, default=settings.USER_METADATA_PATH)
+    parser.add_argument("--postings", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.metadata) as f:
+        scorer = JobScorer(json.load(f))
+    titles, descriptions = synthetic_postings(args.postings, args.seed)
+
+    start = time.perf_counter()
+    scores = scorer.score(titles, descriptions)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {len(scores)} postings in {elapsed * 1000:.1f} ms")
+    print(f"Throughput: {len(scores) / elapsed:,.0f} postings/s")
+    for q in (0.5, 0.9, 0.99):
+        print(f"p{int(q * 100):<3} score: {np.quantile(scores, q):.3f}")
+    passing = (scores >= settings.JOB_MIN_SCORE).mean()
+    print(f"Passing JOB_MIN_SCORE={settings.JOB_MIN_SCORE}: {passing:.1%}")
+
+    best = np.argsort(scores)[::-1][:5]
+    print("Best matches:")
+    for index in best:
+        print(f"  {scores[index]:.3f}  {titles[index]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Tail latency benchmark for AI field mapping with and without hedging.
+
+Maps synthetic forms through a local LLM stub that answers most requests
+quickly but a share of them slowly, and prints latency percentiles with
+hedged requests off and on.
+
+Usage:
+    python benchmarks/bench_llm_hedging.py [--requests N] [--tail-rate R]
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from src.utils.ai_helper import AIFieldMapper
+from src.utils.llm_backends import LLMBackend, LLMRouter
+from src.utils.llm_stub import StubBehavior, StubServer
+
+METADATA = {"first_name": "John", "last_name": "Doe", "skills": ["SQL", "Python"]}
+
+
+def synthetic_form(index):
+    return [
+        {"name": f"question_{index}_{n}", "label": f"Question {n}", "type": "text"}
+        for n in range(5)
+    ]
+
+
+async def run(router, requests, concurrency):
+    mapper = AIFieldMapper(namespace="bench", router=router)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    answered = 0
+
+    async def one(index):
+        nonlocal answered
+        async with semaphore:
+            start = time.perf_counter()
+            result = await mapper._request_mapping(METADATA, synthetic_form(index))
+            latencies.append(time.perf_counter() - start)
+            answered += bool(result.get("mapped_fields"))
+
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return np.array(latencies), answered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--tail-ms", type=int, default=1000)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    behavior = StubBehavior(
+        latency=args.latency_ms / 1000,
+        tail_latency=args.tail_ms / 1000,
+        tail_rate=args.tail_rate,
+    )
+    # Keep the stub's request log out of the results
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    with StubServer(behavior) as server:
+        for label, quantile in (("no hedging", 0.0), ("hedged at p90", 0.9)):
+            backend = LLMBackend("stub", "stub", server.base_url, timeout=30)
+            router = LLMRouter([backend], hedge_quantile=quantile, hedge_min_samples=20)
+            latencies, answered = asyncio.run(
+                run(router, args.requests, args.concurrency)
+            )
+            percentiles = "  ".join(
+                f"p{q}: {np.percentile(latencies, q) * 1000:6.0f} ms"
+                for q in (50, 90, 99)
+            )
+            print(f"{label:<14} {percentiles}  answered: {answered}/{args.requests}")
+
+
+if __name__ == "__main__":
+    main()
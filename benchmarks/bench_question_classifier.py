@@ -0,0 +1,82 @@
+"""Accuracy and latency benchmark for the local question classifier.
+
+Usage:
+    python benchmarks/bench_question_classifier.py [--history PATH]
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from src.config.settings import settings
+from src.utils.question_classifier import (
+    QuestionClassifier,
+    load_history,
+    seed_examples,
+)
+
+
+def split_examples(examples, test_ratio, seed):
+    """Split examples into train and test sets, stratified by category."""
+    by_category = defaultdict(list)
+    for example in examples:
+        by_category[example[1]].append(example)
+
+    rng = random.Random(seed)
+    train, test = [], []
+    for category_examples in by_category.values():
+        rng.shuffle(category_examples)
+        n_test = max(1, int(len(category_examples) * test_ratio))
+        test.extend(category_examples[:n_test])
+        train.extend(category_examples[n_test:])
+    return train, test
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=Path, default=settings.QUESTION_HISTORY_PATH)
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    examples = seed_examples() + load_history(args.history)
+    train, test = split_examples(examples, args.test_ratio, args.seed)
+
+    start = time.perf_counter()
+    classifier = QuestionClassifier.train(train)
+    train_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "question_classifier.npy"
+        classifier.save(path)
+        start = time.perf_counter()
+        classifier = QuestionClassifier.load(path)
+        load_time = time.perf_counter() - start
+
+        latencies = []
+        correct = 0
+        for question, category in test:
+            start = time.perf_counter()
+            predicted, _ = classifier.predict(question)
+            latencies.append(time.perf_counter() - start)
+            correct += predicted == category
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(0.95 * (len(latencies_ms) - 1))]
+    print(f"examples:  {len(train)} train / {len(test)} test")
+    print(f"accuracy:  {correct / len(test):.3f}")
+    print(f"train:     {train_time * 1000:.1f} ms")
+    print(f"load:      {load_time * 1000:.2f} ms (memory-mapped)")
+    print(f"predict:   mean {statistics.mean(latencies_ms):.3f} ms, p95 {p95:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Startup time benchmark for the command line and web interface entry points.
+
+Each target is run in a fresh interpreter, without API keys, so the numbers
+include every import and configuration step paid before any real work.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Heavy dependencies that should only load when actually used
+HEAVY_MODULES = ["openai", "twocaptcha", "playwright", "tenacity", "numpy"]
+
+TARGETS = {
+    "cli --help": ["main.py", "--help"],
+    "import main": ["-c", "import main"],
+    "import ui": ["-c", "import src.ui.app"],
+    "import application_manager": [
+        "-c",
+        "import src.core.application_manager",
+    ],
+}
+
+PROBE = "import sys, {module}; print(*(m for m in {heavy!r} if m in sys.modules))"
+
+
+def time_run(args, env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def loaded_heavy_modules(module, env):
+    probe = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    return subprocess.run(
+        [sys.executable, "-c", probe],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = {**os.environ, "OPENAI_API_KEY": "", "TWOCAPTCHA_API_KEY": ""}
+    # Warm the filesystem and bytecode caches
+    time_run(["-c", "import main, src.ui.app"], env)
+
+    for name, target in TARGETS.items():
+        timings_ms = [time_run(target, env) * 1000 for _ in range(args.runs)]
+        print(
+            f"{name:<28} median {statistics.median(timings_ms):7.1f} ms, "
+            f"min {min(timings_ms):7.1f} ms"
+        )
+
+    for module in ["main", "src.ui.app", "src.core.application_manager"]:
+        heavy = loaded_heavy_modules(module, env)
+        print(f"{module + ' loads:':<37} {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,146 +1,42 @@
 import argparse
-import json
 import asyncio
-from pathlib import Path
-from typing import Optional, Dict, Any
-from src.core.browser_manager import BrowserManager
-from src.core.form_handler import FormHandler
-from src.core.captcha_solver import CaptchaSolver
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    Union,
+)
+from src.core.profile_store import get_profile_directory
 from src.config.settings import settings
 from src.utils.logger import get_logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+if TYPE_CHECKING:
+    from src.core.batch_runner import BatchJob, BatchResult
 
 logger = get_logger(__name__)
 
 
-class JobApplicationManager:
-    """Manages the job application process."""
-
-    def __init__(
-        self,
-        job_url: str,
-        metadata_path: str,
-    ):
-        self.job_url = job_url
-        self.metadata_path = metadata_path
-        self.user_metadata: Optional[Dict[str, Any]] = None
-        self.browser_manager: Optional[BrowserManager] = None
-        self.captcha_solver: Optional[CaptchaSolver] = None
-        self.form_handler: Optional[FormHandler] = None
-
-    async def load_metadata(self):
-        """Load user metadata from JSON file."""
-        try:
-            with open(self.metadata_path, "r") as f:
-                self.user_metadata = json.load(f)
-            await self.custom_metadata_processing()
-            logger.info(f"Loaded metadata from {self.metadata_path}")
-        except Exception as e:
-            logger.error(f"Failed to load metadata: {str(e)}")
-            raise
-
-    async def custom_metadata_processing(self):
-        """Custom metadata processing."""
-        first_name, last_name = self.user_metadata["name"].split(" ")
-        self.user_metadata["first_name"] = first_name
-        self.user_metadata["last_name"] = last_name
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
-    async def apply_to_job(self) -> bool:
-        """
-        Apply to a job using the provided metadata.
-
-        Returns:
-            bool: True if application was successful, False otherwise
-        """
-        try:
-            # Load user metadata
-            await self.load_metadata()
-
-            # Initialize components
-            self.browser_manager = BrowserManager()
-            self.captcha_solver = CaptchaSolver()
-
-            # Use async context manager for browser
-            async with self.browser_manager:
-                page = None
-                try:
-                    # Create new page with better error handling
-                    logger.debug("Attempting to create new page...")
-                    page = await self.browser_manager.new_page()
-
-                    if not page:
-                        raise RuntimeError("Failed to create new page: page is None")
-
-                    # Add a small delay to ensure page is ready
-                    await asyncio.sleep(1)
-
-                    # Navigate to job page
-                    logger.info(f"Navigating to {self.job_url}")
-                    await self.browser_manager.goto_page(self.job_url, page)
-
-                    # Accept cookies
-                    await self.browser_manager.accept_cookies(page)
-
-                    # Handle captcha
-                    await self.browser_manager.handle_captcha(page)
-
-                    # Fill and submit form
-                    self.form_handler = FormHandler(page, self.user_metadata)
-                    await self.form_handler.detect_and_fill_form()
-                    success = await self.form_handler.submit_form()
-
-                    if success:
-                        logger.info("Application submitted successfully")
-                        return True
-                    else:
-                        logger.warning("Application submission may have failed")
-                        return False
-
-                except Exception as e:
-                    logger.error(f"Error during application process: {str(e)}")
-                    if page:
-                        try:
-                            await page.close()
-                        except Exception as page_error:
-                            logger.warning(f"Failed to close page: {str(page_error)}")
-                    raise
-
-        except Exception as e:
-            logger.error(f"Application failed: {str(e)}")
-            raise
-
-    def get_application_stats(self) -> Dict[str, Any]:
-        """Get statistics about the application process."""
-        stats = {
-            "captcha_solved": (
-                self.captcha_solver.solution_count if self.captcha_solver else 0
-            ),
-            "captcha_failed": (
-                self.captcha_solver.failed_count if self.captcha_solver else 0
-            ),
-            "captcha_success_rate": (
-                self.captcha_solver.success_rate if self.captcha_solver else 0.0
-            ),
-            "pages_opened": (
-                self.browser_manager.page_count if self.browser_manager else 0
-            ),
-        }
-        return stats
-
-
-async def main(job_url: str, metadata_path: str):
+async def main(
+    job_url: str,
+    metadata_path: str,
+    profile_id: str = "default",
+    dry_run: bool = False,
+):
     """Main entry point for the application."""
+    # Imported here so argument errors and --help don't load the browser stack
+    from src.core.application_manager import JobApplicationManager
+
     try:
         # Validate settings
-        settings.validate()
+        settings.validate(require_services=not dry_run, metadata_paths=[metadata_path])
 
         # Create application manager
-        app_manager = JobApplicationManager(job_url, metadata_path)
+        app_manager = JobApplicationManager(
+            job_url, metadata_path, profile_id=profile_id, dry_run=dry_run
+        )
 
         # Run the application
         success = await app_manager.apply_to_job()
@@ -157,24 +53,143 @@ async def main(job_url: str, metadata_path: str):
         logger.error(f"Application process failed: {str(e)}")
         raise
 
+    finally:
+        from src.utils.llm_backends import close_llm_clients
+
+        await close_llm_clients()
+
+
+async def run_batch(
+    jobs: Union[Iterable["BatchJob"], AsyncIterable["BatchJob"]],
+    concurrency: Optional[int] = None,
+    dry_run: bool = False,
+    min_score: Optional[float] = None,
+    profile_ids: Optional[Iterable[str]] = None,
+    on_result: Optional[Callable[["BatchResult"], Awaitable[None]]] = None,
+) -> bool:
+    """Apply to several jobs, possibly for several profiles, over one browser.
+    Jobs may be an async iterable, such as a crawl still in progress, in
+    which case the profiles it applies for are given as profile_ids.
+    on_result is awaited with each result as its application finishes."""
+    from src.core.batch_runner import BatchRunner
+
+    if profile_ids is None and isinstance(jobs, (list, tuple)):
+        profile_ids = {job.profile_id for job in jobs}
+    profiles = get_profile_directory()
+    settings.validate(
+        require_services=not dry_run,
+        metadata_paths=[profiles.path_for(pid) for pid in set(profile_ids or [])],
+    )
+    from src.utils.llm_backends import close_llm_clients
+
+    try:
+        results = await BatchRunner(
+            concurrency, dry_run=dry_run, min_score=min_score, on_result=on_result
+        ).run(jobs)
+    finally:
+        await close_llm_clients()
+    for result in results:
+        status = "succeeded" if result.success else "failed"
+        logger.info(f"[{result.profile_id}] {result.job_url}: {status}")
+    return bool(results) and all(result.success for result in results)
+
 
 def cli():
     """Command line interface."""
     parser = argparse.ArgumentParser(description="Apply to jobs on Workable.com")
-    parser.add_argument("--job-url", required=True, help="URL of the job posting")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--job-url", help="URL of the job posting")
+    target.add_argument(
+        "--jobs-file",
+        help="File with one job URL per line, optionally followed by a profile ID",
+    )
+    target.add_argument(
+        "--crawl",
+        action="append",
+        metavar="SOURCE",
+        help="Apply to new postings of a company board (apply.workable.com/<company> "
+        "or the company slug) or job search (jobs.workable.com/search?query=...) "
+        "as they are found; repeat for several sources",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile ID from the profile directory index (default: its default profile)",
+    )
     parser.add_argument(
         "--metadata-path",
-        default=settings.USER_METADATA_PATH,
-        help="Path to user metadata JSON file",
+        help="Path to user metadata JSON file (overrides --profile)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Applications run at once with --jobs-file or --crawl",
+    )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        help="Skip jobs of --jobs-file or --crawl scoring below this relevance "
+        "to the profile, 0 to 1 (default: JOB_MIN_SCORE, 0 skips none)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Fill forms without submitting, with offline stand-ins for the "
+        "OpenAI and 2Captcha services (no API keys needed)",
     )
 
     args = parser.parse_args()
-
+    if args.metadata_path and not args.job_url:
+        parser.error("--metadata-path only applies to --job-url")
+
+    profiles = get_profile_directory()
+    profile_id = args.profile or profiles.default_id()
+
+    def check_profiles(profile_ids):
+        for pid in set(profile_ids):
+            try:
+                profiles.path_for(pid)
+            except KeyError as e:
+                parser.error(e.args[0])
+
+    if not args.metadata_path:
+        check_profiles([profile_id])
+
+    if args.jobs_file:
+        from src.core.batch_runner import load_jobs_file
+
+        logger.info(f"Jobs File: {args.jobs_file}")
+        jobs = load_jobs_file(args.jobs_file, profile_id)
+        check_profiles(job.profile_id for job in jobs)
+        success = asyncio.run(
+            run_batch(jobs, args.concurrency, args.dry_run, args.min_score)
+        )
+        exit(0 if success else 1)
+
+    if args.crawl:
+        from src.core.job_crawler import CrawlSource, JobCrawler
+
+        sources = [CrawlSource.parse(source, profile_id) for source in args.crawl]
+        logger.info(f"Crawling: {', '.join(str(source) for source in sources)}")
+        crawler = JobCrawler(record=not args.dry_run)
+        success = asyncio.run(
+            run_batch(
+                crawler.crawl(sources),
+                args.concurrency,
+                args.dry_run,
+                args.min_score,
+                profile_ids=[source.profile_id for source in sources],
+                on_result=crawler.record_result,
+            )
+        )
+        exit(0 if success else 1)
+
+    metadata_path = args.metadata_path or str(profiles.path_for(profile_id))
     logger.info(f"Job URL: {args.job_url}")
-    logger.info(f"Metadata Path: {args.metadata_path}")
+    logger.info(f"Profile: {profile_id}")
+    logger.info(f"Metadata Path: {metadata_path}")
 
     # Run the application
-    success = asyncio.run(main(args.job_url, args.metadata_path))
+    success = asyncio.run(main(args.job_url, metadata_path, profile_id, args.dry_run))
 
     # Exit with appropriate status code
     exit(0 if success else 1)
@@ -192,10 +207,9 @@ def cli_test(job_url: Optional[str] = None, metadata_path: Optional[str] = None)
 
 
 if __name__ == "__main__":
-    # cli()
+    cli()
 
     # --------- Testing
-    # job_url = "https://jobs.workable.com/view/7ZLabkcPX4G2m9SBesq7Yd/hybrid-customer-success-and-product-manager-(1099-contract%2C-triive)-in-bentonville-at-high-alpha-innovation"
-    job_url = "https://jobs.workable.com/view/beZTS1rb1b4EyK4Sf8jHUk/software-engineer-intern-in-phoenix-at-prepass%2C-llc"
-    metadata_path = "data/user_metadata.json"
-    cli_test(job_url, metadata_path)
+    # job_url = "https://jobs.workable.com/view/beZTS1rb1b4EyK4Sf8jHUk/software-engineer-intern-in-phoenix-at-prepass%2C-llc"
+    # metadata_path = "data/user_metadata.json"
+    # cli_test(job_url, metadata_path)
@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import copy
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, nullcontext
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Optional,
+    Dict,
+    Any,
+    AsyncContextManager,
+    Set,
+    Tuple,
+)
+from src.core.browser_manager import BrowserManager
+from src.core.form_handler import FormHandler, SubmissionUncertainError
+from src.core.captcha_handler import CaptchaHandler
+from src.core.captcha_solver import CaptchaSolver
+from src.core.dry_run import DryRunCaptchaSolver, DryRunFieldMapper
+from src.core.pipeline import PipelineStages
+from src.core.resume_manager import get_resume_manager
+from src.core.profile_store import get_profile_store
+from src.core.proxy_pool import get_proxy_pool
+from src.core.result_store import ApplicationResult, get_result_store, parse_job_url
+from src.utils.ai_helper import track_token_usage
+from src.utils.logger import get_logger
+from src.utils.metrics import Meter, metrics
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+logger = get_logger(__name__)
+
+_in_flight = metrics.gauge(
+    "applications_in_flight", "Job applications currently being processed"
+)
+_attempts = metrics.counter(
+    "application_attempts_total", "Job application attempts by result"
+)
+_phase_seconds = metrics.histogram(
+    "application_phase_seconds", "Duration of each job application phase"
+)
+_completions = Meter(window=60.0)
+
+# Processed profiles by file and version, dropped when the profile changes
+_processed_profiles: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+_watched_profiles: Set[Path] = set()
+metrics.register_collector(
+    lambda: {
+        "applications_completed_per_minute": (
+            "Job applications submitted successfully in the last minute",
+            _completions.rate(),
+        )
+    }
+)
+
+
+class JobApplicationManager:
+    """Manages the job application process."""
+
+    def __init__(
+        self,
+        job_url: str,
+        metadata_path: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        profile_id: str = "default",
+        browser_manager: Optional[BrowserManager] = None,
+        dry_run: bool = False,
+        application_id: Optional[str] = None,
+        stages: Optional[PipelineStages] = None,
+    ):
+        # Correlation ID attached to every log record of this application
+        self.application_id = application_id or uuid.uuid4().hex[:12]
+        self.job_url = job_url
+        self.metadata_path = metadata_path
+        self.on_progress = on_progress
+        self.profile_id = profile_id
+        # A started browser shared with other applications, if any
+        self.shared_browser = browser_manager
+        # Fill the form with offline stand-ins for AI and captcha services,
+        # without submitting it
+        self.dry_run = dry_run
+        # Stage limits shared with the other applications of a pipelined
+        # batch; the form is then prepared ahead and filled when a slot frees
+        self.stages = stages
+        self.user_metadata: Optional[Dict[str, Any]] = None
+        self.browser_manager: Optional[BrowserManager] = None
+        self.captcha_solver: Optional[CaptchaSolver] = None
+        self.form_handler: Optional[FormHandler] = None
+        self.phase_durations: Dict[str, float] = {}
+        # Result of the last attempt: success, failure, error or dry_run
+        self.outcome: Optional[str] = None
+        self._phase: Optional[str] = None
+        self._phase_started = 0.0
+
+    async def load_metadata(self):
+        """Load user metadata, reusing the processed profile until it changes."""
+        try:
+            store = get_profile_store(self.metadata_path)
+            if not store.path.exists():
+                raise FileNotFoundError(f"User metadata file not found at {store.path}")
+
+            version, metadata = store.snapshot()
+            cached = _processed_profiles.get(store.path)
+            if cached and cached[0] == version:
+                self.user_metadata = copy.deepcopy(cached[1])
+                logger.debug(f"Reusing processed profile version {version}")
+                return
+
+            if store.path not in _watched_profiles:
+                _watched_profiles.add(store.path)
+                store.subscribe(
+                    lambda version, data: _processed_profiles.pop(store.path, None)
+                )
+            self.user_metadata = metadata
+            await self.custom_metadata_processing()
+            _processed_profiles[store.path] = (
+                version,
+                copy.deepcopy(self.user_metadata),
+            )
+            logger.info(f"Loaded metadata from {self.metadata_path}")
+        except Exception as e:
+            logger.error(f"Failed to load metadata: {str(e)}")
+            raise
+
+    async def custom_metadata_processing(self):
+        """Custom metadata processing."""
+        first_name, last_name = self.user_metadata["name"].split(" ")
+        self.user_metadata["first_name"] = first_name
+        self.user_metadata["last_name"] = last_name
+
+    async def apply_to_job(self) -> bool:
+        """
+        Apply to a job using the provided metadata.
+
+        Returns:
+            bool: True if application was successful, False otherwise
+        """
+        with logger.contextualize(
+            application_id=self.application_id, profile_id=self.profile_id
+        ):
+            usage = track_token_usage()
+            started_at = time.time()
+            error = None
+            try:
+                return await self._attempt_application()
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                await self._store_result(started_at, usage, error)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        # A submitted application is never started over
+        retry=retry_if_not_exception_type(SubmissionUncertainError),
+        reraise=True,
+    )
+    async def _attempt_application(self) -> bool:
+        _in_flight.inc()
+        result = "error"
+        try:
+            # Load user metadata
+            self._report_progress("loading_metadata")
+            await self.load_metadata()
+
+            # Initialize components
+            self.browser_manager = self.shared_browser or BrowserManager(
+                proxy_pool=get_proxy_pool()
+            )
+            self.captcha_solver = (
+                DryRunCaptchaSolver() if self.dry_run else CaptchaSolver()
+            )
+            captcha_handler = CaptchaHandler(self.captcha_solver)
+
+            # Use async context manager for browser
+            self._report_progress("starting_browser")
+            async with self._browser_session() as context:
+                page = None
+                try:
+                    # Create new page with better error handling
+                    logger.debug("Attempting to create new page...")
+                    page = await self.browser_manager.new_page(context)
+
+                    if not page:
+                        raise RuntimeError("Failed to create new page: page is None")
+
+                    # Add a small delay to ensure page is ready
+                    await asyncio.sleep(1)
+
+                    async with self._stage("prepare"):
+                        # Navigate to job page
+                        self._report_progress("navigating")
+                        logger.info(f"Navigating to {self.job_url}")
+                        await self.browser_manager.goto_page(self.job_url, page)
+
+                        # Accept cookies
+                        await self.browser_manager.accept_cookies(page)
+
+                        # Handle captcha
+                        self._report_progress("solving_captcha")
+                        await self.browser_manager.handle_captcha(page, captcha_handler)
+
+                        # Extract the form's fields and work out their answers
+                        self._report_progress("preparing_form")
+                        self.form_handler = FormHandler(
+                            page,
+                            self.user_metadata,
+                            self.profile_id,
+                            (
+                                DryRunFieldMapper(self.profile_id)
+                                if self.dry_run
+                                else None
+                            ),
+                            captcha_handler,
+                        )
+                        await self.form_handler.prepare_form(
+                            hold=self.stages is not None
+                        )
+
+                    async with self._stage("fill"):
+                        self._report_progress("filling_form")
+                        await self.form_handler.fill_form()
+                    if self.dry_run:
+                        result = "dry_run"
+                        logger.info("Dry run: form filled, not submitting")
+                        return True
+
+                    async with self._stage("submit"):
+                        self._report_progress("submitting")
+                        success = await self.form_handler.submit_form()
+
+                    if success:
+                        result = "success"
+                        logger.info("Application submitted successfully")
+                        return True
+                    else:
+                        result = "failure"
+                        logger.warning("Application submission may have failed")
+                        return False
+
+                except Exception as e:
+                    logger.error(f"Error during application process: {str(e)}")
+                    raise
+
+                finally:
+                    # A form prepared but never filled still holds handles
+                    if self.form_handler:
+                        await self.form_handler.release()
+                    # Closing the page releases its DOM and every handle into it
+                    if page:
+                        await self.browser_manager.close_page(page)
+
+        except Exception as e:
+            logger.error(f"Application failed: {str(e)}")
+            raise
+
+        finally:
+            self._end_phase()
+            _in_flight.dec()
+            _attempts.inc(result=result)
+            if result == "success":
+                _completions.mark()
+            self.outcome = result
+
+    @asynccontextmanager
+    async def _browser_session(self) -> AsyncIterator[Optional[BrowserContext]]:
+        """Run in an isolated context of the shared browser, or in a browser
+        of our own when there is none."""
+        if not self.shared_browser:
+            async with self.browser_manager:
+                yield None
+            return
+
+        context = await self.shared_browser.new_context()
+        try:
+            yield context
+        finally:
+            await self.shared_browser.close_context(context)
+
+    def _stage(self, stage: str) -> AsyncContextManager:
+        """Enter a pipeline stage, reporting the wait if it is full."""
+        if not self.stages:
+            return nullcontext()
+        if self.stages.is_full(stage):
+            self._report_progress(f"waiting_to_{stage}")
+        return self.stages.stage(stage)
+
+    def _report_progress(self, phase: str):
+        """Time the phase that just ended and notify the progress callback
+        that a new phase has started."""
+        self._end_phase()
+        self._phase = phase
+        self._phase_started = time.perf_counter()
+
+        if not self.on_progress:
+            return
+        try:
+            self.on_progress(phase)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {str(e)}")
+
+    def _end_phase(self):
+        """Record the duration of the current phase, if any."""
+        if not self._phase:
+            return
+        duration = time.perf_counter() - self._phase_started
+        self.phase_durations[self._phase] = (
+            self.phase_durations.get(self._phase, 0.0) + duration
+        )
+        _phase_seconds.observe(duration, phase=self._phase)
+        self._phase = None
+
+    async def _store_result(
+        self, started_at: float, usage: Dict[str, int], error: Optional[str]
+    ):
+        """Append the application's outcome to the result store."""
+        job_id, company = parse_job_url(self.job_url)
+        form = self.form_handler
+        result = ApplicationResult(
+            application_id=self.application_id,
+            job_url=self.job_url,
+            outcome=self.outcome or "error",
+            started_at=started_at,
+            finished_at=time.time(),
+            profile_id=self.profile_id,
+            job_id=job_id,
+            company=company,
+            error=error,
+            form_fingerprint=form.form_fingerprint if form else None,
+            filled_fields=sorted(form.filled_fields) if form else [],
+            missing_required_fields=(
+                sorted(form.missing_required_fields) if form else []
+            ),
+            prompt_tokens=usage["prompt"],
+            completion_tokens=usage["completion"],
+            captcha_seconds=(
+                self.captcha_solver.solve_time if self.captcha_solver else 0.0
+            ),
+            success_indicator=form.success_indicator if form else None,
+            phase_durations=dict(self.phase_durations),
+        )
+        try:
+            await asyncio.to_thread(get_result_store().record, result)
+        except Exception as e:
+            logger.warning(f"Failed to store application result: {str(e)}")
+
+    def get_application_stats(self) -> Dict[str, Any]:
+        """Get statistics about the application process."""
+        resume_manager = get_resume_manager(self.profile_id)
+        stats = {
+            "captcha_solved": (
+                self.captcha_solver.solution_count if self.captcha_solver else 0
+            ),
+            "captcha_failed": (
+                self.captcha_solver.failed_count if self.captcha_solver else 0
+            ),
+            "captcha_success_rate": (
+                self.captcha_solver.success_rate if self.captcha_solver else 0.0
+            ),
+            "pages_opened": (
+                self.browser_manager.pages_opened if self.browser_manager else 0
+            ),
+            "resume_uploads": resume_manager.upload_count,
+            "resume_upload_failures": resume_manager.failed_upload_count,
+            "resume_upload_success_rate": resume_manager.upload_success_rate,
+        }
+        return stats
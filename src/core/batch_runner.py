@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+from src.config.settings import settings
+from src.core.application_manager import JobApplicationManager
+from src.core.browser_manager import BrowserManager
+from src.core.job_scorer import JobScorer, title_from_url
+from src.core.pipeline import PipelineStages
+from src.core.profile_store import ProfileDirectory, get_profile_directory
+from src.core.proxy_pool import get_proxy_pool
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_scored_jobs = metrics.counter(
+    "scored_jobs_total", "Batch jobs scored for relevance, by whether they were queued"
+)
+
+
+@dataclass
+class BatchJob:
+    """A job posting to apply to, and the profile to apply with."""
+
+    job_url: str
+    profile_id: Optional[str] = None
+    # Used for relevance scoring; the title falls back to the URL slug
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one application in a batch."""
+
+    job_url: str
+    profile_id: str
+    success: bool
+    error: Optional[str] = None
+    score: Optional[float] = None
+    stats: Dict[str, Any] = field(default_factory=dict)
+    # Left out for scoring below min_score, without applying
+    skipped: bool = False
+
+
+def load_jobs_file(path: Path, default_profile: Optional[str] = None) -> List[BatchJob]:
+    """
+    Read batch jobs from a text file.
+
+    Each non-empty line holds a job URL optionally followed by a profile ID.
+    Lines starting with "#" are ignored.
+    """
+    jobs = []
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            profile_id = parts[1] if len(parts) > 1 else default_profile
+            jobs.append(BatchJob(parts[0], profile_id))
+    return jobs
+
+
+class BatchRunner:
+    """Applies to many jobs over one shared browser.
+
+    Each application runs in its own browser context, so jobs for different
+    profiles can be interleaved freely. At most ``concurrency`` applications
+    fill or submit their forms at once, while up to ``prefetch`` more open
+    their job pages, solve captchas and work out their answers ahead of them.
+
+    Jobs are scored for relevance to their profile as they arrive: the best
+    matches waiting in the queue are applied to first, and jobs scoring below
+    ``min_score`` are skipped. ``on_result`` is awaited with every result,
+    including a ``skipped`` one for each job left out.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        profiles: Optional[ProfileDirectory] = None,
+        dry_run: bool = False,
+        min_score: Optional[float] = None,
+        prefetch: Optional[int] = None,
+        on_result: Optional[Callable[[BatchResult], Awaitable[None]]] = None,
+    ):
+        self.concurrency = concurrency or settings.BATCH_CONCURRENCY
+        self.prefetch = settings.PIPELINE_PREFETCH if prefetch is None else prefetch
+        self.profiles = profiles or get_profile_directory()
+        self.dry_run = dry_run
+        self.min_score = settings.JOB_MIN_SCORE if min_score is None else min_score
+        # Awaited with each result as its application finishes or it is skipped
+        self.on_result = on_result
+        self._scorers: Dict[str, JobScorer] = {}
+        # Jobs skipped for scoring below min_score in the current run
+        self._skipped = 0
+        # Tie-breaker keeping equally scored jobs in arrival order
+        self._sequence = itertools.count()
+
+    async def run(
+        self, jobs: Union[Iterable[BatchJob], AsyncIterable[BatchJob]]
+    ) -> List[BatchResult]:
+        """
+        Apply to every job.
+
+        Args:
+            jobs: Jobs to apply to; may be an async iterable that keeps
+                producing jobs while earlier ones are running
+
+        Returns:
+            One result per job applied to, in completion order
+        """
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        results: List[BatchResult] = []
+        self._skipped = 0
+        stages = (
+            PipelineStages.for_batch(self.concurrency, self.prefetch)
+            if self.prefetch
+            else None
+        )
+
+        proxy_pool = get_proxy_pool()
+        async with BrowserManager(
+            max_rss_mb=settings.BROWSER_MAX_RSS_MB, proxy_pool=proxy_pool
+        ) as browser:
+            workers = [
+                asyncio.ensure_future(self._worker(browser, stages, queue, results))
+                for _ in range(stages.capacity if stages else self.concurrency)
+            ]
+            try:
+                if hasattr(jobs, "__aiter__"):
+                    async for job in jobs:
+                        await self._enqueue(queue, [job])
+                else:
+                    # Scored together, with one matrix product per profile
+                    await self._enqueue(queue, list(jobs))
+            finally:
+                for _ in workers:
+                    queue.put_nowait((math.inf, next(self._sequence), None, None))
+                await asyncio.gather(*workers)
+
+        succeeded = sum(1 for result in results if result.success)
+        summary = f"Batch finished: {succeeded}/{len(results)} applications succeeded"
+        if self._skipped:
+            summary += (
+                f", {self._skipped} job(s) skipped below relevance "
+                f"{self.min_score:.2f}"
+            )
+        logger.info(summary)
+        if proxy_pool:
+            for row in proxy_pool.stats():
+                logger.info("Proxy stats: {}", row)
+        return results
+
+    async def _worker(
+        self,
+        browser: BrowserManager,
+        stages: Optional[PipelineStages],
+        queue: asyncio.PriorityQueue,
+        results: List[BatchResult],
+    ):
+        while True:
+            _, _, job, score = await queue.get()
+            if job is None:
+                return
+            result = await self._apply(browser, stages, job)
+            result.score = score
+            results.append(result)
+            await self._report(result)
+
+    async def _report(self, result: BatchResult):
+        """Hand a result to on_result, logging rather than raising errors."""
+        if not self.on_result:
+            return
+        try:
+            await self.on_result(result)
+        except Exception as e:
+            logger.error(f"Handling the result of {result.job_url} failed: {str(e)}")
+
+    async def _enqueue(self, queue: asyncio.PriorityQueue, jobs: List[BatchJob]):
+        """Queue jobs by descending relevance, skipping those below min_score."""
+        for job, score in zip(jobs, self._score(jobs)):
+            if score is not None and score < self.min_score:
+                _scored_jobs.inc(result="skipped")
+                self._skipped += 1
+                logger.info(f"Skipping {job.job_url}: relevance {score:.2f}")
+                await self._report(
+                    BatchResult(
+                        job.job_url,
+                        job.profile_id or self.profiles.default_id(),
+                        False,
+                        score=score,
+                        skipped=True,
+                    )
+                )
+                continue
+
+            _scored_jobs.inc(result="queued")
+            # Unscored jobs rank as if they had just made the threshold
+            priority = -(self.min_score if score is None else score)
+            queue.put_nowait((priority, next(self._sequence), job, score))
+
+    def _score(self, jobs: List[BatchJob]) -> List[Optional[float]]:
+        """Score jobs against their profiles; None where there is nothing to
+        score (no title, or a profile without titles, skills or industries)."""
+        scores: List[Optional[float]] = [None] * len(jobs)
+        by_profile: Dict[str, List[int]] = {}
+        for index, job in enumerate(jobs):
+            if job.title or title_from_url(job.job_url):
+                profile_id = job.profile_id or self.profiles.default_id()
+                by_profile.setdefault(profile_id, []).append(index)
+
+        for profile_id, indices in by_profile.items():
+            scorer = self._scorer_for(profile_id)
+            if not scorer or not scorer.enabled:
+                continue
+            profile_scores = scorer.score(
+                [jobs[i].title or title_from_url(jobs[i].job_url) for i in indices],
+                [jobs[i].description or "" for i in indices],
+            )
+            for index, score in zip(indices, profile_scores):
+                scores[index] = float(score)
+        return scores
+
+    def _scorer_for(self, profile_id: str) -> Optional[JobScorer]:
+        if profile_id not in self._scorers:
+            try:
+                metadata = self.profiles.store_for(profile_id).load()
+            except Exception as e:
+                # Reported when the application itself fails to load it
+                logger.debug(f"Cannot score jobs for profile {profile_id}: {str(e)}")
+                return None
+            self._scorers[profile_id] = JobScorer(metadata)
+        return self._scorers[profile_id]
+
+    async def _apply(
+        self,
+        browser: BrowserManager,
+        stages: Optional[PipelineStages],
+        job: BatchJob,
+    ) -> BatchResult:
+        profile_id = job.profile_id or self.profiles.default_id()
+        try:
+            metadata_path = self.profiles.path_for(profile_id)
+            manager = JobApplicationManager(
+                job.job_url,
+                str(metadata_path),
+                profile_id=profile_id,
+                browser_manager=browser,
+                dry_run=self.dry_run,
+                stages=stages,
+            )
+            success = await manager.apply_to_job()
+            return BatchResult(
+                job.job_url, profile_id, success, stats=manager.get_application_stats()
+            )
+        except Exception as e:
+            logger.error(f"Batch application to {job.job_url} failed: {str(e)}")
+            return BatchResult(job.job_url, profile_id, False, error=str(e))
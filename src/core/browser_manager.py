@@ -1,95 +1,306 @@
-from typing import Optional, Dict, Any
-from playwright.async_api import (
-    async_playwright,
-    Page,
-    Browser,
-    BrowserContext,
-    Playwright,
-)
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Set
 from src.config.settings import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+from src.utils.process_stats import descendant_pids, tree_rss_bytes
+from src.core.locator_resolver import COOKIE_CONSENT
+from src.core.proxy_pool import is_proxy_error
 import time
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser, BrowserContext, Playwright
+    from src.core.proxy_pool import Proxy, ProxyPool
+    from src.core.captcha_handler import CaptchaHandler
+
 logger = get_logger(__name__)
 
+_browsers_open = metrics.gauge("browsers_open", "Browsers currently running")
+_contexts_open = metrics.gauge(
+    "browser_contexts_open", "Browser contexts currently open"
+)
+_pages_opened = metrics.counter("browser_pages_opened_total", "Browser pages created")
+_pages_open = metrics.gauge("browser_pages_open", "Browser pages currently open")
+_recycles = metrics.counter(
+    "browser_recycles_total", "Browsers restarted by the memory watchdog"
+)
+_context_heap_bytes = metrics.histogram(
+    "browser_context_js_heap_bytes",
+    "JavaScript heap used by a browser context's pages when it is closed",
+    buckets=tuple(mb * 2**20 for mb in (5, 10, 25, 50, 100, 250, 500, 1000)),
+)
+
+
+def _browser_memory() -> Dict[str, Any]:
+    rss = tree_rss_bytes(descendant_pids())
+    return {
+        "browser_resident_memory_bytes": (
+            "Resident memory of the Playwright driver and browser processes",
+            rss,
+        ),
+        "browser_memory_per_context_bytes": (
+            "Browser resident memory divided by the open browser contexts",
+            rss / max(_contexts_open.value(), 1),
+        ),
+    }
+
+
+metrics.register_collector(_browser_memory)
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    """How browsers are launched and how their contexts are sized."""
+
+    name: str
+    # None follows settings.HEADLESS
+    headless: Optional[bool] = None
+    args: List[str] = field(default_factory=list)
+    viewport: Dict[str, int] = field(
+        default_factory=lambda: {"width": 1920, "height": 1080}
+    )
+
+
+LAUNCH_PROFILES = {
+    # Interactive use: a visible browser unless HEADLESS is set
+    "default": LaunchProfile(
+        name="default",
+        args=["--no-sandbox", "--disable-setuid-sandbox"],
+    ),
+    # Many browsers on one machine: nothing rendered to a screen, no GPU
+    # emulation and no background work beyond the application itself
+    "server": LaunchProfile(
+        name="server",
+        headless=True,
+        args=[
+            "--no-sandbox",
+            "--disable-setuid-sandbox",
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--disable-component-extensions-with-background-pages",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-renderer-backgrounding",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--metrics-recording-only",
+            "--mute-audio",
+            "--no-first-run",
+        ],
+        viewport={"width": 1280, "height": 800},
+    ),
+}
+
+
+def get_launch_profile(name: Optional[str] = None) -> LaunchProfile:
+    """Get a launch profile by name (default: settings.BROWSER_PROFILE)."""
+    name = name or settings.BROWSER_PROFILE
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(
+            f"Unknown browser profile {name!r}; "
+            f"expected one of {', '.join(LAUNCH_PROFILES)}"
+        )
+    return LAUNCH_PROFILES[name]
+
 
 class BrowserManager:
     """Manages browser instances and provides methods for browser operations."""
 
-    def __init__(self, proxy_config: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        proxy_config: Optional[Dict[str, str]] = None,
+        launch_profile: Optional[str] = None,
+        max_rss_mb: Optional[int] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+    ):
+        self.launch_profile = get_launch_profile(launch_profile)
+        # Restart the browser once its processes use more memory than this;
+        # only for browsers shared through new_context, which can be drained
+        self.max_rss_mb = max_rss_mb
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self._is_started = False
         self._is_closed = False
         self.proxy_config = proxy_config or {}
+        # Proxies assigned per context, instead of the static proxy_config
+        self.proxy_pool = proxy_pool
+        self._context_proxies: Dict[BrowserContext, Proxy] = {}
         self._page_count = 0
+        self._pages_opened = 0
+        self._contexts: Set[BrowserContext] = set()
+        self._recycling = False
+        self._contexts_changed = asyncio.Condition()
+        self._watchdog: Optional[asyncio.Task] = None
 
     async def start(self) -> "BrowserManager":
         """Initialize the browser and create a new context."""
-        try:
-            if self._is_started:
-                logger.warning("Browser already started")
-                return self
+        if self._is_started:
+            logger.warning("Browser already started")
+            return self
+
+        await self._launch()
+        if self.max_rss_mb and self.max_rss_mb > 0:
+            self._watchdog = asyncio.ensure_future(self._watch_memory())
+        return self
 
+    async def _launch(self):
+        try:
             logger.info("Starting browser initialization...")
+            from playwright.async_api import async_playwright
+
             self.playwright = await async_playwright().start()
             browser_type = getattr(self.playwright, settings.BROWSER_TYPE)
 
-            launch_options = {
-                "headless": settings.HEADLESS,
-                "args": ["--no-sandbox", "--disable-setuid-sandbox"],
-            }
+            launch_options = self._launch_options()
 
-            if self.proxy_config:
+            if self.proxy_pool:
+                # Chromium only honors per-context proxies when launched with
+                # one; every context overrides it
+                launch_options["proxy"] = {"server": "http://per-context"}
+            elif self.proxy_config:
                 launch_options["proxy"] = self.proxy_config
 
             logger.debug("Launching browser...")
             self.browser = await browser_type.launch(**launch_options)
-
-            context_options = {
-                "user_agent": settings.USER_AGENT,
-                "viewport": {"width": 1920, "height": 1080},
-                "ignore_https_errors": True,
-            }
-
-            if self.proxy_config:
-                context_options["proxy"] = self.proxy_config
+            _browsers_open.inc()
 
             logger.debug("Creating browser context...")
-            self.context = await self.browser.new_context(**context_options)
+            self.context = await self._create_context()
+            _contexts_open.inc()
             self._is_started = True
             self._is_closed = False
             logger.info("Browser initialized successfully")
-            return self
 
         except Exception as e:
             logger.error(f"Failed to initialize browser: {str(e)}")
-            await self.close()
+            await self._shutdown()
             raise
 
+    def _launch_options(self) -> Dict[str, Any]:
+        """Browser launch options of the launch profile."""
+        profile = self.launch_profile
+        args = list(profile.args)
+        if settings.BROWSER_JS_HEAP_MB > 0:
+            # Cap each renderer's V8 old generation, so a runaway page fails
+            # fast instead of growing the whole machine's memory
+            args.append(
+                f"--js-flags=--max-old-space-size={settings.BROWSER_JS_HEAP_MB}"
+            )
+
+        headless = settings.HEADLESS if profile.headless is None else profile.headless
+        logger.debug(f"Launching with the {profile.name} profile (headless={headless})")
+        return {"headless": headless, "args": args}
+
+    def _context_options(self) -> Dict[str, Any]:
+        """Options used for every browser context."""
+        context_options = {
+            "user_agent": settings.USER_AGENT,
+            "viewport": dict(self.launch_profile.viewport),
+            "ignore_https_errors": True,
+        }
+
+        if self.proxy_config:
+            context_options["proxy"] = self.proxy_config
+
+        return context_options
+
+    async def _create_context(self) -> BrowserContext:
+        """Create a context, behind a proxy of the pool if there is one."""
+        options = self._context_options()
+        if not self.proxy_pool:
+            return await self.browser.new_context(**options)
+
+        proxy = self.proxy_pool.acquire()
+        options["proxy"] = proxy.playwright_config()
+        try:
+            context = await self.browser.new_context(**options)
+        except Exception:
+            self.proxy_pool.release(proxy)
+            raise
+        self._context_proxies[context] = proxy
+        logger.debug(f"Context assigned proxy {proxy}")
+        return context
+
+    def _release_proxy(self, context: BrowserContext):
+        proxy = self._context_proxies.pop(context, None)
+        if proxy:
+            self.proxy_pool.release(proxy)
+
+    def proxy_for(self, page: Page) -> Optional[Proxy]:
+        """Get the pool proxy a page's context goes through, if any."""
+        return self._context_proxies.get(page.context)
+
+    async def new_context(self) -> BrowserContext:
+        """Create an isolated context, so several applications can share the
+        browser without sharing cookies or storage."""
+        async with self._contexts_changed:
+            # Wait out a restart by the memory watchdog
+            await self._contexts_changed.wait_for(lambda: not self._recycling)
+            if not self._is_started or self._is_closed:
+                raise RuntimeError(
+                    "Browser not started or already closed. Call start() first."
+                )
+
+            context = await self._create_context()
+            self._contexts.add(context)
+        _contexts_open.inc()
+        logger.debug("Created isolated browser context")
+        return context
+
+    async def close_context(self, context: BrowserContext):
+        """Close a context created with new_context, and its pages."""
+        try:
+            await self._record_context_memory(context)
+            await context.close()
+            _contexts_open.dec()
+            logger.debug("Closed isolated browser context")
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {str(e)}")
+        finally:
+            self._release_proxy(context)
+            async with self._contexts_changed:
+                self._contexts.discard(context)
+                self._contexts_changed.notify_all()
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
         reraise=True,
     )
-    async def new_page(self) -> Page:
-        """Create a new page with default timeout and retry mechanism."""
+    async def new_page(self, context: Optional[BrowserContext] = None) -> Page:
+        """Create a new page with default timeout and retry mechanism.
+
+        Pages are created in the given context, or the default one.
+        """
         if not self._is_started or self._is_closed:
             raise RuntimeError(
                 "Browser not started or already closed. Call start() first."
             )
 
         try:
-            if not self.context:
+            context = context or self.context
+            if not context:
                 raise RuntimeError("Browser context is not initialized")
 
             logger.debug("Creating new page...")
-            page = await self.context.new_page()
+            page = await context.new_page()
             page.set_default_timeout(settings.DEFAULT_TIMEOUT)
+            # Pages also close with their context or browser
+            page.once("close", lambda _: self._on_page_closed())
             self._page_count += 1
-            logger.debug(f"New page created (total: {self._page_count})")
+            self._pages_opened += 1
+            _pages_open.inc()
+            _pages_opened.inc()
+            logger.debug(f"New page created (open: {self._page_count})")
             return page
         except Exception as e:
             logger.error(f"Failed to create new page: {str(e)}")
@@ -107,7 +318,19 @@ class BrowserManager:
                 raise RuntimeError("Browser not started or already closed")
 
             logger.debug(f"Navigating to {url}...")
-            await page.goto(url, wait_until="networkidle")
+            proxy = self.proxy_for(page)
+            started = time.perf_counter()
+            try:
+                await page.goto(url, wait_until="networkidle")
+            except Exception as e:
+                # A slow page or a failing site says nothing about the proxy
+                if proxy and is_proxy_error(e):
+                    self.proxy_pool.report(proxy, ok=False)
+                raise
+            if proxy:
+                self.proxy_pool.report(
+                    proxy, ok=True, latency=time.perf_counter() - started
+                )
             logger.info(f"Successfully navigated to {url}")
         except Exception as e:
             logger.error(f"Failed to navigate to {url}: {str(e)}")
@@ -117,9 +340,7 @@ class BrowserManager:
         """Accept cookies on the page."""
         try:
             # Check if cookies are already accepted
-            cookies_button = await page.query_selector(
-                'button[data-ui="cookie-consent-accept"]'
-            )
+            cookies_button = await COOKIE_CONSENT.resolve(page)
             if cookies_button:
                 await cookies_button.click()
                 logger.info("Cookies accepted")
@@ -129,40 +350,102 @@ class BrowserManager:
             logger.error(f"Failed to accept cookies: {str(e)}")
             raise
 
-    async def handle_captcha(self, page: Page) -> None:
-        """Handle captcha on the page."""
+    async def handle_captcha(self, page: Page, captcha_handler: CaptchaHandler) -> None:
+        """
+        Handle captchas on the page: checkbox widgets are solved now, while
+        invisible and v3 widgets are left for the form's submission.
 
-        try:
-            # Check for captcha
-            captcha_element = await page.query_selector("[data-sitekey]")
-            if captcha_element:
-                site_key = await captcha_element.get_attribute("data-sitekey")
-                captcha_type = (
-                    "recaptcha"
-                    if "recaptcha" in str(captcha_element).lower()
-                    else "hcaptcha"
-                )
+        Args:
+            page: The page to check
+            captcha_handler: Detects the widgets and injects solved tokens
+        """
 
-                if captcha_type == "recaptcha":
-                    solution = self.captcha_solver.solve_recaptcha(
-                        site_key, self.job_url
-                    )
-                else:
-                    solution = self.captcha_solver.solve_hcaptcha(
-                        site_key, self.job_url
-                    )
-
-                if solution:
-                    await page.evaluate(
-                        f'document.getElementById("g-recaptcha-response").innerHTML="{solution}";'
-                    )
-                    logger.info("Captcha solved and applied")
+        try:
+            captchas = await captcha_handler.detect(page)
+            if captchas:
+                proxy = self.proxy_for(page)
+                if proxy:
+                    self.proxy_pool.report_captcha(proxy)
+                if await captcha_handler.solve_visible(page, captchas):
+                    logger.info("Captcha handled")
         except Exception as e:
             logger.error(f"Failed to handle captcha: {str(e)}")
             raise
 
+    def _on_page_closed(self):
+        self._page_count -= 1
+        _pages_open.dec()
+
+    async def close_page(self, page: Page):
+        """Close a page created with new_page, if it is still open."""
+        if page.is_closed():
+            return
+        try:
+            await page.close()
+        except Exception as e:
+            logger.warning(f"Failed to close page: {str(e)}")
+
+    async def recycle_if_needed(self) -> bool:
+        """
+        Restart the browser if its processes use more than max_rss_mb.
+
+        New contexts wait while the contexts in use are closed, then the
+        browser is relaunched.
+
+        Returns:
+            bool: True if the browser was restarted
+        """
+        if not self.max_rss_mb or self._recycling or not self._is_started:
+            return False
+
+        rss = tree_rss_bytes(self._browser_pids())
+        if rss < self.max_rss_mb * 2**20:
+            return False
+
+        logger.warning(
+            f"Browser uses {rss / 2**20:.0f} MB (limit {self.max_rss_mb} MB); "
+            f"restarting once {len(self._contexts)} context(s) close"
+        )
+        async with self._contexts_changed:
+            self._recycling = True
+            try:
+                await self._contexts_changed.wait_for(lambda: not self._contexts)
+                await self._shutdown()
+                await self._launch()
+                _recycles.inc()
+            finally:
+                self._recycling = False
+                self._contexts_changed.notify_all()
+        return True
+
+    def _browser_pids(self) -> List[int]:
+        """Get the processes of this manager's browser: its Playwright driver
+        and everything the driver started, so other browsers of the process
+        are not counted against it."""
+        try:
+            # Playwright only exposes the driver process on its pipe transport
+            driver = self.playwright._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            return descendant_pids()
+        return [driver] + descendant_pids(driver)
+
+    async def _watch_memory(self, interval: float = 10.0):
+        """Check the browser's memory periodically while it runs."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.recycle_if_needed()
+            except Exception as e:
+                logger.error(f"Memory watchdog failed to restart browser: {str(e)}")
+
     async def close(self):
         """Close the browser and cleanup resources."""
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+        await self._shutdown()
+
+    async def _shutdown(self):
         if self._is_closed:
             logger.debug("Browser already closed")
             return
@@ -170,23 +453,53 @@ class BrowserManager:
         try:
             logger.debug("Starting browser cleanup...")
             if self.context:
+                await self._record_context_memory(self.context)
                 await self.context.close()
+                _contexts_open.dec()
+                self._release_proxy(self.context)
+                self.context = None
                 logger.debug("Browser context closed")
             if self.browser:
                 await self.browser.close()
+                _browsers_open.dec()
+                self.browser = None
                 logger.debug("Browser closed")
             if self.playwright:
                 await self.playwright.stop()
+                self.playwright = None
                 logger.debug("Playwright stopped")
 
             self._is_started = False
             self._is_closed = True
-            self._page_count = 0
             logger.info("Browser cleanup completed successfully")
         except Exception as e:
             logger.error(f"Error while closing browser: {str(e)}")
             raise
 
+    async def _record_context_memory(self, context: BrowserContext):
+        """Record the JavaScript heap used by a context's pages (Chromium only),
+        for a sample of BROWSER_HEAP_SAMPLE_RATE of the contexts."""
+        if settings.BROWSER_TYPE != "chromium" or not context.pages:
+            return
+        if random.random() >= settings.BROWSER_HEAP_SAMPLE_RATE:
+            return
+
+        used = 0
+        try:
+            for page in context.pages:
+                session = await context.new_cdp_session(page)
+                try:
+                    usage = await session.send("Runtime.getHeapUsage")
+                    used += usage["usedSize"]
+                finally:
+                    await session.detach()
+        except Exception as e:
+            logger.debug(f"Could not measure context memory: {str(e)}")
+            return
+
+        _context_heap_bytes.observe(used)
+        logger.debug(f"Context used {used / 2**20:.1f} MB of JavaScript heap")
+
     async def __aenter__(self):
         """Async context manager entry."""
         return await self.start()
@@ -209,3 +522,8 @@ class BrowserManager:
     def page_count(self) -> int:
         """Get the current number of open pages."""
         return self._page_count
+
+    @property
+    def pages_opened(self) -> int:
+        """Get the number of pages created over the manager's lifetime."""
+        return self._pages_opened
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src.core.captcha_solver import CaptchaSolver
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+logger = get_logger(__name__)
+
+_captchas_detected = metrics.counter(
+    "captchas_detected_total", "Captchas found on pages by type and variant"
+)
+
+# Tokens are accepted for about two minutes; an older solve is not reused
+TOKEN_LIFETIME = 110.0
+
+# Finds captcha widgets from their iframes (anchor/checkbox and challenge
+# frames), widget containers and loader scripts, merged per site key. The
+# type of a bare [data-sitekey] element is taken from the scripts loaded.
+_DETECT_SCRIPT = """() => {
+    const param = (src, name) => {
+        try {
+            const url = new URL(src, location.href);
+            return url.searchParams.get(name) || new URLSearchParams(url.hash.slice(1)).get(name);
+        } catch (e) {
+            return null;
+        }
+    };
+    const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const widgets = {};
+    const add = info => {
+        if (!info.sitekey) return;
+        const widget = widgets[info.sitekey] || (widgets[info.sitekey] = {
+            sitekey: info.sitekey, type: null, version: 'v2', invisible: false,
+            enterprise: false, callback: null, action: null, visible: false, challenge: false,
+        });
+        widget.type = widget.type || info.type || null;
+        for (const flag of ['invisible', 'enterprise', 'visible', 'challenge']) {
+            widget[flag] = widget[flag] || !!info[flag];
+        }
+        widget.callback = widget.callback || info.callback || null;
+        widget.action = widget.action || info.action || null;
+        if (info.version === 'v3') widget.version = 'v3';
+    };
+
+    const loaded = new Set();
+    for (const script of document.querySelectorAll('script[src]')) {
+        const src = script.src;
+        if (/\\/recaptcha\\/(api|enterprise)\\.js/.test(src)) {
+            loaded.add('recaptcha');
+            const render = param(src, 'render');
+            if (render && render !== 'explicit' && render !== 'onload') {
+                add({ type: 'recaptcha', version: 'v3', sitekey: render, invisible: true,
+                      enterprise: src.includes('/enterprise.js') });
+            }
+        } else if (/hcaptcha\\.com\\/1\\/api\\.js/.test(src)) {
+            loaded.add('hcaptcha');
+        }
+    }
+
+    for (const frame of document.querySelectorAll('iframe[src]')) {
+        const src = frame.src;
+        const recaptcha = src.match(/\\/recaptcha\\/(api2|enterprise)\\/(anchor|bframe)/);
+        if (recaptcha) {
+            add({ type: 'recaptcha', sitekey: param(src, 'k'), enterprise: recaptcha[1] === 'enterprise',
+                  invisible: param(src, 'size') === 'invisible',
+                  visible: recaptcha[2] === 'anchor' && visible(frame),
+                  challenge: recaptcha[2] === 'bframe' && visible(frame) });
+        } else if (/hcaptcha\\.com\\//.test(src) && param(src, 'frame')) {
+            const kind = param(src, 'frame');
+            add({ type: 'hcaptcha', sitekey: param(src, 'sitekey'),
+                  invisible: param(src, 'size') === 'invisible',
+                  visible: kind === 'checkbox' && visible(frame),
+                  challenge: kind === 'challenge' && visible(frame) });
+        }
+    }
+
+    for (const el of document.querySelectorAll('[data-sitekey]')) {
+        const cls = String(el.className || '');
+        let type = /h-captcha/.test(cls) ? 'hcaptcha' : /g-recaptcha/.test(cls) ? 'recaptcha' : null;
+        if (!type && loaded.size === 1) type = [...loaded][0];
+        add({ type, sitekey: el.getAttribute('data-sitekey'),
+              invisible: el.getAttribute('data-size') === 'invisible',
+              callback: el.getAttribute('data-callback'), action: el.getAttribute('data-action') });
+    }
+    return Object.values(widgets);
+}"""
+
+# Puts a token where sites read it from: the response fields, the widget API
+# (getResponse, and execute for invisible and v3 widgets) and, if asked, the
+# widget's callback (data-callback or reCAPTCHA's registered client callbacks)
+_INJECT_SCRIPT = """({ type, token, callback, invokeCallback }) => {
+    const resolve = path => path.split('.').reduce((obj, key) => obj && obj[key], window);
+
+    const names = type === 'hcaptcha' ? ['h-captcha-response', 'g-recaptcha-response'] : ['g-recaptcha-response'];
+    let filled = 0;
+    for (const name of names) {
+        let fields = [...document.querySelectorAll(
+            `textarea[name="${name}"], textarea[id^="${name}"], input[name="${name}"]`)];
+        const form = document.querySelector('form');
+        if (!fields.length && form) {
+            const field = document.createElement('textarea');
+            field.name = name;
+            field.style.display = 'none';
+            form.appendChild(field);
+            fields = [field];
+        }
+        for (const field of fields) {
+            field.value = token;
+            field.innerHTML = token;
+            filled++;
+        }
+    }
+
+    const callbacks = [];
+    const addCallback = cb => {
+        const fn = typeof cb === 'string' ? resolve(cb) : cb;
+        if (typeof fn === 'function' && !callbacks.includes(fn)) callbacks.push(fn);
+    };
+    if (callback) addCallback(callback);
+    if (type === 'recaptcha' && window.___grecaptcha_cfg) {
+        const search = (obj, depth) => {
+            if (!obj || typeof obj !== 'object' || depth > 4) return;
+            for (const [key, value] of Object.entries(obj)) {
+                if (key === 'callback') addCallback(value);
+                else search(value, depth + 1);
+            }
+        };
+        search(window.___grecaptcha_cfg.clients, 0);
+    }
+    const runCallbacks = () => callbacks.forEach(cb => {
+        try { cb(token); } catch (e) { console.error(e); }
+    });
+
+    const api = type === 'hcaptcha' ? window.hcaptcha : window.grecaptcha;
+    for (const target of [api, api && api.enterprise].filter(Boolean)) {
+        target.getResponse = () => token;
+        target.execute = () => {
+            runCallbacks();
+            return Promise.resolve(token);
+        };
+    }
+    if (invokeCallback) runCallbacks();
+    return { filled, callbacks: callbacks.length };
+}"""
+
+
+@dataclass
+class CaptchaInfo:
+    """A captcha widget found on a page."""
+
+    sitekey: str
+    type: Optional[str]  # "recaptcha", "hcaptcha", or None if unknown
+    version: str = "v2"
+    invisible: bool = False
+    enterprise: bool = False
+    callback: Optional[str] = None
+    action: Optional[str] = None
+    # Whether its checkbox or its challenge is showing
+    visible: bool = False
+    challenge: bool = False
+
+    @property
+    def variant(self) -> str:
+        if self.version == "v3":
+            return "v3"
+        return "invisible" if self.invisible else "checkbox"
+
+
+class CaptchaHandler:
+    """Detects captcha widgets and injects tokens solved by a CaptchaSolver.
+
+    Checkbox widgets on the page are solved when it loads, and solved again
+    before submitting if the form waited long enough for the token to
+    expire; invisible and v3 widgets only right before the form is
+    submitted, so their short-lived tokens are fresh. A challenge that
+    appears after clicking submit is solved and its callback invoked to let
+    the submission through.
+    """
+
+    def __init__(self, solver: CaptchaSolver):
+        self.solver = solver
+        # When each site key was last solved, to avoid solving it twice
+        self._solved_at: Dict[str, float] = {}
+
+    async def detect(self, page: Page) -> List[CaptchaInfo]:
+        """Find the captcha widgets on a page."""
+        try:
+            widgets = await page.evaluate(_DETECT_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Could not check the page for captchas: {str(e)}")
+            return []
+        return [CaptchaInfo(**widget) for widget in widgets]
+
+    async def solve_visible(self, page: Page, captchas: List[CaptchaInfo]) -> bool:
+        """
+        Solve the checkbox widgets among detected captchas.
+
+        Returns:
+            Whether every checkbox widget was solved
+        """
+        solved = True
+        for info in captchas:
+            _captchas_detected.inc(type=info.type or "unknown", variant=info.variant)
+            if info.variant == "checkbox":
+                solved &= await self.solve(page, info, invoke_callback=True)
+            else:
+                logger.info(f"Deferring {info.variant} {info.type} until submit")
+        return solved
+
+    async def prepare_submit(self, page: Page) -> bool:
+        """
+        Solve the invisible and v3 widgets of a page before its form is
+        submitted, so the site's execute() call gets a token at once, and
+        re-solve checkbox widgets whose token expired while the form waited
+        for a fill slot.
+
+        Returns:
+            Whether a token was injected
+        """
+        injected = False
+        for info in await self.detect(page):
+            if self._is_fresh(info):
+                continue
+            if info.variant != "checkbox":
+                injected |= await self.solve(page, info, invoke_callback=False)
+            elif info.sitekey in self._solved_at:
+                logger.info(f"Captcha token for {info.sitekey} expired; solving again")
+                injected |= await self.solve(page, info, invoke_callback=True)
+        return injected
+
+    async def wait_for_challenge(
+        self, page: Page, interval: float = 0.5
+    ) -> CaptchaInfo:
+        """Wait until a captcha challenge shows on the page (cancel to stop)."""
+        while True:
+            for info in await self.detect(page):
+                if info.challenge:
+                    _captchas_detected.inc(
+                        type=info.type or "unknown", variant="challenge"
+                    )
+                    return info
+            await asyncio.sleep(interval)
+
+    async def solve(
+        self, page: Page, info: CaptchaInfo, invoke_callback: bool = True
+    ) -> bool:
+        """
+        Solve a captcha with the solver matching its type and inject the token.
+
+        Args:
+            page: The page showing the captcha
+            info: The detected widget
+            invoke_callback: Whether to call the widget's callback with the
+                token, as the widget does once solved
+
+        Returns:
+            Whether a token was injected
+        """
+        if info.type is None:
+            # A solve of the wrong type is paid for and rejected
+            logger.warning(f"Unknown captcha type for site key {info.sitekey}")
+            return False
+
+        logger.info(f"Solving {info.variant} {info.type} on {page.url}")
+        if info.type == "recaptcha":
+            token = await asyncio.to_thread(
+                self.solver.solve_recaptcha,
+                info.sitekey,
+                page.url,
+                version=info.version,
+                invisible=info.invisible,
+                enterprise=info.enterprise,
+                action=info.action,
+            )
+        else:
+            token = await asyncio.to_thread(
+                self.solver.solve_hcaptcha,
+                info.sitekey,
+                page.url,
+                invisible=info.invisible,
+            )
+        if not token:
+            return False
+
+        result = await page.evaluate(
+            _INJECT_SCRIPT,
+            {
+                "type": info.type,
+                "token": token,
+                "callback": info.callback,
+                "invokeCallback": invoke_callback,
+            },
+        )
+        self._solved_at[info.sitekey] = time.monotonic()
+        logger.info(
+            f"Captcha token injected into {result['filled']} field(s), "
+            f"{result['callbacks']} callback(s)"
+        )
+        return True
+
+    def _is_fresh(self, info: CaptchaInfo) -> bool:
+        solved_at = self._solved_at.get(info.sitekey)
+        return solved_at is not None and time.monotonic() - solved_at < TOKEN_LIFETIME
@@ -1,12 +1,29 @@
 from typing import Optional, Dict, Any
-from twocaptcha import TwoCaptcha
 from src.config.settings import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 from tenacity import retry, stop_after_attempt, wait_exponential
 import time
 
 logger = get_logger(__name__)
 
+_solve_seconds = metrics.histogram(
+    "captcha_solve_seconds", "Time taken by 2Captcha to return a solution"
+)
+_solves = metrics.counter("captcha_solves_total", "Captcha solve attempts by result")
+
+# 2Captcha clients shared by the process, by API key
+_clients: Dict[str, Any] = {}
+
+
+def get_twocaptcha_client(api_key: str):
+    """Get the 2Captcha client for an API key, created on first use."""
+    if api_key not in _clients:
+        from twocaptcha import TwoCaptcha
+
+        _clients[api_key] = TwoCaptcha(api_key)
+    return _clients[api_key]
+
 
 class CaptchaSolver:
     """Handles captcha solving using 2Captcha service."""
@@ -17,24 +34,42 @@ class CaptchaSolver:
         custom_settings: Optional[Dict[str, Any]] = None,
     ):
         self.api_key = api_key or settings.TWOCAPTCHA_API_KEY
-        self.solver = TwoCaptcha(self.api_key)
         self._last_solution = None
         self._custom_settings = custom_settings or {}
         self._solution_count = 0
         self._failed_count = 0
+        self._solve_time = 0.0
+
+    @property
+    def solver(self):
+        if not self.api_key:
+            raise ValueError("2Captcha API key is required")
+        return get_twocaptcha_client(self.api_key)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
         reraise=True,
     )
-    def solve_recaptcha(self, site_key: str, url: str) -> Optional[str]:
+    def solve_recaptcha(
+        self,
+        site_key: str,
+        url: str,
+        version: str = "v2",
+        invisible: bool = False,
+        enterprise: bool = False,
+        action: Optional[str] = None,
+    ) -> Optional[str]:
         """
         Solve a reCAPTCHA challenge with retry mechanism.
 
         Args:
             site_key: The reCAPTCHA site key
             url: The URL where the captcha is located
+            version: "v2" or "v3"
+            invisible: Whether it is an invisible v2 widget
+            enterprise: Whether it is reCAPTCHA Enterprise
+            action: The action of a v3 or Enterprise widget
 
         Returns:
             The captcha solution token or None if solving failed
@@ -46,15 +81,16 @@ class CaptchaSolver:
             solver_settings = {
                 "sitekey": site_key,
                 "url": url,
-                "version": "v2",
-                "enterprise": False,
-                "invisible": False,
                 "domain": None,
-                "action": None,
                 "score": None,
                 "soft_id": None,
                 "callback": None,
                 **self._custom_settings,
+                # What the page's widget is takes precedence
+                "version": version,
+                "enterprise": int(enterprise),
+                "invisible": int(invisible),
+                "action": action,
             }
 
             # Remove None values
@@ -62,7 +98,14 @@ class CaptchaSolver:
                 k: v for k, v in solver_settings.items() if v is not None
             }
 
-            result = self.solver.recaptcha(**solver_settings)
+            start = time.perf_counter()
+            try:
+                result = self.solver.recaptcha(**solver_settings)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._solve_time += elapsed
+            _solve_seconds.observe(elapsed, type="recaptcha")
+            _solves.inc(type="recaptcha", result="success")
 
             self._last_solution = result["code"]
             self._solution_count += 1
@@ -73,6 +116,7 @@ class CaptchaSolver:
 
         except Exception as e:
             self._failed_count += 1
+            _solves.inc(type="recaptcha", result="failure")
             logger.error(
                 f"Failed to solve reCAPTCHA (attempt {self._failed_count}): {str(e)}"
             )
@@ -83,13 +127,16 @@ class CaptchaSolver:
         wait=wait_exponential(multiplier=1, min=4, max=10),
         reraise=True,
     )
-    def solve_hcaptcha(self, site_key: str, url: str) -> Optional[str]:
+    def solve_hcaptcha(
+        self, site_key: str, url: str, invisible: bool = False
+    ) -> Optional[str]:
         """
         Solve an hCaptcha challenge with retry mechanism.
 
         Args:
             site_key: The hCaptcha site key
             url: The URL where the captcha is located
+            invisible: Whether it is an invisible widget
 
         Returns:
             The captcha solution token or None if solving failed
@@ -101,12 +148,12 @@ class CaptchaSolver:
             solver_settings = {
                 "sitekey": site_key,
                 "url": url,
-                "invisible": False,
                 "domain": None,
                 "action": None,
                 "enterprise": False,
                 "userAgent": None,
                 **self._custom_settings,
+                "invisible": int(invisible),
             }
 
             # Remove None values
@@ -114,7 +161,14 @@ class CaptchaSolver:
                 k: v for k, v in solver_settings.items() if v is not None
             }
 
-            result = self.solver.hcaptcha(**solver_settings)
+            start = time.perf_counter()
+            try:
+                result = self.solver.hcaptcha(**solver_settings)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._solve_time += elapsed
+            _solve_seconds.observe(elapsed, type="hcaptcha")
+            _solves.inc(type="hcaptcha", result="success")
 
             self._last_solution = result["code"]
             self._solution_count += 1
@@ -125,6 +179,7 @@ class CaptchaSolver:
 
         except Exception as e:
             self._failed_count += 1
+            _solves.inc(type="hcaptcha", result="failure")
             logger.error(
                 f"Failed to solve hCaptcha (attempt {self._failed_count}): {str(e)}"
             )
@@ -152,6 +207,11 @@ class CaptchaSolver:
         """Get the total number of failed attempts."""
         return self._failed_count
 
+    @property
+    def solve_time(self) -> float:
+        """Get the total seconds spent waiting for 2Captcha."""
+        return self._solve_time
+
     @property
     def success_rate(self) -> float:
         """Calculate the success rate of captcha solving."""
@@ -162,4 +222,5 @@ class CaptchaSolver:
         """Reset solution and failure counters."""
         self._solution_count = 0
         self._failed_count = 0
+        self._solve_time = 0.0
         logger.info("Captcha solver statistics reset")
@@ -0,0 +1,88 @@
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from src.core.captcha_solver import CaptchaSolver
+from src.utils.ai_helper import AIFieldMapper
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (text or "").lower()).strip("_")
+
+
+def _flatten(data: Any, prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested metadata into {leaf_key: value}, keeping the first value
+    seen for each leaf key."""
+    flat: Dict[str, Any] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            for leaf, leaf_value in _flatten(value, key).items():
+                flat.setdefault(leaf, leaf_value)
+    elif isinstance(data, list):
+        if data and all(not isinstance(item, (dict, list)) for item in data):
+            flat[prefix] = ", ".join(str(item) for item in data)
+        elif data:
+            flat.update(_flatten(data[0], prefix))
+    elif prefix:
+        flat[prefix] = data
+    return flat
+
+
+class DryRunFieldMapper(AIFieldMapper):
+    """Offline stand-in for the AI field mapper, matching fields to profile
+    keys by name so a dry run needs no OpenAI access."""
+
+    async def map_fields(
+        self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        profile = {
+            _normalize(key): value for key, value in _flatten(user_metadata).items()
+        }
+        mapped = {}
+        for field_info in form_fields:
+            value = self._match(field_info, profile)
+            if value is not None:
+                mapped[field_info["name"]] = value
+
+        logger.info(f"Dry run: mapped {len(mapped)}/{len(form_fields)} fields offline")
+        return {"mapped_fields": mapped}
+
+    async def map_fields_stream(
+        self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        mapping = await self.map_fields(user_metadata, form_fields)
+        for pair in mapping.get("mapped_fields", {}).items():
+            yield pair
+
+    @staticmethod
+    def _match(field_info: Dict[str, Any], profile: Dict[str, Any]) -> Optional[Any]:
+        name = _normalize(field_info.get("name"))
+        label = _normalize(field_info.get("label") or field_info.get("placeholder"))
+
+        for key, value in profile.items():
+            if key.replace("_", "") == name.replace("_", ""):
+                return value
+
+        # Otherwise the most specific profile key found in the name or label
+        candidates = [key for key in profile if key and (key in name or key in label)]
+        if candidates:
+            return profile[max(candidates, key=len)]
+
+        options = field_info.get("options")
+        return options[0] if options else None
+
+
+class DryRunCaptchaSolver(CaptchaSolver):
+    """Captcha solver that never contacts 2Captcha."""
+
+    def solve_recaptcha(self, site_key: str, url: str, **kwargs) -> Optional[str]:
+        logger.info(f"Dry run: skipping reCAPTCHA on {url}")
+        return None
+
+    def solve_hcaptcha(self, site_key: str, url: str, **kwargs) -> Optional[str]:
+        logger.info(f"Dry run: skipping hCaptcha on {url}")
+        return None
+
+    def get_balance(self) -> float:
+        return 0.0
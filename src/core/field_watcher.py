@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+logger = get_logger(__name__)
+
+_revealed_fields = metrics.counter(
+    "revealed_fields_total", "Form fields discovered after the initial extraction"
+)
+
+# Installs a MutationObserver that only flags the page as changed; the scan
+# itself runs when drained, after the page has settled
+_INSTALL_SCRIPT = """seen => {
+    if (window.__fieldWatcher) {
+        seen.forEach(name => window.__fieldWatcher.seen.add(name));
+        return;
+    }
+    const watcher = { seen: new Set(seen), dirty: true, lastMutation: performance.now() };
+    watcher.observer = new MutationObserver(() => {
+        watcher.dirty = true;
+        watcher.lastMutation = performance.now();
+    });
+    watcher.observer.observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['style', 'class', 'hidden', 'disabled', 'aria-hidden'],
+    });
+    window.__fieldWatcher = watcher;
+}"""
+
+# Waits for mutations to settle, then returns the visible fields not seen
+# before, in the shape of FormHandler._extract_form_fields (null if the page
+# was replaced and the watcher is gone)
+_DRAIN_SCRIPT = """async ({ quietMs, maxWaitMs }) => {
+    const watcher = window.__fieldWatcher;
+    if (!watcher) return null;
+
+    const start = performance.now();
+    while (performance.now() - watcher.lastMutation < quietMs
+           && performance.now() - start < maxWaitMs) {
+        await new Promise(resolve => setTimeout(resolve, 25));
+    }
+    if (!watcher.dirty) return [];
+    watcher.dirty = false;
+
+    const fieldName = el => (
+        el.getAttribute('name') || el.getAttribute('id') ||
+        el.getAttribute('placeholder') || el.labels?.[0]?.textContent || ''
+    ).toLowerCase() || null;
+    const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+
+    const added = [];
+    for (const el of document.querySelectorAll('form input, form select, form textarea')) {
+        if (el.type === 'hidden' || el.disabled) continue;
+        // File inputs are usually hidden behind a styled drop zone
+        if (!visible(el) && !(el.type === 'file' && el.parentElement && visible(el.parentElement))) continue;
+        const name = fieldName(el);
+        if (!name || watcher.seen.has(name)) continue;
+        watcher.seen.add(name);
+        added.push({
+            name,
+            type: el.getAttribute('type'),
+            required: el.hasAttribute('required'),
+            placeholder: el.getAttribute('placeholder'),
+            label: el.labels?.[0]?.textContent?.trim() || null,
+            options: el.tagName === 'SELECT' ? Array.from(el.options).map(opt => opt.text) : [],
+        });
+    }
+    return added;
+}"""
+
+
+class FieldWatcher:
+    """Reports form fields added or revealed since the last check.
+
+    A MutationObserver in the page marks it as changed; each drain() waits
+    for the page to settle and scans for visible fields whose names have not
+    been reported yet, so follow-up questions and later form steps can be
+    filled without re-extracting the whole form.
+    """
+
+    def __init__(self, page: Page, quiet_ms: int = 150, max_wait_ms: int = 2000):
+        self.page = page
+        self.quiet_ms = quiet_ms
+        self.max_wait_ms = max_wait_ms
+        self._seen: List[str] = []
+
+    async def install(self, known_fields: Iterable[str] = ()):
+        """Start watching, treating the given field names as already known."""
+        self._seen.extend(known_fields)
+        await self.page.evaluate(_INSTALL_SCRIPT, self._seen)
+
+    async def drain(self) -> List[Dict[str, Any]]:
+        """Get the fields added since the last call."""
+        options = {"quietMs": self.quiet_ms, "maxWaitMs": self.max_wait_ms}
+        added = await self.page.evaluate(_DRAIN_SCRIPT, options)
+        if added is None:
+            # A navigation replaced the document: watch the new one
+            logger.debug("Field watcher lost after navigation; reinstalling")
+            await self.install()
+            added = await self.page.evaluate(_DRAIN_SCRIPT, options) or []
+
+        self._seen.extend(field_info["name"] for field_info in added)
+        if added:
+            _revealed_fields.inc(len(added))
+        return added
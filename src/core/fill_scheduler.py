@@ -0,0 +1,83 @@
+import asyncio
+from typing import Awaitable, Callable, List, Set, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FillScheduler:
+    """Schedules form fill actions, overlapping the ones that are independent.
+
+    Actions that depend on keyboard focus (typing, opening comboboxes,
+    clicking options) run strictly in submission order on a single lane.
+    Focus-free actions (file uploads, native select changes) run
+    concurrently alongside that lane, bounded by ``max_concurrency``.
+
+    While held, submitted actions are queued and only start on resume().
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self._focus_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._running = asyncio.Event()
+        self._running.set()
+
+    def submit(
+        self,
+        name: str,
+        action: Callable[[], Awaitable],
+        needs_focus: bool = True,
+    ):
+        """
+        Start a fill action as soon as its lane allows.
+
+        Args:
+            name: Field name, used for reporting
+            action: Coroutine function performing the fill
+            needs_focus: Whether the action must run on the ordered focus lane
+        """
+        self._tasks.append(asyncio.ensure_future(self._run(name, action, needs_focus)))
+
+    def hold(self):
+        """Queue submitted actions without starting them."""
+        self._running.clear()
+
+    def resume(self):
+        """Start the queued actions, in submission order."""
+        self._running.set()
+
+    async def _run(
+        self, name: str, action: Callable[[], Awaitable], needs_focus: bool
+    ) -> Tuple[str, bool]:
+        await self._running.wait()
+        guard = self._focus_lock if needs_focus else self._semaphore
+        async with guard:
+            try:
+                await action()
+                return name, True
+            except Exception as e:
+                logger.warning(f"Failed to fill field {name}: {str(e)}")
+                return name, False
+
+    async def join(self) -> Set[str]:
+        """Wait for every submitted action.
+
+        Returns:
+            Names of the fields whose actions succeeded
+        """
+        tasks, self._tasks = self._tasks, []
+        results = await asyncio.gather(*tasks)
+        return {name for name, succeeded in results if succeeded}
+
+    async def cancel(self):
+        """Cancel every action not yet joined and wait for them to stop."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def pending_count(self) -> int:
+        """Get the number of submitted actions not yet joined."""
+        return len(self._tasks)
@@ -1,21 +1,165 @@
-from typing import Dict, Any, Optional, List, Tuple
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Set, Tuple
+from functools import partial
+import asyncio
+import hashlib
+import json
 from pathlib import Path
-from playwright.sync_api import Page, ElementHandle
 from src.utils.logger import get_logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from src.utils.metrics import metrics
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 import re
+from src.config.settings import settings
 from src.utils.ai_helper import AIFieldMapper
+from src.utils.question_classifier import (
+    QUESTION_TAXONOMY,
+    get_question_classifier,
+    record_history,
+)
+from src.core.metadata_processor import ProfileAnswers
+from src.core.fill_scheduler import FillScheduler
+from src.core.field_watcher import FieldWatcher
+from src.core.handle_scope import HandleScope
+from src.core.locator_resolver import APPLY_BUTTON, NEXT_STEP_BUTTON, SUBMIT_BUTTON
+from src.core.resume_manager import get_resume_manager
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page, ElementHandle
+    from src.core.captcha_handler import CaptchaHandler
 
 logger = get_logger(__name__)
 
+_local_answers = metrics.counter(
+    "local_answers_total",
+    "Fields answered by the local classifier (hit) or left to AI (miss)",
+)
+
+# Fill batches per form step spent on follow-up questions revealed by answers
+MAX_REVEAL_ROUNDS = 5
+# Steps of a multi-step form followed before giving up
+MAX_FORM_STEPS = 10
+
+
+# The name of a form control, as _get_field_name works it out
+_FIELD_NAME_JS = """el => (
+    el.getAttribute('name') || el.getAttribute('id') ||
+    el.getAttribute('placeholder') || el.labels?.[0]?.textContent || ''
+).toLowerCase() || null"""
+
+# Whether a control is showing. File inputs are usually hidden behind a styled
+# drop zone, and radios and checkboxes behind their labels.
+_IS_SHOWN_JS = """el => {
+    const visible = node => !!(node && (node.offsetWidth || node.offsetHeight
+        || node.getClientRects().length));
+    if (visible(el)) return true;
+    if (el.type === 'file') return visible(el.parentElement);
+    if (el.type === 'radio' || el.type === 'checkbox') {
+        return Array.from(el.labels || []).some(visible);
+    }
+    return false;
+}"""
+
+# The controls with a field name (from _get_field_name)
+_FIND_FIELD_ELEMENTS_SCRIPT = (
+    """name => {
+    const fieldName = """
+    + _FIELD_NAME_JS
+    + """;
+    return Array.from(document.querySelectorAll('input, select, textarea'))
+        .filter(el => el.type !== 'hidden' && fieldName(el) === name);
+}"""
+)
+
+# Required-but-empty and invalid controls of the form that are showing,
+# grouped by field name (names follow _get_field_name). Controls of later
+# steps of a multi-step form are in the DOM but hidden, and left out.
+_FIND_INVALID_FIELDS_SCRIPT = (
+    """() => {
+    const root = document.querySelector('form') || document;
+    const fieldName = """
+    + _FIELD_NAME_JS
+    + """;
+    const isShown = """
+    + _IS_SHOWN_JS
+    + """;
+    const labelOf = el => (el.labels?.[0]?.textContent || '').trim() || null;
+    const errorMarker = el => {
+        for (const id of (el.getAttribute('aria-describedby') || '').split(/\\s+/)) {
+            const described = id && document.getElementById(id);
+            if (described && described.matches('[role="alert"], [data-ui*="error"], [class*="error"]')
+                && described.textContent.trim()) {
+                return described.textContent.trim();
+            }
+        }
+        const container = el.closest('fieldset, [data-ui]') || el.parentElement;
+        const marker = container && container.querySelector('[role="alert"], [data-ui*="error"]');
+        return marker && marker.textContent.trim() ? marker.textContent.trim() : null;
+    };
+
+    const fields = {};
+    for (const el of root.querySelectorAll('input, select, textarea')) {
+        if (el.disabled || el.type === 'hidden' || el.type === 'submit') continue;
+        if (!isShown(el)) continue;
+        const name = fieldName(el);
+        if (!name) continue;
+
+        const required = el.required || el.getAttribute('aria-required') === 'true';
+        const marker = errorMarker(el);
+        const invalid = (el.willValidate && !el.validity.valid)
+            || el.getAttribute('aria-invalid') === 'true'
+            || (required && !['radio', 'checkbox', 'file'].includes(el.type) && !el.value.trim())
+            || marker !== null;
+        if (!invalid) continue;
+
+        const field = fields[name] || (fields[name] = {
+            name,
+            type: el.getAttribute('type'),
+            required,
+            placeholder: el.getAttribute('placeholder'),
+            label: labelOf(el),
+            options: el.tagName === 'SELECT' ? Array.from(el.options).map(opt => opt.text) : [],
+            message: el.validationMessage || marker,
+        });
+        if (el.type === 'radio' || el.type === 'checkbox') {
+            const option = labelOf(el) || el.value;
+            if (option && !field.options.includes(option)) field.options.push(option);
+        }
+    }
+    return Object.values(fields);
+}"""
+)
+
+
+class SubmissionUncertainError(RuntimeError):
+    """The form was submitted but its outcome could not be determined.
+
+    Never retried: submitting again could apply twice.
+    """
+
 
 class FormHandler:
     """Handles form detection and filling on Workable job application pages."""
 
-    def __init__(self, page: Page, user_metadata: Dict[str, Any]):
+    def __init__(
+        self,
+        page: Page,
+        user_metadata: Dict[str, Any],
+        profile_id: str = "default",
+        ai_mapper: Optional[AIFieldMapper] = None,
+        captcha_handler: Optional[CaptchaHandler] = None,
+    ):
         self.page = page
+        # Solves invisible captchas and challenges shown on submit, if given
+        self.captcha_handler = captcha_handler
         self.metadata = user_metadata
-        self.ai_mapper = AIFieldMapper()
+        self.profile_id = profile_id
+        self.ai_mapper = ai_mapper or AIFieldMapper(namespace=profile_id)
         # Common fields that appear in most job applications
         self._common_field_mappings = {
             "first_name": ["first_name", "firstname", "first", "given_name"],
@@ -27,100 +171,212 @@ class FormHandler:
         }
 
         # Job-specific field mappings
-        self._specific_field_mappings = {
-            # Work authorization fields
-            "work_auth": [
-                "authorized to work",
-                "work authorization",
-                "legally authorized",
-                "eligible to work",
-            ],
-            "visa_sponsor": [
-                "require sponsorship",
-                "visa sponsorship",
-                "immigration sponsorship",
-                "employment visa",
-            ],
-            # Education and experience fields
-            "education": ["education level", "highest education", "degree"],
-            "experience": [
-                "years of experience",
-                "relevant experience",
-                "work experience",
-            ],
-            # Salary and compensation
-            "salary": [
-                "salary expectations",
-                "compensation expectations",
-                "desired salary",
-            ],
-            # Location and timezone
-            "location": ["time zone", "location requirement", "based in"],
-            # Referral
-            "referral": ["referred by", "employee referral", "how did you hear"],
-        }
+        self._specific_field_mappings = dict(QUESTION_TAXONOMY)
+        self._profile_answers = ProfileAnswers.for_profile(profile_id, user_metadata)
 
         self._required_fields = set()
         self._filled_fields = set()
+        # (question, category) of the fields answered from the classifier
+        self._classified_questions: Dict[str, Tuple[str, str]] = {}
+        # Fields still missing or invalid after pre-submit validation
+        self._unresolved_fields = set()
+        self._scheduler = FillScheduler()
+        # Reports fields revealed after the initial extraction
+        self._field_watcher = FieldWatcher(page)
+        # Handles used by scheduled fill actions, disposed once they finish
+        self._handles = HandleScope()
+        self._combobox_options: Dict[str, List[str]] = {}
+        self._resume_manager = get_resume_manager(profile_id)
+        self._upload_fields = set()
+        self._job_title: Optional[str] = None
+        # Identifies the form's layout across applications
+        self.form_fingerprint: Optional[str] = None
+        # The confirmation that matched after submitting, if any
+        self.success_indicator: Optional[str] = None
+        self.submitted = False
 
     async def detect_and_fill_form(self):
         """Detect form fields and fill them with user metadata."""
+        await self.prepare_form()
+        await self.fill_form()
+
+    async def prepare_form(self, hold: bool = False):
+        """
+        Open the form, extract its fields and work out their answers,
+        scheduling a fill action for each.
+
+        Args:
+            hold: Queue the fill actions without starting them until
+                fill_form, so a form can be prepared ahead of filling it
+        """
+        if hold:
+            self._scheduler.hold()
         try:
             # Find and click apply button if present
             await self._click_apply_button()
 
             # Wait for form to be visible
-            await self.page.wait_for_selector("form", timeout=10000)
+            self._handles.track(
+                await self.page.wait_for_selector("form", timeout=10000)
+            )
 
             # Extract form fields
             form_fields = await self._extract_form_fields()
+            self.form_fingerprint = form_fingerprint(form_fields)
+            self._required_fields = {
+                field_info["name"]
+                for field_info in form_fields
+                if field_info["required"]
+            }
+
+            logger.debug("Form fields: {}", form_fields)
+
+            # Watch for fields revealed by answers or later form steps
+            await self._field_watcher.install(
+                field_info["name"] for field_info in form_fields
+            )
+
+            # Start the resume upload alongside everything else
+            await self._handle_file_uploads()
+            form_fields = [
+                field_info
+                for field_info in form_fields
+                if field_info["name"] not in self._upload_fields
+            ]
+
+            # Resolve combobox option lists up front in a single page call
+            await self._prefetch_combobox_options()
+
+            # Answer common screening questions locally, leaving the rest to AI
+            form_fields = await self._fill_classified_fields(form_fields)
+
+            if settings.AI_STREAMING:
+                # Fill each field as soon as its answer has been generated
+                await self._fill_fields_with_ai_stream(form_fields)
+            else:
+                # Get AI-assisted field mapping
+                mapped_fields = await self.ai_mapper.map_fields(
+                    self.metadata, form_fields
+                )
+                logger.debug("AI mapped fields: {}", mapped_fields)
+
+                # Fill fields using AI mapping
+                await self._fill_fields_with_ai_mapping(mapped_fields)
 
-            logger.debug(f"Form fields: {form_fields}")
+        except Exception as e:
+            logger.error(f"Error filling form: {str(e)}")
+            await self.release()
+            raise
 
-            # Get AI-assisted field mapping
-            mapped_fields = await self.ai_mapper.map_fields(self.metadata, form_fields)
-            logger.debug(f"AI mapped fields: {mapped_fields}")
+    async def fill_form(self):
+        """Finish filling a prepared form: run its fill actions, answer the
+        fields they reveal, step through a multi-step form and validate."""
+        try:
+            # Wait for every scheduled fill action to finish
+            self._scheduler.resume()
+            self._filled_fields |= await self._scheduler.join()
 
-            # Fill fields using AI mapping
-            await self._fill_fields_with_ai_mapping(mapped_fields)
+            # Answer follow-up questions revealed by the answers so far
+            await self._fill_revealed_fields()
 
             # Validate form completion
             await self._validate_form_completion()
 
+            # Fill the following steps of a multi-step form the same way
+            for _ in range(MAX_FORM_STEPS):
+                if not await self._next_form_step():
+                    break
+                await self._fill_revealed_fields()
+                await self._validate_form_completion()
+
             logger.info("Form fields filled successfully")
 
         except Exception as e:
             logger.error(f"Error filling form: {str(e)}")
             raise
 
+        finally:
+            await self.release()
+
+    async def release(self):
+        """Stop fill actions left behind by a failure, then dispose the
+        form's element handles. Safe to call more than once."""
+        await self._scheduler.cancel()
+        await self._handles.dispose()
+
     async def _click_apply_button(self):
         """Find and click the apply button if present."""
-        apply_selectors = [
-            'button[data-ui="overview-apply-now"]',
-            'a:text("Apply")',
-            'button:text("Apply")',
-            'a:text("Apply Now")',
-            'button:text("Apply Now")',
-        ]
+        try:
+            button = await APPLY_BUTTON.resolve(self.page)
+            if button:
+                await button.click()
+                logger.info("Clicked apply button")
+                # The caller waits for the form itself
+                await self.page.wait_for_load_state("domcontentloaded")
+        except Exception as e:
+            logger.debug(f"Could not click apply button: {str(e)}")
 
-        for selector in apply_selectors:
-            try:
-                button = await self.page.query_selector(selector)
-                if button:
-                    await button.click()
-                    logger.info("Clicked apply button")
-                    await self.page.wait_for_load_state("networkidle")
-                    return
-            except Exception as e:
-                logger.debug(
-                    f"Apply button not found with selector {selector}: {str(e)}"
+    async def _fill_revealed_fields(self):
+        """Fill the fields added to the page since they were last checked,
+        repeating while answers keep revealing follow-up questions. Only the
+        new fields are classified and mapped."""
+        for _ in range(MAX_REVEAL_ROUNDS):
+            new_fields = await self._field_watcher.drain()
+            if not new_fields:
+                return
+
+            logger.info(f"Filling revealed fields: {[f['name'] for f in new_fields]}")
+            self._required_fields |= {
+                field_info["name"]
+                for field_info in new_fields
+                if field_info["required"]
+            }
+
+            if any(field_info["type"] == "file" for field_info in new_fields):
+                await self._handle_file_uploads()
+                new_fields = [
+                    field_info
+                    for field_info in new_fields
+                    if field_info["name"] not in self._upload_fields
+                ]
+
+            remaining = await self._fill_classified_fields(new_fields)
+            if remaining:
+                mapped_fields = await self.ai_mapper.map_fields(
+                    self.metadata, remaining
                 )
-                continue
+                await self._fill_fields_with_ai_mapping(mapped_fields)
+            self._filled_fields |= await self._scheduler.join()
+
+        logger.warning("Fields still being revealed; moving on")
+
+    async def _next_form_step(self) -> bool:
+        """Advance a multi-step form once the current step is complete.
+
+        Returns:
+            Whether the form moved on to another step
+        """
+        if self._unresolved_fields:
+            return False
+
+        try:
+            button = await NEXT_STEP_BUTTON.resolve(self.page)
+            if not button:
+                return False
+            await button.click()
+        except Exception as e:
+            logger.warning(f"Could not move to the next form step: {str(e)}")
+            return False
+
+        logger.info("Moved to the next form step")
+        return True
 
     async def _fill_common_fields(self):
         """Fill common fields that appear in most job applications."""
-        common_fields = await self.page.query_selector_all(
-            'input[type="text"], input[type="email"], input[type="tel"], textarea'
+        common_fields = self._handles.track_all(
+            await self.page.query_selector_all(
+                'input[type="text"], input[type="email"], input[type="tel"], textarea'
+            )
         )
 
         for field in common_fields:
@@ -142,7 +398,9 @@ class FormHandler:
 
     async def _fill_specific_fields(self):
         """Fill job-specific fields based on field mappings."""
-        specific_fields = await self.page.query_selector_all("input, select, textarea")
+        specific_fields = self._handles.track_all(
+            await self.page.query_selector_all("input, select, textarea")
+        )
 
         for field in specific_fields:
             field_name = await self._get_field_name(field)
@@ -157,7 +415,8 @@ class FormHandler:
                 try:
                     field_type = await field.get_attribute("type")
                     if field_type == "radio" or field_type == "checkbox":
-                        await self._handle_radio_checkbox(field, value)
+                        if not await self._handle_radio_checkbox(field, value):
+                            continue
                     elif await field.get_attribute("role") == "combobox":
                         await self._handle_combobox(field, value)
                     else:
@@ -169,34 +428,95 @@ class FormHandler:
                         f"Failed to fill specific field {field_name}: {str(e)}"
                     )
 
-    async def _handle_radio_checkbox(self, field: ElementHandle, value: Any):
-        """Handle radio buttons and checkboxes."""
-        try:
-            label = await field.evaluate(
-                """el => {
-                const label = el.labels?.[0]?.textContent?.toLowerCase();
-                return label;
-            }"""
-            )
+    async def _handle_radio_checkbox(self, field: ElementHandle, value: Any) -> bool:
+        """
+        Check a radio button or checkbox if its label matches the value.
 
-            if label and str(value).lower() in label:
-                await field.check()
-                logger.debug(f"Checked option with label: {label}")
-        except Exception as e:
-            logger.warning(f"Failed to handle radio/checkbox: {str(e)}")
+        Returns:
+            Whether it was checked
+        """
+        label = await field.evaluate(
+            """el => {
+            const label = el.labels?.[0]?.textContent?.toLowerCase();
+            return label;
+        }"""
+        )
+
+        if label and str(value).lower() in label:
+            await field.check()
+            logger.debug(f"Checked option with label: {label}")
+            return True
+        return False
+
+    async def _check_matching_option(
+        self, field_name: str, options: List[ElementHandle], value: Any
+    ):
+        """Check the radio button or checkbox of a field whose label matches
+        the value, failing if none does."""
+        for option in options:
+            if await self._handle_radio_checkbox(option, value):
+                return
+        raise ValueError(f"No option of {field_name} matches {value!r}")
 
-    async def _handle_combobox(self, field: ElementHandle, value: Any):
+    async def _handle_combobox(
+        self, field: ElementHandle, value: Any, field_name: Optional[str] = None
+    ):
         """Handle combobox/select fields."""
+        option_text = self._match_combobox_option(field_name, str(value))
+        await field.click()
+
+        # Click the option as soon as it renders instead of sleeping
+        option = (
+            self.page.locator('[role="option"]', has_text=option_text)
+            .or_(self.page.get_by_text(option_text, exact=True))
+            .first
+        )
+        await option.click(timeout=2000)
+        logger.debug(f"Selected combobox option: {option_text}")
+
+    async def _select_option(self, field: ElementHandle, value: Any):
+        """Select the option of a native select by its label, or else by its
+        value."""
         try:
-            await field.click()
-            await self.page.wait_for_timeout(500)  # Wait for options to appear
+            # Waits for a matching option, so give up on the label quickly
+            await field.select_option(label=str(value), timeout=2000)
+        except Exception:
+            await field.select_option(value=str(value), timeout=2000)
 
-            option = await self.page.query_selector(f'text="{value}"')
-            if option:
-                await option.click()
-                logger.debug(f"Selected combobox option: {value}")
+    async def _prefetch_combobox_options(self):
+        """Collect the option lists of all comboboxes in one in-page call."""
+        try:
+            self._combobox_options = await self.page.evaluate(
+                """() => {
+                const result = {};
+                for (const el of document.querySelectorAll('form [role="combobox"]')) {
+                    const name = (el.name || el.id || '').toLowerCase();
+                    const listId = el.getAttribute('aria-controls') || el.getAttribute('aria-owns');
+                    const list = listId
+                        ? document.getElementById(listId)
+                        : el.list || null;
+                    if (!name || !list) continue;
+                    result[name] = Array.from(
+                        list.querySelectorAll('[role="option"], option')
+                    ).map(opt => (opt.textContent || opt.value || '').trim());
+                }
+                return result;
+            }"""
+            )
         except Exception as e:
-            logger.warning(f"Failed to handle combobox: {str(e)}")
+            logger.debug(f"Could not prefetch combobox options: {str(e)}")
+
+    def _match_combobox_option(self, field_name: Optional[str], value: str) -> str:
+        """Pick the exact option text for a value from prefetched options."""
+        options = self._combobox_options.get(field_name or "", [])
+        lowered = value.strip().lower()
+        for option in options:
+            if option.lower() == lowered:
+                return option
+        for option in options:
+            if option.lower().startswith(lowered):
+                return option
+        return value
 
     async def _get_field_value(
         self, field_name: str, mappings: Dict[str, List[str]]
@@ -238,15 +558,6 @@ class FormHandler:
 
         return None
 
-    async def _detect_required_fields(self):
-        """Detect required fields in the form."""
-        required_elements = await self.page.query_selector_all("[required]")
-        for element in required_elements:
-            field_name = await self._get_field_name(element)
-            if field_name:
-                self._required_fields.add(field_name)
-                logger.debug(f"Detected required field: {field_name}")
-
     async def _get_field_name(self, element: ElementHandle) -> Optional[str]:
         """Extract field name from element attributes using multiple strategies."""
         # Try name attribute
@@ -277,89 +588,302 @@ class FormHandler:
         return None
 
     async def _handle_file_uploads(self):
-        """Handle file upload fields."""
-        file_inputs = await self.page.query_selector_all('input[type="file"]')
+        """Schedule resume uploads for the form's resume file fields."""
+        file_inputs = self._handles.track_all(
+            await self.page.query_selector_all('input[type="file"]')
+        )
 
         for file_input in file_inputs:
             field_name = await self._get_field_name(file_input)
-            if not field_name:
+            if not field_name or field_name in self._upload_fields:
                 continue
 
-            if field_name in self.metadata and "resume" in field_name.lower():
-                resume_path = Path(self.metadata["resume_path"])
-                if resume_path.exists():
-                    try:
-                        await file_input.set_input_files(str(resume_path))
-                        self._filled_fields.add(field_name)
-                        logger.debug("Resume file uploaded")
-                    except Exception as e:
-                        logger.warning(f"Failed to upload resume: {str(e)}")
-                else:
-                    logger.warning(f"Resume file not found at {resume_path}")
+            if self._is_resume_field(field_name):
+                self._upload_fields.add(field_name)
+                self._scheduler.submit(
+                    field_name,
+                    partial(self._upload_resume, file_input),
+                    needs_focus=False,
+                )
+
+    def _is_resume_field(self, field_name: str) -> bool:
+        """Whether a file field takes the resume, going by its name."""
+        return any(
+            pattern in field_name.lower()
+            for pattern in self._common_field_mappings["resume"]
+        )
+
+    async def _upload_resume(self, file_input: ElementHandle):
+        """Upload the resume variant best suited to this job to a file input."""
+        if self._job_title is None:
+            self._job_title = await self.page.title()
+
+        resume = self._resume_manager.select(
+            self._job_title,
+            self.metadata.get("resume_path"),
+            self.metadata.get("resume_variants"),
+        )
+        if not resume:
+            self._resume_manager.record_upload(False)
+            raise FileNotFoundError(
+                f"No valid resume found for profile {self.profile_id}"
+            )
+
+        try:
+            await file_input.set_input_files(resume.payload())
+            self._resume_manager.record_upload(True)
+            logger.debug(f"Resume {resume.path.name} uploaded")
+        except Exception:
+            self._resume_manager.record_upload(False)
+            raise
 
     async def _validate_form_completion(self):
-        """Validate that all required fields have been filled."""
-        missing_fields = self._required_fields - self._filled_fields
-        if missing_fields:
-            logger.warning(f"Missing required fields: {missing_fields}")
-            # You might want to raise an exception here or handle it differently
+        """Re-resolve the fields the page reports as missing or invalid, so
+        the form is only submitted once it is complete."""
+        invalid_fields = await self._find_invalid_fields()
+        if invalid_fields:
+            names = [field_info["name"] for field_info in invalid_fields]
+            logger.info(f"Re-resolving missing or invalid fields: {names}")
+            self._filled_fields -= set(names)
+            # A rejected local answer does not confirm its category
+            for name in names:
+                self._classified_questions.pop(name, None)
+
+            # Local answers first, then the LLM for whatever is left
+            remaining = await self._fill_classified_fields(invalid_fields)
+            if remaining:
+                mapped_fields = await self.ai_mapper.map_fields(
+                    self.metadata, remaining
+                )
+                await self._fill_fields_with_ai_mapping(mapped_fields)
+            self._filled_fields |= await self._scheduler.join()
+
+            invalid_fields = await self._find_invalid_fields()
+
+        self._unresolved_fields = {field_info["name"] for field_info in invalid_fields}
+        if self._unresolved_fields:
+            logger.warning(
+                f"Missing or invalid required fields: {sorted(self._unresolved_fields)}"
+            )
+
+    async def _find_invalid_fields(self) -> List[Dict[str, Any]]:
+        """Collect required fields left empty and fields failing validation
+        (HTML5 validity or Workable's error markers) in one in-page pass.
+
+        Returns:
+            Field info in the shape of _extract_form_fields, plus the
+            validation message
+        """
+        try:
+            return await self.page.evaluate(_FIND_INVALID_FIELDS_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Could not validate form: {str(e)}")
+            return []
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_not_exception_type(SubmissionUncertainError),
         reraise=True,
     )
     async def submit_form(self):
-        """Submit the form and wait for confirmation."""
-        try:
-            submit_button = await self.page.query_selector('button[type="submit"]')
-            if submit_button:
-                await submit_button.click()
-                logger.info("Form submitted")
-
-                # Wait for submission confirmation
-                await self.page.wait_for_timeout(5000)
-
-                # Check for success indicators
-                success_indicators = [
-                    "Thank you",
-                    "Application submitted",
-                    "Success",
-                    "Confirmation",
-                ]
+        """Submit the form and wait for confirmation.
 
-                for indicator in success_indicators:
-                    if await self.page.query_selector(f"text={indicator}"):
-                        logger.info(f"Application success confirmed: {indicator}")
-                        return True
+        The outcome is taken from the server's response to the application
+        POST, falling back to a confirmation message on the page. Once the
+        form has been submitted it is never submitted again.
+        """
+        if self.submitted:
+            logger.warning("Form already submitted; not submitting again")
+            return self.success_indicator is not None
+        if self._unresolved_fields:
+            logger.warning(
+                "Not submitting: required fields are missing or invalid: "
+                f"{sorted(self._unresolved_fields)}"
+            )
+            return False
 
-                logger.warning("No success indicator found after submission")
-                return False
+        submit_button = await SUBMIT_BUTTON.resolve(self.page)
+        if not submit_button:
+            logger.warning("Submit button not found")
+            return False
+
+        if self.captcha_handler:
+            # Invisible and v3 widgets are asked for a token on submit, and
+            # checkbox tokens may have expired while the form waited
+            await self.captcha_handler.prepare_submit(self.page)
+
+        try:
+            response = await self._click_submit(submit_button)
+        except Exception as e:
+            if not self.submitted:
+                logger.error(f"Error submitting form: {str(e)}")
+                raise
+            # Submitted, but no recognizable response: check the page
+            logger.debug(f"No application response captured: {str(e)}")
+            response = None
+
+        try:
+            if response:
+                accepted = await self._check_submission_response(response)
             else:
-                logger.warning("Submit button not found")
-                return False
+                accepted = await self._check_confirmation_message()
         except Exception as e:
-            logger.error(f"Error submitting form: {str(e)}")
-            raise
+            raise SubmissionUncertainError(
+                f"Form submitted but its outcome is unknown: {str(e)}"
+            ) from e
+
+        if accepted:
+            await self._record_confirmed_questions()
+        return accepted
+
+    async def _record_confirmed_questions(self):
+        """Add the questions answered from the classifier to its history once
+        the application is accepted, so retraining learns from them."""
+        confirmed = [
+            pair
+            for name, pair in self._classified_questions.items()
+            if name in self._filled_fields
+        ]
+        if not confirmed:
+            return
+        try:
+            written = await asyncio.to_thread(record_history, confirmed)
+            logger.debug(f"Recorded {written} new question(s) in the history")
+        except Exception as e:
+            logger.warning(f"Could not record the question history: {str(e)}")
+
+    async def _click_submit(self, submit_button) -> Optional[Any]:
+        """
+        Click submit and wait for the response to the application POST.
+
+        A captcha challenge shown instead holds the POST back until it is
+        solved, so it is solved and its callback invoked to let it through.
+
+        Returns:
+            The response, or None if none came in time
+        """
+        timeout = settings.SUBMIT_RESPONSE_TIMEOUT / 1000
+        response = asyncio.ensure_future(
+            self.page.wait_for_event(
+                "response", predicate=self._is_submission_response, timeout=0
+            )
+        )
+        challenge = None
+        try:
+            # Let the response listener register before clicking
+            await asyncio.sleep(0)
+            await submit_button.click()
+            self.submitted = True
+            logger.info("Form submitted")
+
+            waiting = {response}
+            if self.captcha_handler:
+                challenge = asyncio.ensure_future(
+                    self.captcha_handler.wait_for_challenge(self.page)
+                )
+                waiting.add(challenge)
+            done, _ = await asyncio.wait(
+                waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if response in done:
+                return response.result()
+            if challenge not in done:
+                return None
+
+            info = challenge.result()
+            logger.info(f"Captcha challenge ({info.type}) shown on submit")
+            if not await self.captcha_handler.solve(
+                self.page, info, invoke_callback=True
+            ):
+                return None
+            done, _ = await asyncio.wait({response}, timeout=timeout)
+            return response.result() if done else None
+        finally:
+            for task in (response, challenge):
+                if task and not task.done():
+                    task.cancel()
+
+    @staticmethod
+    def _is_submission_response(response) -> bool:
+        """Whether a response answers the application form's POST."""
+        request = response.request
+        return (
+            request.method == "POST"
+            and request.resource_type in ("xhr", "fetch", "document")
+            and re.search(settings.SUBMIT_URL_PATTERN, response.url) is not None
+        )
+
+    async def _check_submission_response(self, response) -> bool:
+        """Decide the outcome from the application POST's status and body."""
+        status = response.status
+        body: Any = None
+        if "json" in (response.headers.get("content-type") or ""):
+            try:
+                body = await response.json()
+            except Exception:
+                body = None
+
+        errors = None
+        if isinstance(body, dict):
+            errors = body.get("errors") or body.get("error")
+        if 200 <= status < 300 and not errors:
+            self.success_indicator = f"HTTP {status}"
+            logger.info(f"Application accepted by server (HTTP {status})")
+            return True
+
+        logger.warning(
+            f"Application rejected by server (HTTP {status}): "
+            f"{errors or (await response.text())[:200]}"
+        )
+        return False
+
+    async def _check_confirmation_message(self) -> bool:
+        """Wait for a confirmation message to appear on the page."""
+        confirmation = self.page.locator(
+            '[data-ui*="success"], [data-ui*="thank"], [data-ui*="submitted"]'
+        ).or_(
+            self.page.get_by_role(
+                "heading",
+                name=re.compile(
+                    r"thank you|application (has been )?(submitted|received|sent)",
+                    re.IGNORECASE,
+                ),
+            )
+        )
+        try:
+            await confirmation.first.wait_for(
+                state="visible", timeout=settings.SUBMIT_CONFIRM_TIMEOUT
+            )
+        except Exception:
+            logger.warning("No success indicator found after submission")
+            return False
+
+        self.success_indicator = "confirmation message"
+        logger.info("Application success confirmed by confirmation message")
+        return True
 
     async def _extract_form_fields(self) -> List[Dict[str, Any]]:
         """Extract all form fields and their properties."""
         fields = []
-        form_elements = await self.page.query_selector_all(
-            "form input, form select, form textarea"
-        )
+        async with HandleScope() as handles:
+            form_elements = handles.track_all(
+                await self.page.query_selector_all(
+                    "form input, form select, form textarea"
+                )
+            )
 
-        for element in form_elements:
-            field_info = {
-                "name": await self._get_field_name(element),
-                "type": await element.get_attribute("type"),
-                "required": await element.get_attribute("required") is not None,
-                "placeholder": await element.get_attribute("placeholder"),
-                "label": await self._get_field_label(element),
-                "options": await self._get_field_options(element),
-            }
-            if field_info["name"]:
-                fields.append(field_info)
+            for element in form_elements:
+                field_info = {
+                    "name": await self._get_field_name(element),
+                    "type": await element.get_attribute("type"),
+                    "required": await element.get_attribute("required") is not None,
+                    "placeholder": await element.get_attribute("placeholder"),
+                    "label": await self._get_field_label(element),
+                    "options": await self._get_field_options(element),
+                }
+                if field_info["name"]:
+                    fields.append(field_info)
 
         return fields
 
@@ -391,26 +915,149 @@ class FormHandler:
         except:
             return []
 
+    async def _fill_classified_fields(
+        self, form_fields: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Fill fields whose question the local classifier recognizes and the
+        profile can answer.
+
+        Returns:
+            The fields that still need AI mapping
+        """
+        # Loading may mean training it first, which would stall the page work
+        classifier = await asyncio.to_thread(get_question_classifier)
+        if not classifier:
+            return form_fields
+
+        remaining = []
+        for field_info in form_fields:
+            question = (
+                field_info.get("label")
+                or field_info.get("placeholder")
+                or field_info["name"]
+            )
+            category, confidence = classifier.predict(question)
+
+            answer = None
+            if confidence >= settings.QUESTION_CLASSIFIER_THRESHOLD:
+                answer = self._profile_answers.answer(
+                    category, field_info.get("options")
+                )
+
+            if answer is None:
+                _local_answers.inc(result="miss")
+                remaining.append(field_info)
+                continue
+
+            _local_answers.inc(result="hit")
+            self._classified_questions[field_info["name"]] = (question, category)
+            logger.debug(
+                "Answering {} from profile as {} (confidence {:.2f})",
+                field_info["name"],
+                category,
+                confidence,
+            )
+            await self._schedule_mapped_field(field_info["name"], answer)
+
+        return remaining
+
     async def _fill_fields_with_ai_mapping(self, mapped_fields: Dict[str, Any]):
         """Fill form fields using AI-provided mapping."""
-        for field_name, value in mapped_fields["mapped_fields"].items():
-            try:
-                elements = await self.page.query_selector_all(
-                    f'input[name="{field_name}"], select[name="{field_name}"], textarea[name="{field_name}"]'
+        for field_name, value in (mapped_fields.get("mapped_fields") or {}).items():
+            await self._schedule_mapped_field(field_name, value)
+
+    async def _fill_fields_with_ai_stream(self, form_fields: List[Dict[str, Any]]):
+        """Fill form fields while the AI mapping is still being generated."""
+        async for field_name, value in self.ai_mapper.map_fields_stream(
+            self.metadata, form_fields
+        ):
+            logger.debug(f"AI streamed field: {field_name}")
+            await self._schedule_mapped_field(field_name, value)
+
+    async def _schedule_mapped_field(self, field_name: str, value: Any):
+        """Schedule filling every element matching a field name with a mapped
+        value. Actions run on the fill scheduler; join it to wait for them."""
+        try:
+            elements = self._handles.track_all(
+                await self._find_field_elements(field_name)
+            )
+
+            options = []
+            for element in elements:
+                kind = await element.evaluate(
+                    """el => ({
+                    tag: el.tagName.toLowerCase(),
+                    type: (el.getAttribute('type') || '').toLowerCase(),
+                    role: el.getAttribute('role'),
+                })"""
                 )
 
-                for element in elements:
-                    field_type = await element.get_attribute("type")
+                if kind["type"] in ["radio", "checkbox"]:
+                    # Checked together below: one of them matches the value
+                    options.append(element)
+                    continue
+                elif kind["type"] == "file":
+                    # Other uploads (cover letters, portfolios) are not the resume
+                    if field_name in self._upload_fields or not self._is_resume_field(
+                        field_name
+                    ):
+                        continue
+                    action = partial(self._upload_resume, element)
+                    needs_focus = False
+                elif kind["tag"] == "select":
+                    action = partial(self._select_option, element, value)
+                    needs_focus = False
+                elif kind["role"] == "combobox":
+                    action = partial(self._handle_combobox, element, value, field_name)
+                    needs_focus = True
+                else:
+                    action = partial(element.fill, str(value))
+                    needs_focus = True
 
-                    if field_type in ["radio", "checkbox"]:
-                        await self._handle_radio_checkbox(element, value)
-                    elif await element.get_attribute("role") == "combobox":
-                        await self._handle_combobox(element, value)
-                    else:
-                        await element.fill(str(value))
+                self._scheduler.submit(field_name, action, needs_focus)
+                logger.debug(f"Scheduled field {field_name} with mapped value")
 
-                    self._filled_fields.add(field_name)
-                    logger.debug(f"Filled field {field_name} with AI-mapped value")
+            if options:
+                self._scheduler.submit(
+                    field_name,
+                    partial(self._check_matching_option, field_name, options, value),
+                    needs_focus=True,
+                )
+                logger.debug(f"Scheduled field {field_name} with mapped value")
+
+        except Exception as e:
+            logger.warning(f"Failed to fill field {field_name}: {str(e)}")
 
-            except Exception as e:
-                logger.warning(f"Failed to fill field {field_name}: {str(e)}")
+    async def _find_field_elements(self, field_name: str) -> List[ElementHandle]:
+        """Find the controls named field_name, whichever attribute (name, id,
+        placeholder or label) the name came from."""
+        array = await self.page.evaluate_handle(_FIND_FIELD_ELEMENTS_SCRIPT, field_name)
+        try:
+            properties = await array.get_properties()
+        finally:
+            await array.dispose()
+        return [
+            element
+            for element in (handle.as_element() for handle in properties.values())
+            if element
+        ]
+
+    @property
+    def filled_fields(self) -> Set[str]:
+        """Get the names of the fields filled so far."""
+        return set(self._filled_fields)
+
+    @property
+    def missing_required_fields(self) -> Set[str]:
+        """Get the names of required fields that were not filled or that the
+        page reports as invalid."""
+        return (self._required_fields - self._filled_fields) | self._unresolved_fields
+
+
+def form_fingerprint(form_fields: List[Dict[str, Any]]) -> str:
+    """Hash the names, types and required flags of a form's fields."""
+    layout = sorted(
+        (field_info["name"], field_info.get("type") or "", field_info["required"])
+        for field_info in form_fields
+    )
+    return hashlib.sha1(json.dumps(layout).encode()).hexdigest()[:16]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, List, Optional
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import ElementHandle
+
+logger = get_logger(__name__)
+
+_handles_open = metrics.gauge(
+    "browser_handles_open", "Element handles held by form handlers"
+)
+
+
+class HandleScope:
+    """Keeps track of element handles and disposes them together.
+
+    Element handles pin their DOM nodes in the browser and an object in the
+    Playwright driver until disposed, so every handle obtained for a form is
+    tracked here and released once the form is done with.
+    """
+
+    def __init__(self):
+        self._handles: List[ElementHandle] = []
+
+    def track(self, handle: Optional[ElementHandle]) -> Optional[ElementHandle]:
+        """Track a handle (None is passed through)."""
+        if handle is not None:
+            self._handles.append(handle)
+            _handles_open.inc()
+        return handle
+
+    def track_all(self, handles: Iterable[ElementHandle]) -> List[ElementHandle]:
+        """Track every handle of a query_selector_all result."""
+        return [self.track(handle) for handle in handles]
+
+    async def dispose(self):
+        """Dispose every tracked handle."""
+        handles, self._handles = self._handles, []
+        for handle in handles:
+            try:
+                await handle.dispose()
+            except Exception as e:
+                # Handles of a closed page are already gone
+                logger.debug(f"Failed to dispose element handle: {str(e)}")
+            finally:
+                _handles_open.dec()
+
+    async def __aenter__(self) -> "HandleScope":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.dispose()
+
+    def __len__(self) -> int:
+        return len(self._handles)
@@ -0,0 +1,364 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+import httpx
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+from src.config.settings import settings
+from src.core.batch_runner import BatchJob, BatchResult
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_crawled_jobs = metrics.counter(
+    "crawled_jobs_total", "Job postings found by the crawler, new or already seen"
+)
+
+COMPANY_JOBS_API = "https://apply.workable.com/api/v3/accounts/{company}/jobs"
+COMPANY_JOB_URL = "https://apply.workable.com/{company}/j/{shortcode}/"
+SEARCH_JOBS_API = "https://jobs.workable.com/api/v1/jobs"
+SEARCH_JOB_URL = "https://jobs.workable.com/view/{job_id}"
+
+
+@dataclass(frozen=True)
+class CrawlSource:
+    """A company job board or a job search to crawl for postings."""
+
+    kind: str  # "company" or "search"
+    name: str  # Company account slug, or search query
+    location: Optional[str] = None
+    profile_id: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: str, profile_id: Optional[str] = None) -> "CrawlSource":
+        """
+        Parse a crawl source from the command line.
+
+        Accepts a company board URL (apply.workable.com/<company>), a job
+        search URL (jobs.workable.com/search?query=...&location=...), or a
+        bare company slug.
+        """
+        parsed = urlparse(text if "://" in text else f"https://{text}")
+        path = [part for part in parsed.path.split("/") if part]
+
+        if parsed.netloc == "jobs.workable.com":
+            query = parse_qs(parsed.query)
+            return cls(
+                "search",
+                query.get("query", [""])[0],
+                query.get("location", [None])[0],
+                profile_id,
+            )
+        if parsed.netloc == "apply.workable.com" and path:
+            return cls("company", path[0], profile_id=profile_id)
+        if "." not in text and "/" not in text:
+            return cls("company", text, profile_id=profile_id)
+        raise ValueError(f"Not a Workable job board or search: {text}")
+
+    def __str__(self) -> str:
+        where = f" in {self.location}" if self.location else ""
+        return f"{self.kind} {self.name!r}{where}"
+
+
+class SeenJobStore:
+    """SQLite record of the job IDs the crawler has already applied to, or
+    skipped as not relevant enough.
+
+    Each row's status is ``applied`` or ``skipped``; either way the posting
+    is not handed out again.
+    """
+
+    APPLIED = "applied"
+    SKIPPED = "skipped"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen_jobs ("
+                "job_id TEXT PRIMARY KEY, job_url TEXT NOT NULL, "
+                "source TEXT, first_seen REAL NOT NULL, "
+                f"status TEXT NOT NULL DEFAULT '{self.APPLIED}')"
+            )
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(seen_jobs)")
+            }
+            if "status" not in columns:
+                # Databases from before skipped postings were recorded
+                with connection:
+                    connection.execute(
+                        "ALTER TABLE seen_jobs ADD COLUMN "
+                        f"status TEXT NOT NULL DEFAULT '{self.APPLIED}'"
+                    )
+            self._initialized = True
+        return connection
+
+    def unseen(self, job_ids: Iterable[str]) -> Set[str]:
+        """Get the IDs among job_ids that have not been seen before."""
+        job_ids = list(job_ids)
+        if not job_ids or not self.path.exists():
+            return set(job_ids)
+        with self._lock:
+            connection = self._connect()
+            try:
+                seen = {
+                    row[0]
+                    for row in connection.execute(
+                        "SELECT job_id FROM seen_jobs WHERE job_id IN "
+                        f"({', '.join('?' * len(job_ids))})",
+                        job_ids,
+                    )
+                }
+            finally:
+                connection.close()
+        return set(job_ids) - seen
+
+    def mark(self, job_id: str, job_url: str, source: str, status: str = APPLIED):
+        """Record a job as seen, with its latest status."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT INTO seen_jobs "
+                        "(job_id, job_url, source, first_seen, status) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(job_id) DO UPDATE SET status = excluded.status",
+                        (job_id, job_url, source, time.time(), status),
+                    )
+            finally:
+                connection.close()
+
+    def status(self, job_id: str) -> Optional[str]:
+        """Get the status a job was recorded with, or None if unseen."""
+        if not self.path.exists():
+            return None
+        with self._lock:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT status FROM seen_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+            finally:
+                connection.close()
+        return row[0] if row else None
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class JobCrawler:
+    """Finds new job postings on Workable company boards and job searches.
+
+    Every source is paged through concurrently over one pooled HTTP client,
+    with at most ``concurrency`` listing requests in flight. Postings
+    applied to before are skipped, and a company board stops paging at the
+    first page with nothing new, so repeated crawls only read what changed.
+    New postings are yielded as soon as their page arrives, so applying can
+    start while the crawl is still running.
+
+    A posting is recorded as seen by record_result() once its application
+    succeeds, or once it is skipped for scoring below the batch's
+    ``min_score``, so it is not fetched and scored again every crawl.
+    Failed applications and jobs a stopped run never reached are found
+    again by the next crawl.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SeenJobStore] = None,
+        concurrency: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        record: bool = True,
+    ):
+        self.store = store or SeenJobStore(settings.CRAWLER_DB_PATH)
+        self.concurrency = concurrency or settings.CRAWLER_CONCURRENCY
+        self.max_pages = max_pages or settings.CRAWLER_MAX_PAGES
+        # Dry runs leave the store alone, so postings stay new for real runs
+        self.record = record
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # IDs handed out or waiting in the queue during this crawl
+        self._claimed: Set[str] = set()
+        # Job IDs and sources of the jobs handed out, by job URL
+        self._handed_out: Dict[str, Tuple[str, CrawlSource]] = {}
+
+    async def crawl(self, sources: Iterable[CrawlSource]) -> AsyncIterator[BatchJob]:
+        """
+        Crawl sources for postings not seen before.
+
+        Args:
+            sources: Company boards and searches to crawl
+
+        Yields:
+            A batch job per new posting, as it is found
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 10)
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(15.0),
+            headers={"User-Agent": settings.USER_AGENT, "Accept": "application/json"},
+            follow_redirects=True,
+        ) as client:
+            tasks = [
+                asyncio.ensure_future(self._crawl_source(client, source, queue))
+                for source in sources
+            ]
+            done = asyncio.ensure_future(self._close_when_done(tasks, queue))
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    job, job_id, source = item
+                    self._handed_out[job.job_url] = (job_id, source)
+                    yield job
+            finally:
+                for task in tasks + [done]:
+                    task.cancel()
+                await asyncio.gather(*tasks, done, return_exceptions=True)
+
+    async def record_result(self, result: BatchResult):
+        """Record a crawled job as seen once it has been applied to or
+        skipped as not relevant enough."""
+        handed_out = self._handed_out.pop(result.job_url, None)
+        if not handed_out or not self.record:
+            return
+        if result.success or result.skipped:
+            job_id, source = handed_out
+            status = SeenJobStore.SKIPPED if result.skipped else SeenJobStore.APPLIED
+            await asyncio.to_thread(
+                self.store.mark, job_id, result.job_url, str(source), status
+            )
+
+    @staticmethod
+    async def _close_when_done(tasks: List[asyncio.Future], queue: asyncio.Queue):
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await queue.put(None)
+
+    async def _crawl_source(
+        self, client: httpx.AsyncClient, source: CrawlSource, queue: asyncio.Queue
+    ):
+        token: Optional[str] = None
+        found = 0
+        try:
+            for page in range(self.max_pages):
+                postings, token = await self._fetch_page(client, source, token)
+                new_ids = await asyncio.to_thread(
+                    self.store.unseen, [job_id for job_id, _ in postings]
+                )
+                new_ids -= self._claimed
+                _crawled_jobs.inc(len(new_ids), result="new")
+                _crawled_jobs.inc(len(postings) - len(new_ids), result="seen")
+
+                for job_id, job in postings:
+                    if job_id in new_ids:
+                        self._claimed.add(job_id)
+                        found += 1
+                        await queue.put((job, job_id, source))
+
+                # Company boards list newest first, so a page of known jobs
+                # means the rest was seen by an earlier crawl; searches are
+                # ranked by relevance and are paged through
+                if not token or (source.kind == "company" and postings and not new_ids):
+                    break
+        except Exception as e:
+            logger.error(f"Crawling {source} failed: {str(e)}")
+        logger.info(f"Crawled {source}: {found} new job(s)")
+
+    async def _fetch_page(
+        self, client: httpx.AsyncClient, source: CrawlSource, token: Optional[str]
+    ) -> Tuple[List[Tuple[str, BatchJob]], Optional[str]]:
+        """
+        Fetch one listing page of a source.
+
+        Returns:
+            (job_id, batch job) pairs of the page, and the next page token
+        """
+        if source.kind == "company":
+            body: Dict[str, Any] = {
+                "query": "",
+                "location": [],
+                "department": [],
+                "worktype": [],
+                "remote": [],
+            }
+            if token:
+                body["token"] = token
+            data = await self._request(
+                client,
+                "POST",
+                COMPANY_JOBS_API.format(company=source.name),
+                json=body,
+            )
+            postings = [
+                (
+                    job["shortcode"],
+                    BatchJob(
+                        COMPANY_JOB_URL.format(
+                            company=source.name, shortcode=job["shortcode"]
+                        ),
+                        source.profile_id,
+                        title=job.get("title"),
+                        description=job.get("department"),
+                    ),
+                )
+                for job in data.get("results", [])
+            ]
+            return postings, data.get("nextPage")
+
+        params = {"query": source.name}
+        if source.location:
+            params["location"] = source.location
+        if token:
+            params["pageToken"] = token
+        data = await self._request(client, "GET", SEARCH_JOBS_API, params=params)
+        postings = [
+            (
+                job["id"],
+                BatchJob(
+                    job.get("url") or SEARCH_JOB_URL.format(job_id=job["id"]),
+                    source.profile_id,
+                    title=job.get("title"),
+                    description=job.get("description"),
+                ),
+            )
+            for job in data.get("jobs", [])
+        ]
+        return postings, data.get("nextPageToken")
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    )
+    async def _request(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs
+    ) -> Dict[str, Any]:
+        async with self._semaphore:
+            response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json()
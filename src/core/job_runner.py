@@ -0,0 +1,233 @@
+import asyncio
+import atexit
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobStatus:
+    """Lifecycle states of a queued application."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+@dataclass
+class ApplicationJob:
+    """A job application submitted through the runner."""
+
+    id: str
+    job_url: str
+    metadata_path: str
+    profile_id: str = "default"
+    status: str = JobStatus.QUEUED
+    phase: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        """Serialize the job for the API."""
+        data = asdict(self)
+        if not include_events:
+            data.pop("events")
+        return data
+
+
+class JobRunner:
+    """Runs job applications on a background event loop.
+
+    Submitting returns a job ID immediately; applications run on a
+    dedicated thread with at most ``max_workers`` in flight. Progress is
+    recorded as events that callers can poll or wait on.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_history: int = 500):
+        self.max_workers = max_workers or settings.UI_MAX_WORKERS
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, ApplicationJob]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stop_registered = False
+
+    def start(self):
+        """Start the background event loop thread if it is not running."""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="job-runner", daemon=True
+            )
+            self._thread.start()
+            if not self._stop_registered:
+                # Close the LLM clients on their own loop before the process exits
+                atexit.register(self.stop)
+                self._stop_registered = True
+            logger.info(f"Job runner started with {self.max_workers} worker(s)")
+
+    def stop(self):
+        """Close the LLM clients and stop the background event loop.
+
+        Registered to run at interpreter exit once the runner has started.
+        """
+        if self._loop and self._thread:
+            from src.utils.llm_backends import close_llm_clients
+
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    close_llm_clients(), self._loop
+                ).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Could not close the LLM clients: {str(e)}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def submit(
+        self,
+        job_url: str,
+        metadata_path: Optional[str] = None,
+        profile_id: str = "default",
+    ) -> str:
+        """
+        Queue a job application.
+
+        Args:
+            job_url: URL of the job posting
+            metadata_path: Path to the user metadata JSON file
+            profile_id: ID of the profile the metadata belongs to
+
+        Returns:
+            The ID of the queued job
+        """
+        self.start()
+        job = ApplicationJob(
+            id=uuid.uuid4().hex[:12],
+            job_url=job_url,
+            metadata_path=str(metadata_path or settings.USER_METADATA_PATH),
+            profile_id=profile_id,
+        )
+        with self._condition:
+            self._jobs[job.id] = job
+            self._prune_history()
+        self._record_event(job, JobStatus.QUEUED)
+
+        asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+        logger.info(f"Queued application {job.id} for {job_url}")
+        return job.id
+
+    async def _run(self, job: ApplicationJob):
+        # Imported here so the UI starts without loading the browser stack
+        from src.core.application_manager import JobApplicationManager
+
+        async with self._semaphore:
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            self._record_event(job, JobStatus.RUNNING)
+
+            try:
+                settings.validate(metadata_paths=[job.metadata_path])
+                manager = JobApplicationManager(
+                    job.job_url,
+                    job.metadata_path,
+                    on_progress=lambda phase: self._record_event(job, phase),
+                    profile_id=job.profile_id,
+                    application_id=job.id,
+                )
+                success = await manager.apply_to_job()
+                job.status = JobStatus.SUCCEEDED if success else JobStatus.FAILED
+                if not success:
+                    job.error = "Application submission may have failed"
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+                logger.error(f"Application {job.id} failed: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                self._record_event(job, job.status)
+
+    def _record_event(self, job: ApplicationJob, phase: str):
+        """Record a progress event and wake up anyone waiting on the job."""
+        with self._condition:
+            if phase not in JobStatus.FINISHED and phase != JobStatus.QUEUED:
+                job.phase = phase
+            job.events.append(
+                {"index": len(job.events), "phase": phase, "time": time.time()}
+            )
+            self._condition.notify_all()
+
+    def _prune_history(self):
+        """Forget the oldest finished jobs beyond the history limit."""
+        excess = len(self._jobs) - self.max_history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in JobStatus.FINISHED:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[ApplicationJob]:
+        """Get a job by ID."""
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[ApplicationJob]:
+        """Get all known jobs, most recent first."""
+        with self._condition:
+            return list(reversed(self._jobs.values()))
+
+    def wait_for_events(
+        self, job_id: str, since: int, timeout: float = 15.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Block until a job has events newer than ``since`` or the timeout passes.
+
+        Returns:
+            The new events, possibly empty
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if not job:
+                return []
+            self._condition.wait_for(
+                lambda: len(job.events) > since or job.status in JobStatus.FINISHED,
+                timeout=timeout,
+            )
+            return job.events[since:]
+
+    @property
+    def in_flight_count(self) -> int:
+        """Get the number of running applications."""
+        with self._condition:
+            return sum(
+                1 for job in self._jobs.values() if job.status == JobStatus.RUNNING
+            )
+
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Get the job runner shared by the UI process."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner()
+    return _job_runner
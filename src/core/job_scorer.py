@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.text_features import vectorize
+
+logger = get_logger(__name__)
+
+# Share of the score from the best-matching relevant job title, the skills
+# and the industries of the profile
+TITLE_WEIGHT = 0.6
+SKILLS_WEIGHT = 0.25
+INDUSTRIES_WEIGHT = 0.15
+
+
+def title_from_url(job_url: str) -> Optional[str]:
+    """
+    Recover the job title from the slug of a jobs.workable.com URL, e.g.
+    /view/<id>/senior-java-developer-(hybrid)-in-auburn-hills-at-detroit-labs.
+
+    Returns:
+        The title words, or None if the URL has no slug
+    """
+    parts = [part for part in urlparse(job_url).path.split("/") if part]
+    if "view" not in parts[:-2]:
+        return None
+    slug = unquote(parts[-1]).rsplit("-at-", 1)[0].rsplit("-in-", 1)[0]
+    return re.sub(r"[-_()]+", " ", slug).strip() or None
+
+
+class JobScorer:
+    """Scores job postings by relevance to a profile.
+
+    Postings and the profile's relevant job titles, skills and industries are
+    embedded as hashed n-gram vectors, so a whole list of postings is scored
+    with a few matrix products. Scores are in [0, 1].
+    """
+
+    def __init__(self, metadata: Dict[str, Any]):
+        titles = [t for t in metadata.get("relevant_job_titles") or [] if t]
+        skills = " ".join(metadata.get("skills") or [])
+        industries = " ".join(metadata.get("industries") or [])
+
+        self._titles = vectorize(titles) if titles else None
+        self._skills = vectorize([skills])[0] if skills.strip() else None
+        self._industries = vectorize([industries])[0] if industries.strip() else None
+
+        weights = [
+            TITLE_WEIGHT if self._titles is not None else 0.0,
+            SKILLS_WEIGHT if self._skills is not None else 0.0,
+            INDUSTRIES_WEIGHT if self._industries is not None else 0.0,
+        ]
+        total = sum(weights)
+        # Renormalized over what the profile has, so scores stay comparable
+        self._weights = [w / total for w in weights] if total else weights
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the profile has anything to score postings against."""
+        return any(self._weights)
+
+    def score(
+        self, titles: Sequence[str], descriptions: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Score job postings.
+
+        Args:
+            titles: Posting titles
+            descriptions: Posting descriptions, aligned with titles (optional)
+
+        Returns:
+            A float32 array with one score per posting
+        """
+        if not titles:
+            return np.zeros(0, dtype=np.float32)
+        descriptions = descriptions or [""] * len(titles)
+
+        title_vectors = vectorize(titles)
+        # Skills and industries are matched against the whole posting
+        text_vectors = vectorize(
+            f"{title} {description or ''}"
+            for title, description in zip(titles, descriptions)
+        )
+
+        scores = np.zeros(len(titles), dtype=np.float32)
+        if self._titles is not None:
+            scores += self._weights[0] * (title_vectors @ self._titles.T).max(axis=1)
+        if self._skills is not None:
+            scores += self._weights[1] * (text_vectors @ self._skills)
+        if self._industries is not None:
+            scores += self._weights[2] * (text_vectors @ self._industries)
+        return scores
+
+    def score_one(self, title: str, description: Optional[str] = None) -> float:
+        """Score a single job posting."""
+        return float(self.score([title], [description or ""])[0])
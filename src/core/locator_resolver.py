@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence
+from urllib.parse import urlparse
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
+
+logger = get_logger(__name__)
+
+_resolutions = metrics.counter(
+    "locator_resolutions_total",
+    "Widget lookups by whether the page template's memoized candidate matched",
+)
+
+# Returns the index of the first candidate with a visible match and the index
+# of that match among the elements of its CSS selector, or null
+_RESOLVE_SCRIPT = """candidates => {
+    const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    for (let i = 0; i < candidates.length; i++) {
+        const { css, text, exact } = candidates[i];
+        const elements = document.querySelectorAll(css);
+        for (let j = 0; j < elements.length; j++) {
+            const el = elements[j];
+            const content = (el.innerText || el.textContent || "").trim().toLowerCase();
+            if (text && !(exact ? content === text : content.includes(text))) {
+                continue;
+            }
+            if (visible(el)) {
+                return [i, j];
+            }
+        }
+    }
+    return null;
+}"""
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A CSS selector, optionally narrowed to elements containing some text,
+    or with exactly that text (case-insensitive)."""
+
+    css: str
+    text: Optional[str] = None
+    exact: bool = False
+
+    def locator(self, page: Page, match: int = 0) -> Locator:
+        """
+        Get a locator for one element of the CSS selector.
+
+        Args:
+            page: The page to search
+            match: Index of the element among those of the CSS selector,
+                e.g. the visible one the text matched
+        """
+        return page.locator(self.css).nth(match)
+
+
+def page_template(url: str) -> str:
+    """Reduce a URL to its page template: the host and the path with
+    ID-like segments replaced by *."""
+    parsed = urlparse(url)
+    segments = [
+        "*" if re.search(r"\d", segment) or len(segment) > 24 else segment
+        for segment in parsed.path.split("/")
+        if segment
+    ]
+    return f"{parsed.netloc}/{'/'.join(segments)}"
+
+
+class LocatorResolver:
+    """Finds the first visible match of a prioritized candidate list in a
+    single in-page call.
+
+    The winning candidate is memoized per page template and tried first next
+    time, so known layouts resolve on the first candidate. Only the
+    ``max_templates`` most recently resolved templates are remembered.
+    """
+
+    def __init__(
+        self,
+        widget: str,
+        candidates: Sequence[Candidate],
+        max_templates: int = 256,
+    ):
+        self.widget = widget
+        self.candidates = list(candidates)
+        self.max_templates = max_templates
+        # Winning candidate per page template, least recently used first
+        self._memo: "OrderedDict[str, Candidate]" = OrderedDict()
+
+    async def resolve(self, page: Page) -> Optional[Locator]:
+        """
+        Resolve the widget on a page.
+
+        Args:
+            page: The page to search
+
+        Returns:
+            A locator for the first visible match of the first candidate
+            that has one, or None if none matches
+        """
+        template = page_template(page.url)
+        remembered = self._memo.get(template)
+        ordered: List[Candidate] = self.candidates
+        if remembered:
+            ordered = [remembered] + [c for c in self.candidates if c != remembered]
+
+        found = await page.evaluate(
+            _RESOLVE_SCRIPT,
+            [
+                {
+                    "css": c.css,
+                    "text": c.text.lower() if c.text else None,
+                    "exact": c.exact,
+                }
+                for c in ordered
+            ],
+        )
+        if found is None:
+            _resolutions.inc(widget=self.widget, result="none")
+            logger.debug(f"No {self.widget} found on {template}")
+            return None
+
+        index, match = found
+        _resolutions.inc(
+            widget=self.widget,
+            result="hit" if remembered and index == 0 else "miss",
+        )
+        self._remember(template, ordered[index])
+        return ordered[index].locator(page, match)
+
+    def _remember(self, template: str, candidate: Candidate):
+        """Memoize a template's winning candidate, forgetting the least
+        recently resolved template beyond the limit."""
+        self._memo[template] = candidate
+        self._memo.move_to_end(template)
+        while len(self._memo) > self.max_templates:
+            self._memo.popitem(last=False)
+
+
+# Links only count if they act as buttons or read just "Apply" outside the
+# footer and navigation, so "How to apply" and footer links are never clicked
+# (nor memoized for the template)
+APPLY_BUTTON = LocatorResolver(
+    "apply_button",
+    [
+        Candidate('button[data-ui="overview-apply-now"]'),
+        Candidate('a[role="button"]', "Apply"),
+        Candidate("button", "Apply"),
+        Candidate("a:not(footer a, nav a)", "Apply", exact=True),
+    ],
+)
+
+SUBMIT_BUTTON = LocatorResolver(
+    "submit_button",
+    [
+        Candidate('button[type="submit"]'),
+        Candidate('input[type="submit"]'),
+        Candidate("button", "Submit"),
+    ],
+)
+
+# Only buttons inside the form, so page navigation is never mistaken for it
+NEXT_STEP_BUTTON = LocatorResolver(
+    "next_step_button",
+    [
+        Candidate('form button[data-ui*="next"]'),
+        Candidate("form button", "Next"),
+        Candidate("form button", "Continue"),
+    ],
+)
+
+COOKIE_CONSENT = LocatorResolver(
+    "cookie_consent",
+    [
+        Candidate('button[data-ui="cookie-consent-accept"]'),
+        Candidate("button", "Accept all"),
+        Candidate("button", "Accept"),
+    ],
+)
@@ -0,0 +1,107 @@
+from typing import Dict, Any, List, Optional, Tuple
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProfileAnswers:
+    """Deterministic answers to common screening questions, taken from the
+    user profile."""
+
+    # Answer memos shared across applications, one per profile
+    _memos: Dict[str, "ProfileAnswers"] = {}
+
+    def __init__(self, user_metadata: Dict[str, Any]):
+        self.metadata = user_metadata
+        self._memo: Dict[Tuple[str, Tuple[str, ...]], Optional[str]] = {}
+
+    @classmethod
+    def for_profile(
+        cls, profile_id: str, user_metadata: Dict[str, Any]
+    ) -> "ProfileAnswers":
+        """Get the memoized answers of a profile, rebuilt when it changes."""
+        answers = cls._memos.get(profile_id)
+        if answers is None or answers.metadata != user_metadata:
+            answers = cls(user_metadata)
+            cls._memos[profile_id] = answers
+        return answers
+
+    def answer(
+        self, category: str, options: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        Answer a question of the given category from the profile.
+
+        Args:
+            category: The question category from the classifier
+            options: The field's selectable options, if any
+
+        Returns:
+            The answer, or None if the profile cannot answer it
+        """
+        key = (category, tuple(options or ()))
+        if key not in self._memo:
+            self._memo[key] = self._resolve(category, options)
+        return self._memo[key]
+
+    def _resolve(
+        self, category: str, options: Optional[List[str]] = None
+    ) -> Optional[str]:
+        resolver = getattr(self, f"_answer_{category}", None)
+        if not resolver:
+            return None
+
+        try:
+            answer = resolver()
+        except (KeyError, TypeError, IndexError) as e:
+            logger.debug(f"Profile has no answer for {category}: {str(e)}")
+            return None
+
+        if answer in (None, ""):
+            return None
+        if options:
+            return self._match_option(str(answer), options)
+        return str(answer)
+
+    def _answer_work_auth(self) -> Optional[str]:
+        return _yes_no(self.metadata.get("work_authorization"))
+
+    def _answer_visa_sponsor(self) -> Optional[str]:
+        return _yes_no(self.metadata.get("requires_sponsorship"))
+
+    def _answer_salary(self) -> Optional[str]:
+        return self.metadata.get("user_salary")
+
+    def _answer_experience(self) -> Optional[str]:
+        return self.metadata.get("years_of_experience")
+
+    def _answer_location(self) -> Optional[str]:
+        address = self.metadata["contact_information"]["current_address"]
+        parts = [address.get(key) for key in ("city", "state", "country")]
+        return ", ".join(part for part in parts if part)
+
+    def _answer_referral(self) -> Optional[str]:
+        return self.metadata.get("referral_source")
+
+    def _answer_education(self) -> Optional[str]:
+        education = self.metadata["education"][0]
+        return f"{education['degree']} in {education['field_of_study']}"
+
+    @staticmethod
+    def _match_option(answer: str, options: List[str]) -> Optional[str]:
+        """Pick the option matching the answer, if there is one."""
+        answer = answer.strip().lower()
+        for option in options:
+            if option.strip().lower() == answer:
+                return option
+        for option in options:
+            if option.strip().lower().startswith(answer):
+                return option
+        return None
+
+
+def _yes_no(value: Any) -> Optional[str]:
+    """Normalize a profile flag to "Yes"/"No"."""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return value
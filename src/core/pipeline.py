@@ -0,0 +1,83 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_stage_busy = metrics.gauge(
+    "pipeline_stage_busy", "Applications currently in each pipeline stage"
+)
+_stage_wait_seconds = metrics.histogram(
+    "pipeline_stage_wait_seconds", "Time applications waited to enter each stage"
+)
+
+# Application stages, in order: opening the job page, solving its captcha and
+# working out the form's answers (network-bound); filling the form in the
+# browser; submitting it
+STAGES = ("prepare", "fill", "submit")
+
+
+class PipelineStages:
+    """Bounds how many applications are in each stage at once.
+
+    With more applications in flight than fill slots, the extra ones prepare
+    their forms while earlier ones fill and submit, and wait for a fill slot
+    with every answer ready, so the browser is not left idle on network-bound
+    work.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        unknown = set(limits) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+        self.limits = dict(limits)
+        self._semaphores = {
+            stage: asyncio.Semaphore(limit) for stage, limit in limits.items()
+        }
+
+    @classmethod
+    def for_batch(cls, concurrency: int, prefetch: int) -> "PipelineStages":
+        """
+        Stage limits for a batch filling ``concurrency`` forms at once.
+
+        Args:
+            concurrency: Applications filling or submitting at once
+            prefetch: Applications prepared ahead of a free fill slot
+        """
+        return cls(
+            {
+                "prepare": concurrency + prefetch,
+                "fill": concurrency,
+                "submit": concurrency,
+            }
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Get the most applications the stages can hold at once."""
+        return max(self.limits.values())
+
+    def is_full(self, stage: str) -> bool:
+        """Whether entering a stage would have to wait."""
+        semaphore = self._semaphores.get(stage)
+        return semaphore is not None and semaphore.locked()
+
+    @asynccontextmanager
+    async def stage(self, stage: str) -> AsyncIterator[None]:
+        """Hold a slot of a stage (stages without a limit are unbounded)."""
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            yield
+            return
+
+        started = time.perf_counter()
+        async with semaphore:
+            _stage_wait_seconds.observe(time.perf_counter() - started, stage=stage)
+            _stage_busy.inc(stage=stage)
+            try:
+                yield
+            finally:
+                _stage_busy.dec(stage=stage)
@@ -0,0 +1,233 @@
+import copy
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ProfileListener = Callable[[int, Dict[str, Any]], None]
+
+
+class ProfileStore:
+    """In-process store for a user profile JSON file.
+
+    Reads are served from memory and only re-parse the file when its mtime
+    or size changes. Writes go to a temporary file that is renamed over the
+    original, so readers never see a partially written profile. Every change
+    bumps a version counter and notifies subscribers.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._version = 0
+        self._listeners: List[ProfileListener] = []
+
+    def load(self) -> Dict[str, Any]:
+        """Get a copy of the profile, re-reading the file only if it changed."""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Get the current version together with a copy of the profile."""
+        with self._lock:
+            self._refresh()
+            return self._version, copy.deepcopy(self._data or {})
+
+    def save(self, data: Dict[str, Any]):
+        """Atomically replace the profile file."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp creates the file 0600; keep the profile's own mode
+                os.chmod(tmp_path, self._file_mode())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+            self._signature = self._stat()
+            self._set_data(copy.deepcopy(data))
+            logger.info(f"Saved profile {self.path} (version {self._version})")
+
+    def subscribe(self, listener: ProfileListener) -> Callable[[], None]:
+        """
+        Call ``listener(version, data)`` whenever the profile changes.
+
+        Returns:
+            A function that removes the listener
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _refresh(self):
+        """Reload the file if its mtime or size differs from the cached copy."""
+        signature = self._stat()
+        if signature is None:
+            if self._data is None:
+                self._data = {}
+            return
+        if signature == self._signature:
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid profile JSON in {self.path}: {str(e)}")
+            if self._data is None:
+                self._data = {}
+            return
+
+        self._signature = signature
+        self._set_data(data)
+        logger.debug(f"Loaded profile {self.path} (version {self._version})")
+
+    def _set_data(self, data: Dict[str, Any]):
+        self._data = data
+        self._version += 1
+        for listener in list(self._listeners):
+            try:
+                listener(self._version, copy.deepcopy(data))
+            except Exception as e:
+                logger.warning(f"Profile listener failed: {str(e)}")
+
+    def _file_mode(self) -> int:
+        """Get the permission bits of the profile file, or those a new file
+        gets under the process umask."""
+        try:
+            return stat.S_IMODE(self.path.stat().st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def version(self) -> int:
+        """Get the version of the profile, refreshing from disk if needed."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+
+_stores: Dict[Path, ProfileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_profile_store(path: Path) -> ProfileStore:
+    """Get the store shared by everything in this process for a profile file."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ProfileStore(key)
+            _stores[key] = store
+        return store
+
+
+class ProfileDirectory:
+    """Index of the candidate profiles available to the bot.
+
+    Profiles live in a directory alongside an ``index.json`` of the form::
+
+        {
+            "default": "john-doe",
+            "profiles": {
+                "john-doe": {"file": "john-doe.json", "label": "John Doe"}
+            }
+        }
+
+    Without an index, the single ``USER_METADATA_PATH`` profile is exposed
+    under the ID "default".
+    """
+
+    FALLBACK_ID = "default"
+
+    def __init__(self, root: Path, fallback_path: Path):
+        self.root = Path(root)
+        self.fallback_path = Path(fallback_path)
+
+    def _index(self) -> Dict[str, Any]:
+        index = get_profile_store(self.root / "index.json").load()
+        if not index.get("profiles"):
+            return {
+                "default": self.FALLBACK_ID,
+                "profiles": {
+                    self.FALLBACK_ID: {
+                        "file": str(self.fallback_path),
+                        "label": "Default",
+                    }
+                },
+            }
+        return index
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Get the ID, label and path of every profile."""
+        return [
+            {
+                "id": profile_id,
+                "label": entry.get("label", profile_id),
+                "path": str(self._resolve(entry["file"])),
+            }
+            for profile_id, entry in self._index()["profiles"].items()
+        ]
+
+    def default_id(self) -> str:
+        """Get the ID of the profile used when none is selected."""
+        index = self._index()
+        return index.get("default") or next(iter(index["profiles"]))
+
+    def path_for(self, profile_id: Optional[str] = None) -> Path:
+        """
+        Get the metadata file of a profile.
+
+        Raises:
+            KeyError: If the profile is not in the index
+        """
+        profile_id = profile_id or self.default_id()
+        profiles = self._index()["profiles"]
+        if profile_id not in profiles:
+            raise KeyError(f"Unknown profile: {profile_id}")
+        return self._resolve(profiles[profile_id]["file"])
+
+    def store_for(self, profile_id: Optional[str] = None) -> ProfileStore:
+        """Get the shared store of a profile."""
+        return get_profile_store(self.path_for(profile_id))
+
+    def _resolve(self, file: str) -> Path:
+        path = Path(file)
+        return path if path.is_absolute() else self.root / path
+
+
+def get_profile_directory() -> ProfileDirectory:
+    """Get the profile directory configured in settings."""
+    return ProfileDirectory(settings.PROFILES_DIR, settings.USER_METADATA_PATH)
@@ -0,0 +1,304 @@
+import argparse
+import json
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    application_id TEXT PRIMARY KEY,
+    profile_id TEXT,
+    job_url TEXT NOT NULL,
+    job_id TEXT,
+    company TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    form_fingerprint TEXT,
+    filled_fields TEXT,
+    missing_required_fields TEXT,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    captcha_seconds REAL,
+    success_indicator TEXT
+);
+CREATE TABLE IF NOT EXISTS application_phases (
+    application_id TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_company ON applications (company);
+CREATE INDEX IF NOT EXISTS idx_phases_phase ON application_phases (phase);
+"""
+
+
+def parse_job_url(job_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract the job ID and company from a Workable job URL.
+
+    Handles apply.workable.com/<company>/j/<job_id>/ and
+    jobs.workable.com/view/<job_id>/<title>-at-<company> URLs.
+
+    Returns:
+        (job_id, company), either of which may be None
+    """
+    parsed = urlparse(job_url)
+    parts = [unquote(part) for part in parsed.path.split("/") if part]
+
+    if parsed.netloc.startswith("apply.") and parts:
+        job_id = parts[parts.index("j") + 1] if "j" in parts[:-1] else None
+        return job_id, parts[0]
+
+    if "view" in parts[:-1]:
+        job_id = parts[parts.index("view") + 1]
+        slug = parts[-1] if parts[-1] != job_id else ""
+        company = slug.rsplit("-at-", 1)[1] if "-at-" in slug else None
+        return job_id, company.replace("-", " ") if company else None
+
+    return None, None
+
+
+@dataclass
+class ApplicationResult:
+    """Outcome record of one job application."""
+
+    application_id: str
+    job_url: str
+    outcome: str
+    started_at: float
+    finished_at: float
+    profile_id: Optional[str] = None
+    job_id: Optional[str] = None
+    company: Optional[str] = None
+    error: Optional[str] = None
+    form_fingerprint: Optional[str] = None
+    filled_fields: List[str] = field(default_factory=list)
+    missing_required_fields: List[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    captcha_seconds: float = 0.0
+    success_indicator: Optional[str] = None
+    phase_durations: Dict[str, float] = field(default_factory=dict)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+
+class ResultStore:
+    """Append-only SQLite store of application results."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            # Readers (the query CLI) never block writers, and vice versa
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        self._initialized = True
+
+    def record(self, result: ApplicationResult):
+        """Append an application result."""
+        row = asdict(result)
+        phases = row.pop("phase_durations")
+        row["filled_fields"] = json.dumps(sorted(row["filled_fields"]))
+        row["missing_required_fields"] = json.dumps(
+            sorted(row["missing_required_fields"])
+        )
+
+        with self._lock:
+            self._ensure_schema()
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        f"INSERT INTO applications ({', '.join(row)}) "
+                        f"VALUES ({', '.join('?' * len(row))})",
+                        list(row.values()),
+                    )
+                    connection.executemany(
+                        "INSERT INTO application_phases VALUES (?, ?, ?)",
+                        [
+                            (result.application_id, phase, seconds)
+                            for phase, seconds in phases.items()
+                        ],
+                    )
+            finally:
+                connection.close()
+        logger.debug(f"Recorded result of application {result.application_id}")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        if not self.path.exists():
+            return []
+        with self._lock:
+            self._ensure_schema()
+            connection = self._connect()
+            try:
+                return connection.execute(sql, params).fetchall()
+            finally:
+                connection.close()
+
+    def success_rate_by(
+        self, column: str, since: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Success rate of real (not dry-run) applications grouped by a column.
+
+        Args:
+            column: One of company, profile_id, form_fingerprint, job_id
+            since: Only count applications started after this timestamp
+
+        Returns:
+            One row per group, most attempted first
+        """
+        if column not in ("company", "profile_id", "form_fingerprint", "job_id"):
+            raise ValueError(f"Cannot group results by {column!r}")
+
+        rows = self._query(
+            f"""
+            SELECT {column} AS name,
+                   COUNT(*) AS attempts,
+                   SUM(outcome = 'success') AS succeeded,
+                   AVG(prompt_tokens + completion_tokens) AS avg_tokens,
+                   AVG(finished_at - started_at) AS avg_seconds
+            FROM applications
+            WHERE outcome != 'dry_run' AND started_at >= ?
+            GROUP BY {column}
+            ORDER BY attempts DESC, name
+            """,
+            (since or 0,),
+        )
+        return [
+            {**dict(row), "success_rate": row["succeeded"] / row["attempts"]}
+            for row in rows
+        ]
+
+    def phase_percentiles(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Duration percentiles of each application phase, over real (not
+        dry-run) applications.
+
+        Args:
+            since: Only count applications started after this timestamp
+
+        Returns:
+            One row per phase, slowest p95 first
+        """
+        rows = self._query(
+            """
+            SELECT p.phase, p.seconds
+            FROM application_phases p
+            JOIN applications a USING (application_id)
+            WHERE a.outcome != 'dry_run' AND a.started_at >= ?
+            ORDER BY p.phase, p.seconds
+            """,
+            (since or 0,),
+        )
+
+        by_phase: Dict[str, List[float]] = {}
+        for row in rows:
+            by_phase.setdefault(row["phase"], []).append(row["seconds"])
+
+        stats = [
+            {
+                "phase": phase,
+                "count": len(seconds),
+                "p50": _percentile(seconds, 0.5),
+                "p95": _percentile(seconds, 0.95),
+                "max": seconds[-1],
+            }
+            for phase, seconds in by_phase.items()
+        ]
+        return sorted(stats, key=lambda row: row["p95"], reverse=True)
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    """Get the result store at settings.RESULTS_DB_PATH."""
+    global _store
+    if _store is None:
+        _store = ResultStore(settings.RESULTS_DB_PATH)
+    return _store
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: List[str]):
+    def cell(value):
+        if isinstance(value, float):
+            return f"{value:.3f}" if value < 1 else f"{value:.2f}"
+        return "-" if value is None else str(value)
+
+    table = [columns] + [[cell(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    for line in table:
+        print("  ".join(value.ljust(width) for value, width in zip(line, widths)))
+
+
+def cli():
+    """Command line interface for aggregate queries over application results."""
+    parser = argparse.ArgumentParser(description="Query stored application results")
+    parser.add_argument(
+        "report",
+        choices=["company", "profile", "form", "phases"],
+        help="Success rate by company, profile or form layout, or phase latency",
+    )
+    parser.add_argument(
+        "--since-days",
+        type=float,
+        help="Only include applications from the last N days",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=settings.RESULTS_DB_PATH,
+        help="Path to the results database",
+    )
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    since = time.time() - args.since_days * 86400 if args.since_days else None
+
+    if args.report == "phases":
+        _print_table(
+            store.phase_percentiles(since), ["phase", "count", "p50", "p95", "max"]
+        )
+        return
+
+    column = {
+        "company": "company",
+        "profile": "profile_id",
+        "form": "form_fingerprint",
+    }[args.report]
+    _print_table(
+        store.success_rate_by(column, since),
+        ["name", "attempts", "succeeded", "success_rate", "avg_tokens", "avg_seconds"],
+    )
+
+
+if __name__ == "__main__":
+    cli()
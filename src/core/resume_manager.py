@@ -0,0 +1,175 @@
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+from src.config.settings import settings, BASE_DIR
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+from src.utils.text_features import tokenize
+
+logger = get_logger(__name__)
+
+_uploads = metrics.counter("resume_uploads_total", "Resume uploads by result")
+
+# Supported resume formats and the leading bytes each must start with
+RESUME_TYPES = {
+    ".pdf": ("application/pdf", b"%PDF"),
+    ".docx": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        b"PK\x03\x04",
+    ),
+    ".doc": ("application/msword", b"\xd0\xcf\x11\xe0"),
+}
+
+# Filename words that say nothing about the role a resume targets
+_GENERIC_WORDS = {"resume", "cv", "curriculum", "vitae", "final", "latest", "v1", "v2"}
+
+
+@dataclass
+class ResumeAsset:
+    """A validated resume held in memory."""
+
+    path: Path
+    mime_type: str
+    checksum: str
+    data: bytes = field(repr=False)
+    keywords: Set[str] = field(default_factory=set)
+
+    def payload(self) -> Dict[str, Any]:
+        """Get the file payload accepted by Playwright's set_input_files."""
+        return {"name": self.path.name, "mimeType": self.mime_type, "buffer": self.data}
+
+
+class ResumeManager:
+    """Validates a profile's resumes once and serves them from memory.
+
+    A profile's own ``resume_path`` and the variants listed in its
+    ``resume_variants`` are read, validated and checksummed on first use.
+    Uploads then pass in-memory buffers, and the variant whose filename best
+    matches the job title is chosen per job. Only the files the profile names
+    are ever considered, so one profile can never upload another's resume.
+    """
+
+    def __init__(self, profile_id: str = "default"):
+        self.profile_id = profile_id
+        self._assets: Dict[Path, ResumeAsset] = {}
+        self._rejected: Set[Path] = set()
+        self._upload_count = 0
+        self._failed_upload_count = 0
+
+    def add(self, path: Path) -> Optional[ResumeAsset]:
+        """Validate and cache a single resume file."""
+        path = Path(path)
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        path = path.resolve()
+        if path in self._assets:
+            return self._assets[path]
+        if path in self._rejected:
+            return None
+
+        resume_type = RESUME_TYPES.get(path.suffix.lower())
+        if not resume_type or not path.is_file():
+            self._rejected.add(path)
+            return None
+
+        mime_type, magic = resume_type
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Failed to read resume {path}: {str(e)}")
+            return None
+
+        if not data.startswith(magic):
+            logger.warning(f"Skipping resume with invalid content: {path}")
+            self._rejected.add(path)
+            return None
+        if len(data) > settings.RESUME_MAX_BYTES:
+            logger.warning(f"Skipping resume over the size limit: {path}")
+            self._rejected.add(path)
+            return None
+
+        asset = ResumeAsset(
+            path=path,
+            mime_type=mime_type,
+            checksum=hashlib.sha256(data).hexdigest(),
+            data=data,
+            keywords=set(tokenize(path.stem)) - _GENERIC_WORDS,
+        )
+        self._assets[path] = asset
+        logger.debug(f"Cached resume {path.name} (sha256 {asset.checksum[:12]})")
+        return asset
+
+    def select(
+        self,
+        job_title: Optional[str] = None,
+        default_path: Optional[str] = None,
+        variant_paths: Optional[List[str]] = None,
+    ) -> Optional[ResumeAsset]:
+        """
+        Pick the profile's resume variant for a job.
+
+        Args:
+            job_title: Title of the job being applied to
+            default_path: The profile's resume_path, used when no variant matches
+            variant_paths: The profile's resume_variants
+
+        Returns:
+            The chosen resume, or None if the profile has no valid resume
+        """
+        default = self.add(Path(default_path)) if default_path else None
+        variants = [self.add(Path(path)) for path in variant_paths or []]
+        variants = [asset for asset in variants if asset]
+
+        title_words = set(tokenize(job_title or ""))
+        best, best_score = None, 0
+        for asset in variants:
+            score = len(asset.keywords & title_words)
+            if score > best_score:
+                best, best_score = asset, score
+
+        return best or default or (variants[0] if variants else None)
+
+    def record_upload(self, success: bool):
+        """Record the outcome of a resume upload."""
+        _uploads.inc(result="success" if success else "failure")
+        if success:
+            self._upload_count += 1
+        else:
+            self._failed_upload_count += 1
+
+    @property
+    def asset_count(self) -> int:
+        """Get the number of cached resumes."""
+        return len(self._assets)
+
+    @property
+    def upload_count(self) -> int:
+        """Get the total number of successful uploads."""
+        return self._upload_count
+
+    @property
+    def failed_upload_count(self) -> int:
+        """Get the total number of failed uploads."""
+        return self._failed_upload_count
+
+    @property
+    def upload_success_rate(self) -> float:
+        """Calculate the success rate of resume uploads."""
+        total = self._upload_count + self._failed_upload_count
+        return self._upload_count / total if total > 0 else 0.0
+
+
+_resume_managers: Dict[str, ResumeManager] = {}
+_resume_managers_lock = threading.Lock()
+
+
+def get_resume_manager(profile_id: str = "default") -> ResumeManager:
+    """Get the resume manager shared by everything in this process for a profile."""
+    with _resume_managers_lock:
+        manager = _resume_managers.get(profile_id)
+        if manager is None:
+            manager = ResumeManager(profile_id)
+            _resume_managers[profile_id] = manager
+        return manager
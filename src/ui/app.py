@@ -3,38 +3,55 @@ import sys
 sys.path.append("..")
 sys.path.append(".")
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, url_for
+import argparse
+import gzip
 import json
 import os
 from pathlib import Path
 from src.config.settings import settings
+from src.core.job_runner import JobStatus, get_job_runner
+from src.core.profile_store import get_profile_directory
+from src.utils.metrics import metrics
 
 app = Flask(__name__)
 
-# Update path to use settings
-USER_METADATA_FILE = str(settings.USER_METADATA_PATH)
+# Responses worth compressing
+GZIP_MIMETYPES = {
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/json",
+    "application/javascript",
+}
+GZIP_MIN_SIZE = 500
+
+
+def selected_profile(values=None):
+    """Get the profile chosen in the request, falling back to the default."""
+    profiles = get_profile_directory()
+    profile_id = (values if values is not None else request.values).get("profile")
+    known = {profile["id"] for profile in profiles.list_profiles()}
+    return profile_id if profile_id in known else profiles.default_id()
 
 
 # Load user metadata
-def load_metadata():
-    if not os.path.exists(USER_METADATA_FILE):
-        return {}
-    try:
-        with open(USER_METADATA_FILE, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {}
+def load_metadata(profile_id=None):
+    return get_profile_directory().store_for(profile_id).load()
 
 
 # Save metadata to file
-def save_metadata(data):
-    with open(USER_METADATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+def save_metadata(data, profile_id=None):
+    get_profile_directory().store_for(profile_id).save(data)
 
 
-def apply_to_job(job_url):
-    print(f"Applying to job: {job_url}")
-    return "Application submitted successfully!"
+def apply_to_job(job_url, profile_id=None):
+    """Queue an application on the background job runner."""
+    profiles = get_profile_directory()
+    profile_id = profile_id or profiles.default_id()
+    return get_job_runner().submit(
+        job_url, str(profiles.path_for(profile_id)), profile_id
+    )
 
 
 def process_metadata(form_data, existing_metadata=None):
@@ -102,6 +119,9 @@ def process_metadata(form_data, existing_metadata=None):
         "user_salary": form_data.get(
             "user_salary", existing_metadata.get("user_salary", "")
         ),
+        "work_authorization": existing_metadata.get("work_authorization"),
+        "requires_sponsorship": existing_metadata.get("requires_sponsorship"),
+        "referral_source": existing_metadata.get("referral_source"),
         "experience": [],
     }
 
@@ -159,7 +179,8 @@ def process_metadata(form_data, existing_metadata=None):
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    metadata = load_metadata()
+    profile_id = selected_profile()
+    metadata = load_metadata(profile_id)
     message = None
     message_type = "success"
 
@@ -168,7 +189,7 @@ def index():
             try:
                 # Process the form data while preserving existing metadata
                 new_metadata = process_metadata(request.form, metadata)
-                save_metadata(new_metadata)
+                save_metadata(new_metadata, profile_id)
                 metadata = new_metadata
                 message = "Profile updated successfully!"
             except Exception as e:
@@ -180,8 +201,8 @@ def index():
             job_url = request.form.get("job_url", "").strip()
             if job_url:
                 try:
-                    print(f"Applying to job: {job_url}")
-                    message = "Application submitted successfully!"
+                    job_id = apply_to_job(job_url, profile_id)
+                    message = f"Application queued (job {job_id})."
                 except Exception as e:
                     message = f"Error: {str(e)}"
                     message_type = "danger"
@@ -190,13 +211,168 @@ def index():
                 message_type = "danger"
 
     return render_template(
-        "index.html", message=message, message_type=message_type, metadata=metadata
+        "index.html",
+        message=message,
+        message_type=message_type,
+        metadata=metadata,
+        profiles=get_profile_directory().list_profiles(),
+        profile_id=profile_id,
+    )
+
+
+@app.route("/jobs", methods=["GET", "POST"])
+def jobs():
+    """Queue an application, or list known applications."""
+    runner = get_job_runner()
+    if request.method == "GET":
+        return jsonify([job.to_dict() for job in runner.list_jobs()])
+
+    payload = request.get_json(silent=True) or request.form
+    job_url = (payload.get("job_url") or "").strip()
+    if not job_url:
+        return jsonify({"error": "Please enter a valid job URL."}), 400
+
+    job_id = apply_to_job(job_url, selected_profile(payload))
+    return (
+        jsonify(
+            {
+                "job_id": job_id,
+                "status_url": url_for("job_status", job_id=job_id),
+                "events_url": url_for("job_events", job_id=job_id),
+            }
+        ),
+        202,
+    )
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Poll the status of a queued application."""
+    job = get_job_runner().get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict(include_events=True))
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Stream progress of a queued application as server-sent events."""
+    runner = get_job_runner()
+    if not runner.get(job_id):
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream():
+        since = 0
+        while True:
+            events = runner.wait_for_events(job_id, since)
+            for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
+            since += len(events)
+
+            job = runner.get(job_id)
+            if not job or (
+                job.status in JobStatus.FINISHED and since >= len(job.events)
+            ):
+                return
+            if not events:
+                # Keep the connection alive through long phases
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(
+        metrics.to_prometheus(), mimetype="text/plain; version=0.0.4; charset=utf-8"
     )
 
 
-def run_app():
-    app.run(debug=True, host="0.0.0.0", port=8080)
+@app.route("/api/metrics")
+def api_metrics():
+    """Expose metrics as JSON for the dashboard."""
+    runner = get_job_runner()
+    return jsonify(
+        {
+            "metrics": metrics.snapshot(),
+            "jobs": {
+                "in_flight": runner.in_flight_count,
+                "known": len(runner.list_jobs()),
+            },
+        }
+    )
+
+
+@app.route("/dashboard")
+def dashboard():
+    """Live throughput dashboard."""
+    return render_template("dashboard.html")
+
+
+@app.after_request
+def finalize_response(response):
+    """Add caching headers and gzip compression."""
+    if request.endpoint == "dashboard":
+        # The dashboard page is static; its data comes from /api/metrics
+        response.cache_control.public = True
+        response.cache_control.max_age = 300
+    elif request.endpoint == "index" and request.method == "GET":
+        # Let browsers revalidate the page cheaply instead of re-downloading it
+        response.cache_control.no_cache = True
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    elif response.mimetype in ("application/json", "text/event-stream"):
+        response.cache_control.no_store = True
+
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or not 200 <= response.status_code < 300
+        or response.mimetype not in GZIP_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def run_app(production: bool = False):
+    if not production:
+        app.run(debug=True, host="0.0.0.0", port=8080)
+        return
+
+    # Threads rather than processes: queued jobs and metrics live in-process
+    from waitress import serve
+
+    serve(
+        app,
+        host=settings.UI_HOST,
+        port=settings.UI_PORT,
+        threads=settings.UI_THREADS,
+        ident=None,
+    )
 
 
 if __name__ == "__main__":
-    run_app()
+    parser = argparse.ArgumentParser(description="Workable Job Application Bot UI")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        default=settings.UI_PRODUCTION,
+        help="Serve with a multi-threaded production server instead of the "
+        "Flask development server",
+    )
+    run_app(parser.parse_args().production)
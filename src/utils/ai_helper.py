@@ -1,50 +1,430 @@
-from openai import OpenAI
-from typing import Dict, Any, List
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, AsyncIterator, Set, Tuple
 import json
 from src.config.settings import settings
+from src.utils.json_stream import MappedFieldsStreamParser
+from src.utils.llm_backends import LLMRouter, LLMUnavailableError, get_llm_router
 from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
+_llm_requests = metrics.counter("llm_requests_total", "LLM completions sent by mode")
+_llm_tokens = metrics.counter("llm_tokens_total", "LLM tokens spent by kind")
+_batched_forms = metrics.counter(
+    "ai_batched_forms_total", "Forms mapped through multi-form batched completions"
+)
+_cache_lookups = metrics.counter(
+    "ai_mapping_cache_total", "AI mapping cache lookups by result"
+)
+
+SYSTEM_PROMPT = """You are an expert at mapping job application data and answering application questions.
+                    You will receive user metadata and form fields, and you should:
+                    1. Map the user data to the appropriate form fields
+                    2. Generate appropriate responses for questions not covered by the metadata
+                    3. Return the results in a valid JSON format
+                    Be professional and honest in generating responses."""
+
+
+@dataclass
+class _PendingMapping:
+    """A field set waiting for the next batched mapping request."""
+
+    form_fields: List[Dict[str, Any]]
+    future: asyncio.Future = field(repr=False)
+
+
+# Batched requests share a profile and the LLM router they are sent through
+_BatchKey = Tuple[str, Any]
+
+
+class MappingBatcher:
+    """Collects mapping requests arriving within a short window and sends
+    them as a single completion with the user profile included once.
+
+    Requests are grouped by profile and LLM router, so only field sets for
+    the same user going to the same backends share a prompt. Each waiting
+    caller receives its own slice of the batched answer.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self._window = window
+        self._max_size = max(1, max_size)
+        self._pending: Dict[_BatchKey, List[_PendingMapping]] = {}
+        self._profiles: Dict[_BatchKey, Dict[str, Any]] = {}
+        # The mapper sending each batch: the first one to join it
+        self._senders: Dict[_BatchKey, "AIFieldMapper"] = {}
+        self._timers: Dict[_BatchKey, asyncio.TimerHandle] = {}
+        # Sends in flight, referenced so they are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        self._batch_count = 0
+        self._request_count = 0
+
+    async def submit(
+        self,
+        mapper: "AIFieldMapper",
+        user_metadata: Dict[str, Any],
+        form_fields: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Queue a field set and wait for its share of the batched answer."""
+        loop = asyncio.get_running_loop()
+        key = (_profile_key(user_metadata), mapper.router)
+        pending = _PendingMapping(form_fields, loop.create_future())
+
+        bucket = self._pending.setdefault(key, [])
+        bucket.append(pending)
+        self._profiles[key] = user_metadata
+        self._senders.setdefault(key, mapper)
+        self._request_count += 1
+
+        if len(bucket) >= self._max_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self._window, self._flush, key)
+
+        return await pending.future
+
+    def _flush(self, key: _BatchKey):
+        """Send everything queued for a profile."""
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        batch = self._pending.pop(key, [])
+        user_metadata = self._profiles.pop(key, None)
+        sender = self._senders.pop(key, None)
+        if batch:
+            self._batch_count += 1
+            task = asyncio.ensure_future(self._send(sender, user_metadata, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self,
+        mapper: "AIFieldMapper",
+        user_metadata: Dict[str, Any],
+        batch: List[_PendingMapping],
+    ):
+        try:
+            if len(batch) == 1:
+                results = [
+                    await mapper._request_mapping(user_metadata, batch[0].form_fields)
+                ]
+            else:
+                logger.debug(f"Sending batched mapping for {len(batch)} forms")
+                _batched_forms.inc(len(batch))
+                results = await mapper._request_batch_mapping(
+                    user_metadata, [pending.form_fields for pending in batch]
+                )
+        except Exception as e:
+            # Every waiting caller gets the error, as an unbatched call would
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    @property
+    def batch_count(self) -> int:
+        """Get the number of completions sent."""
+        return self._batch_count
+
+    @property
+    def request_count(self) -> int:
+        """Get the number of field sets submitted."""
+        return self._request_count
+
+
+def _profile_key(user_metadata: Dict[str, Any]) -> str:
+    """Stable key identifying a user profile."""
+    payload = json.dumps(user_metadata, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class MappingCache:
+    """LRU cache of AI mapping answers, with a separate namespace per profile.
+
+    Entries are keyed by the profile content and the form's fields, so an
+    edited profile never receives answers generated for its old version.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._namespaces: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        namespace: str,
+        user_metadata: Dict[str, Any],
+        form_fields: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Get a cached mapping, if any."""
+        key = _mapping_key(user_metadata, form_fields)
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if entries is None or key not in entries:
+                _cache_lookups.inc(result="miss")
+                return None
+            entries.move_to_end(key)
+            _cache_lookups.inc(result="hit")
+            return entries[key]
+
+    def put(
+        self,
+        namespace: str,
+        user_metadata: Dict[str, Any],
+        form_fields: List[Dict[str, Any]],
+        mapped_fields: Dict[str, Any],
+    ):
+        """Cache a mapping, evicting the namespace's oldest entry when full."""
+        if not mapped_fields or self.max_entries <= 0:
+            return
+        key = _mapping_key(user_metadata, form_fields)
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = mapped_fields
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def clear(self, namespace: Optional[str] = None):
+        """Forget one namespace, or everything."""
+        with self._lock:
+            if namespace is None:
+                self._namespaces.clear()
+            else:
+                self._namespaces.pop(namespace, None)
+
+
+def _mapping_key(
+    user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
+) -> str:
+    payload = json.dumps(form_fields, sort_keys=True, default=str)
+    fields_key = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return f"{_profile_key(user_metadata)}:{fields_key}"
+
+
+# Token counts of the application running in the current context
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
+
+
+def track_token_usage() -> Dict[str, int]:
+    """
+    Start counting the tokens spent by completions issued from the current
+    context (and tasks or threads started from it).
+
+    A batched completion is counted for the request that opened the batch.
+
+    Returns:
+        A {"prompt": n, "completion": n} dict updated as completions finish
+    """
+    usage = {"prompt": 0, "completion": 0}
+    _usage.set(usage)
+    return usage
+
+
+def _record_usage(usage: Any):
+    """Count the tokens reported for a completion."""
+    if not usage:
+        return
+    _llm_tokens.inc(usage.prompt_tokens or 0, kind="prompt")
+    _llm_tokens.inc(usage.completion_tokens or 0, kind="completion")
+
+    tracked = _usage.get()
+    if tracked is not None:
+        tracked["prompt"] += usage.prompt_tokens or 0
+        tracked["completion"] += usage.completion_tokens or 0
+
 
 class AIFieldMapper:
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    # One batcher per event loop, shared by every mapper in the process and
+    # dropped with its loop
+    _batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MappingBatcher]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _batchers_lock = threading.Lock()
+    # Answers shared by every mapper in the process, namespaced per profile
+    cache = MappingCache(settings.AI_MAPPING_CACHE_SIZE)
+
+    def __init__(self, namespace: str = "default", router: Optional[LLMRouter] = None):
+        self.namespace = namespace
+        self._router = router
+
+    @property
+    def router(self) -> LLMRouter:
+        return self._router or get_llm_router()
 
     async def map_fields(
         self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Map user metadata to form fields using AI."""
+        try:
+            cached = self.cache.get(self.namespace, user_metadata, form_fields)
+            if cached is not None:
+                return cached
+
+            batcher = self._get_batcher()
+            if batcher:
+                mapped_fields = await batcher.submit(self, user_metadata, form_fields)
+            else:
+                mapped_fields = await self._request_mapping(user_metadata, form_fields)
+
+            self.cache.put(self.namespace, user_metadata, form_fields, mapped_fields)
+            return mapped_fields
+
+        except LLMUnavailableError:
+            # Not an answer for this form: every backend is failing
+            raise
+        except Exception as e:
+            logger.error(f"Error in AI field mapping: {str(e)}")
+            return {}
+
+    async def map_fields_stream(
+        self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Map fields with a streamed completion, yielding each (field, value)
+        pair as soon as the model has finished generating it.
+
+        Streamed requests are never batched, since each caller consumes its
+        own response as it arrives.
+        """
+        cached = self.cache.get(self.namespace, user_metadata, form_fields)
+        if cached is not None:
+            for pair in cached.get("mapped_fields", {}).items():
+                yield pair
+            return
+
+        prompt = self._construct_mapping_prompt(user_metadata, form_fields)
+        stream = self.router.stream(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.7,
+            stream_options={"include_usage": True},
+        )
+        parser = MappedFieldsStreamParser()
+        streamed: Dict[str, Any] = {}
+        try:
+            _llm_requests.inc(mode="stream")
+            async for chunk in stream:
+                _record_usage(getattr(chunk, "usage", None))
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                for field_name, value in parser.feed(delta):
+                    streamed[field_name] = value
+                    yield field_name, value
+
+            # Fall back to a full parse if the answer did not follow the format
+            # or the parser could not follow it to the end
+            if not parser.is_done:
+                parsed = json.loads(parser.text).get("mapped_fields", {})
+                for field_name, value in parsed.items():
+                    if streamed.get(field_name, object()) != value:
+                        yield field_name, value
+                streamed = {**streamed, **parsed}
+
+            if streamed:
+                self.cache.put(
+                    self.namespace,
+                    user_metadata,
+                    form_fields,
+                    {"mapped_fields": streamed},
+                )
+
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in streamed AI field mapping: {str(e)}")
+        finally:
+            # Closes the response if the caller stopped early
+            await stream.aclose()
+
+    def _get_batcher(self) -> Optional[MappingBatcher]:
+        """Get the batcher for the running event loop, if batching is enabled."""
+        if settings.AI_BATCH_WINDOW_MS <= 0:
+            return None
+
+        loop = asyncio.get_running_loop()
+        with self._batchers_lock:
+            batcher = self._batchers.get(loop)
+            if batcher is None:
+                batcher = MappingBatcher(
+                    settings.AI_BATCH_WINDOW_MS / 1000, settings.AI_BATCH_MAX_SIZE
+                )
+                self._batchers[loop] = batcher
+        return batcher
+
+    async def _request_mapping(
+        self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Send a mapping request for a single form."""
         try:
             # Construct the prompt
             prompt = self._construct_mapping_prompt(user_metadata, form_fields)
 
-            completion = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert at mapping job application data and answering application questions.
-                    You will receive user metadata and form fields, and you should:
-                    1. Map the user data to the appropriate form fields
-                    2. Generate appropriate responses for questions not covered by the metadata
-                    3. Return the results in a valid JSON format
-                    Be professional and honest in generating responses.""",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-            )
+            response = await self._complete(prompt)
 
             # Parse the response
-            response = completion.choices[0].message.content
             mapped_fields = json.loads(response)
             return mapped_fields
 
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error in AI field mapping: {str(e)}")
             return {}
 
+    async def _request_batch_mapping(
+        self,
+        user_metadata: Dict[str, Any],
+        form_field_sets: List[List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Send one mapping request covering several forms for the same user."""
+        prompt = self._construct_batch_mapping_prompt(user_metadata, form_field_sets)
+        response = await self._complete(prompt, json_mode=True, mode="batch")
+
+        forms = json.loads(response).get("forms", {})
+        results = []
+        for index in range(len(form_field_sets)):
+            result = forms.get(f"form_{index}")
+            if not isinstance(result, dict):
+                logger.warning(f"Batched mapping returned no answer for form_{index}")
+                result = {}
+            results.append(result)
+        return results
+
+    async def _complete(
+        self, prompt: str, json_mode: bool = False, mode: str = "single"
+    ) -> str:
+        """Run a chat completion on the LLM backends."""
+        options = {}
+        if json_mode:
+            options["response_format"] = {"type": "json_object"}
+
+        completion = await self.router.complete(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.7,
+            **options,
+        )
+        _llm_requests.inc(mode=mode)
+        _record_usage(completion.usage)
+        return completion.choices[0].message.content
+
     def _construct_mapping_prompt(
         self, user_metadata: Dict[str, Any], form_fields: List[Dict[str, Any]]
     ) -> str:
@@ -79,3 +459,51 @@ class AIFieldMapper:
             }}
         }}
         """
+
+    def _construct_batch_mapping_prompt(
+        self,
+        user_metadata: Dict[str, Any],
+        form_field_sets: List[List[Dict[str, Any]]],
+    ) -> str:
+        """Construct a prompt covering several forms, with the metadata given once."""
+        forms = {
+            f"form_{index}": form_fields
+            for index, form_fields in enumerate(form_field_sets)
+        }
+        return f"""
+        I have a user's job application metadata and several application forms,
+        each with specific fields and questions. The forms are independent job
+        applications for the same user.
+        Please help map the data and generate appropriate responses for each form.
+
+        User Metadata:
+        {json.dumps(user_metadata, indent=2)}
+
+        Forms (keyed by form id):
+        {json.dumps(forms, indent=2)}
+
+        Please provide a JSON response that, for every form id:
+        1. Maps user data to form fields where applicable
+        2. Generates appropriate responses for questions not covered by the metadata
+        3. Follows the exact format of that form's fields
+
+        Format the response as a JSON object where:
+        - "forms" holds one entry per form id
+        - Each entry's keys are the field names from that form
+        - Values are either mapped data from user metadata or generated responses
+        - Include explanations for generated responses in a separate "explanations" field
+
+        Example format:
+        {{
+            "forms": {{
+                "form_0": {{
+                    "mapped_fields": {{
+                        "field_name": "mapped_or_generated_value"
+                    }},
+                    "explanations": {{
+                        "field_name": "explanation for generated value"
+                    }}
+                }}
+            }}
+        }}
+        """
@@ -0,0 +1,94 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s*")
+# Characters that can follow a complete number or literal
+_DELIMITERS = frozenset(",}] \t\r\n")
+
+
+class MappedFieldsStreamParser:
+    """Incrementally parses a streamed mapping response.
+
+    Text is fed in as it arrives and every ``field: value`` pair inside the
+    ``mapped_fields`` object is returned as soon as it is complete, without
+    waiting for the rest of the document.
+    """
+
+    def __init__(self, key: str = "mapped_fields"):
+        self._object_start = re.compile(r'"%s"\s*:\s*\{' % re.escape(key))
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._done = False
+        self._pair_count = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add streamed text and return the pairs completed by it."""
+        self._buffer += chunk
+        pairs = []
+        if self._done:
+            return pairs
+
+        if self._pos is None:
+            match = self._object_start.search(self._buffer)
+            if not match:
+                return pairs
+            self._pos = match.end()
+
+        buffer = self._buffer
+        while True:
+            pos = self._skip_whitespace(self._pos)
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ",":
+                self._pos = pos + 1
+                continue
+            if buffer[pos] == "}":
+                self._done = True
+                break
+
+            try:
+                key, end = self._decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break
+            colon = self._skip_whitespace(end)
+            if colon >= len(buffer) or buffer[colon] != ":":
+                break
+            value_start = self._skip_whitespace(colon + 1)
+            if value_start >= len(buffer):
+                break
+            try:
+                value, value_end = self._decoder.raw_decode(buffer, value_start)
+            except ValueError:
+                break
+            # Numbers and literals may still be growing ("3." then "5") until
+            # a delimiter arrives
+            if not isinstance(value, (str, dict, list)) and (
+                value_end >= len(buffer) or buffer[value_end] not in _DELIMITERS
+            ):
+                break
+
+            pairs.append((str(key), value))
+            self._pair_count += 1
+            self._pos = value_end
+
+        return pairs
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self._buffer, pos).end()
+
+    @property
+    def text(self) -> str:
+        """Get all text received so far."""
+        return self._buffer
+
+    @property
+    def pair_count(self) -> int:
+        """Get the number of pairs emitted so far."""
+        return self._pair_count
+
+    @property
+    def is_done(self) -> bool:
+        """Check if the mapped fields object has been closed."""
+        return self._done
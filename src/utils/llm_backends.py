@@ -0,0 +1,428 @@
+import asyncio
+import math
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence
+from src.config.settings import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_backend_requests = metrics.counter(
+    "llm_backend_requests_total", "LLM requests per backend by result"
+)
+_backend_seconds = metrics.histogram(
+    "llm_backend_latency_seconds", "Latency of successful LLM requests per backend"
+)
+_circuit_open = metrics.gauge(
+    "llm_circuit_open", "Whether each LLM backend's circuit breaker is open (1)"
+)
+_hedges = metrics.counter(
+    "llm_hedged_requests_total", "Hedged LLM requests by which request answered"
+)
+
+# Latencies kept per backend to estimate when a request is running late
+LATENCY_WINDOW = 200
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when no LLM backend can take a request."""
+
+
+class CircuitBreaker:
+    """Stops sending requests to a backend that keeps failing.
+
+    After ``max_failures`` failures in a row the circuit opens for
+    ``cooldown`` seconds, then lets a single trial request through: its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, max_failures: int, cooldown: float):
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and not self._cooled_down()
+
+    @property
+    def ready(self) -> bool:
+        """Whether allow() would let a request through."""
+        with self._lock:
+            return self._opened_at is None or (
+                self._cooled_down() and not self._trial_running
+            )
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the trial when half-open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._cooled_down() or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def abandon(self):
+        """Forget a request that ended without an outcome, e.g. cancelled."""
+        with self._lock:
+            self._trial_running = False
+
+    def record(self, ok: bool) -> bool:
+        """
+        Record the outcome of a request.
+
+        Returns:
+            Whether the circuit is open afterwards
+        """
+        with self._lock:
+            self._trial_running = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+            else:
+                self._failures += 1
+                if self._opened_at is not None or self._failures >= self.max_failures:
+                    self._opened_at = time.monotonic()
+            return self._opened_at is not None
+
+    def _cooled_down(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.cooldown
+
+
+@dataclass
+class LLMBackend:
+    """An OpenAI-compatible chat completion endpoint and model."""
+
+    name: str
+    model: str
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    timeout: float = 30.0
+    breaker: CircuitBreaker = field(
+        default_factory=lambda: CircuitBreaker(
+            settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS
+        ),
+        repr=False,
+    )
+    _latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW), repr=False
+    )
+    # Clients per event loop, since their connections belong to one loop
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = field(
+        default_factory=weakref.WeakKeyDictionary, repr=False
+    )
+
+    @classmethod
+    def parse(cls, spec: str) -> "LLMBackend":
+        """
+        Parse a backend from ``name:model[@base_url]``.
+
+        The API key is read from ``<NAME>_API_KEY`` and the timeout from
+        ``<NAME>_TIMEOUT_SECONDS`` (falling back to LLM_TIMEOUT_SECONDS).
+        Only backends on the OpenAI API itself (no base URL) fall back to
+        OPENAI_API_KEY, so it is never sent to another provider.
+        """
+        name, _, rest = spec.strip().partition(":")
+        model, _, base_url = rest.partition("@")
+        if not name or not model:
+            raise ValueError(f"Invalid LLM backend (expected name:model[@url]): {spec}")
+        prefix = name.upper().replace("-", "_")
+        return cls(
+            name=name,
+            model=model,
+            base_url=base_url or None,
+            api_key=os.getenv(f"{prefix}_API_KEY")
+            or (None if base_url else settings.OPENAI_API_KEY),
+            timeout=float(
+                os.getenv(f"{prefix}_TIMEOUT_SECONDS", settings.LLM_TIMEOUT_SECONDS)
+            ),
+        )
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            # Imported here: the openai package alone takes most of startup
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(
+                # Local servers take any key, but the client requires one
+                api_key=self.api_key or "unused",
+                base_url=self.base_url,
+                timeout=self.timeout,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the running loop's client and its connections."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def latency_quantile(self, quantile: float, min_samples: int) -> Optional[float]:
+        """Get a quantile of recent latencies, or None with too few samples."""
+        if len(self._latencies) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(math.ceil(quantile * len(ordered)) - 1, len(ordered) - 1)]
+
+    async def complete(self, **request) -> Any:
+        """Run a chat completion, within the backend's timeout."""
+        self._claim()
+        start = time.perf_counter()
+        try:
+            completion = await asyncio.wait_for(
+                self.client.chat.completions.create(model=self.model, **request),
+                self.timeout,
+            )
+        except asyncio.CancelledError:
+            # A hedged request that lost says nothing about the backend
+            _backend_requests.inc(backend=self.name, result="cancelled")
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self._latencies.append(elapsed)
+        self.breaker.record(True)
+        _circuit_open.set(0, backend=self.name)
+        _backend_requests.inc(backend=self.name, result="ok")
+        _backend_seconds.observe(elapsed, backend=self.name)
+        return completion
+
+    async def stream(self, **request) -> Any:
+        """Open a streamed chat completion, within the backend's timeout."""
+        self._claim()
+        try:
+            stream = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=self.model, stream=True, **request
+                ),
+                self.timeout,
+            )
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        self.breaker.record(True)
+        _circuit_open.set(0, backend=self.name)
+        _backend_requests.inc(backend=self.name, result="ok")
+        return stream
+
+    def _claim(self):
+        if not self.breaker.allow():
+            raise LLMUnavailableError(f"LLM backend {self.name} circuit is open")
+
+    def _record_failure(self, error: Exception):
+        status = getattr(error, "status_code", None)
+        if status and 400 <= status < 500 and status not in (408, 429):
+            # The request was rejected, which says nothing about the backend
+            _backend_requests.inc(backend=self.name, result="rejected")
+            self.breaker.abandon()
+            return
+
+        timed_out = isinstance(error, asyncio.TimeoutError)
+        _backend_requests.inc(
+            backend=self.name, result="timeout" if timed_out else "error"
+        )
+        if self.breaker.record(False):
+            _circuit_open.set(1, backend=self.name)
+            logger.warning(f"LLM backend {self.name} failing; circuit open")
+        reason = f"timed out after {self.timeout:.0f}s" if timed_out else str(error)
+        logger.warning(f"LLM backend {self.name} request failed: {reason}")
+
+
+class LLMRouter:
+    """Sends chat completions to the first LLM backend whose circuit is closed.
+
+    A request still running past its backend's recent latency quantile
+    (p90 by default) is hedged: the same request goes to the next backend
+    (or the same one again if there is only one) and whichever answers first
+    is used, the other cancelled. A request that fails moves on to the next
+    backend.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[LLMBackend],
+        hedge_quantile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+    ):
+        if not backends:
+            raise ValueError("An LLM router needs at least one backend")
+        self.backends = list(backends)
+        self.hedge_quantile = (
+            settings.LLM_HEDGE_QUANTILE if hedge_quantile is None else hedge_quantile
+        )
+        self.hedge_min_samples = (
+            settings.LLM_HEDGE_MIN_SAMPLES
+            if hedge_min_samples is None
+            else hedge_min_samples
+        )
+
+    def _available(self) -> List[LLMBackend]:
+        available = [backend for backend in self.backends if backend.breaker.ready]
+        if not available:
+            raise LLMUnavailableError(
+                "Every LLM backend is failing: "
+                + ", ".join(backend.name for backend in self.backends)
+            )
+        return available
+
+    def _hedge_delay(self, backend: LLMBackend) -> Optional[float]:
+        if not 0 < self.hedge_quantile < 1:
+            return None
+        return backend.latency_quantile(self.hedge_quantile, self.hedge_min_samples)
+
+    async def complete(self, **request) -> Any:
+        """
+        Run a chat completion on the backends, hedging slow requests and
+        failing over on errors.
+
+        Args:
+            **request: Chat completion parameters other than the model
+
+        Returns:
+            The first completion received
+        """
+        backends = self._available()
+        untried = list(backends)
+        pending: Dict[asyncio.Task, LLMBackend] = {}
+
+        def launch(backend: LLMBackend):
+            if backend in untried:
+                untried.remove(backend)
+            pending[asyncio.ensure_future(backend.complete(**request))] = backend
+
+        launch(untried[0])
+        primary = next(iter(pending))
+        hedge = None
+        hedge_at = self._hedge_delay(backends[0])
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None if hedged or hedge_at is None else hedge_at
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    backend = untried[0] if untried else backends[0]
+                    logger.debug(
+                        f"LLM request slower than {hedge_at:.1f}s; hedging on "
+                        f"{backend.name}"
+                    )
+                    launch(backend)
+                    hedge = next(task for task in pending if task is not primary)
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        if hedge is not None:
+                            _hedges.inc(
+                                answered_by=(
+                                    "primary"
+                                    if task is primary
+                                    else "hedge"
+                                    if task is hedge
+                                    else "failover"
+                                )
+                            )
+                        return task.result()
+                    error = task.exception()
+                if not pending and untried:
+                    # A hedge is only worth it while the primary is running
+                    hedged = True
+                    launch(untried[0])
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def stream(self, **request) -> AsyncIterator[Any]:
+        """
+        Stream a chat completion from the first backend that opens the stream.
+
+        Streams are not hedged, since their output is consumed as it arrives.
+
+        Args:
+            **request: Chat completion parameters other than the model
+        """
+        error: Optional[Exception] = None
+        for backend in self._available():
+            try:
+                stream = await backend.stream(**request)
+            except Exception as e:
+                error = e
+                continue
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.close()
+            return
+        raise error
+
+    async def aclose(self):
+        """Close the clients the running loop opened to the backends."""
+        for backend in self.backends:
+            await backend.aclose()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get the recent latency and circuit state of every backend."""
+        rows = []
+        for backend in self.backends:
+            p50 = backend.latency_quantile(0.5, 1)
+            p90 = backend.latency_quantile(0.9, 1)
+            rows.append(
+                {
+                    "backend": backend.name,
+                    "model": backend.model,
+                    "circuit_open": backend.breaker.is_open,
+                    "p50_seconds": round(p50, 3) if p50 is not None else None,
+                    "p90_seconds": round(p90, 3) if p90 is not None else None,
+                }
+            )
+        return rows
+
+
+def load_backends(specs: Optional[str] = None) -> List[LLMBackend]:
+    """Parse comma-separated backend specs (LLM_BACKENDS by default)."""
+    specs = settings.LLM_BACKENDS if specs is None else specs
+    return [LLMBackend.parse(spec) for spec in specs.split(",") if spec.strip()]
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+async def close_llm_clients():
+    """Close the shared router's clients of the running loop, once the loop
+    has no more completions to run."""
+    if _router is not None:
+        await _router.aclose()
+
+
+def get_llm_router() -> LLMRouter:
+    """Get the router over LLM_BACKENDS shared by the process."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter(load_backends())
+        return _router
@@ -0,0 +1,246 @@
+"""Local OpenAI-compatible chat completion server with canned answers.
+
+Answers every field of a mapping prompt (or returns canned responses) after a
+configurable latency, so the AI mapping path can be load-tested offline:
+
+    python -m src.utils.llm_stub --port 8089 --latency-ms 300 --tail-ms 3000
+    LLM_BACKENDS=stub:stub@http://127.0.0.1:8089/v1 python main.py ...
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from flask import Flask, Response, jsonify, request
+
+# Where the mapping prompts of AIFieldMapper give the fields to answer
+_SINGLE_FORM_MARKER = "Form Fields and Questions:"
+_BATCH_MARKER = "Forms (keyed by form id):"
+
+
+@dataclass
+class StubBehavior:
+    """How the stub answers: base latency, a slow tail and failures."""
+
+    latency: float = 0.2
+    # Latency of the share ``tail_rate`` of requests that are slow
+    tail_latency: float = 0.0
+    tail_rate: float = 0.0
+    fail_rate: float = 0.0
+    # Answers returned in turn instead of ones built from the prompt
+    responses: List[Any] = field(default_factory=list)
+    rng: random.Random = field(default_factory=random.Random)
+
+    def delay(self) -> float:
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            return self.tail_latency
+        return self.latency
+
+
+def _answer_fields(form_fields: Any) -> Dict[str, Any]:
+    mapped = {}
+    for form_field in form_fields if isinstance(form_fields, list) else []:
+        name = form_field.get("name") if isinstance(form_field, dict) else None
+        if not name:
+            continue
+        options = form_field.get("options")
+        mapped[name] = options[0] if options else f"Stub answer for {name}"
+    return {"mapped_fields": mapped, "explanations": {}}
+
+
+def _json_after(prompt: str, marker: str) -> Any:
+    index = prompt.find(marker)
+    if index < 0:
+        return None
+    start = min(
+        (i for i in (prompt.find("[", index), prompt.find("{", index)) if i >= 0),
+        default=-1,
+    )
+    if start < 0:
+        return None
+    try:
+        return json.JSONDecoder().raw_decode(prompt, start)[0]
+    except ValueError:
+        return None
+
+
+def answer_prompt(prompt: str) -> Dict[str, Any]:
+    """Build an answer in the format asked for by a mapping prompt."""
+    forms = _json_after(prompt, _BATCH_MARKER)
+    if isinstance(forms, dict):
+        return {
+            "forms": {
+                form_id: _answer_fields(fields) for form_id, fields in forms.items()
+            }
+        }
+    return _answer_fields(_json_after(prompt, _SINGLE_FORM_MARKER))
+
+
+def _token_count(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def create_stub_app(behavior: Optional[StubBehavior] = None) -> Flask:
+    """Create the stub's Flask app."""
+    behavior = behavior or StubBehavior()
+    canned = itertools.cycle(behavior.responses) if behavior.responses else None
+    canned_lock = threading.Lock()
+    app = Flask(__name__)
+
+    @app.post("/v1/chat/completions")
+    def chat_completions():
+        body = request.get_json(force=True)
+        time.sleep(behavior.delay())
+        if behavior.rng.random() < behavior.fail_rate:
+            return (
+                jsonify({"error": {"message": "Stub failure", "type": "server_error"}}),
+                500,
+            )
+
+        prompt = "\n".join(
+            str(message.get("content") or "") for message in body.get("messages", [])
+        )
+        if canned:
+            with canned_lock:
+                answer = next(canned)
+        else:
+            answer = answer_prompt(prompt)
+        content = answer if isinstance(answer, str) else json.dumps(answer)
+        usage = {
+            "prompt_tokens": _token_count(prompt),
+            "completion_tokens": _token_count(content),
+            "total_tokens": _token_count(prompt) + _token_count(content),
+        }
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+        }
+
+        if not body.get("stream"):
+            return jsonify(
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def events() -> Iterator[str]:
+            chunk = {**base, "object": "chat.completion.chunk"}
+            for start in range(0, len(content), 16):
+                delta = {"content": content[start : start + 16]}
+                choice = {"index": 0, "delta": delta, "finish_reason": None}
+                yield f"data: {json.dumps({**chunk, 'choices': [choice]})}\n\n"
+            choice = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            yield f"data: {json.dumps({**chunk, 'choices': [choice]})}\n\n"
+            if include_usage:
+                yield f"data: {json.dumps({**chunk, 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(events(), mimetype="text/event-stream")
+
+    @app.get("/v1/models")
+    def models():
+        return jsonify({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+
+    return app
+
+
+class StubServer:
+    """The stub served from a background thread, e.g. for benchmarks."""
+
+    def __init__(
+        self,
+        behavior: Optional[StubBehavior] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        from werkzeug.serving import make_server
+
+        self._server = make_server(host, port, create_stub_app(behavior), threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._server.host}:{self._server.port}/v1"
+
+    def serve_forever(self):
+        """Serve from the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def cli():
+    """Run a local OpenAI-compatible stub of the LLM backend."""
+    parser = argparse.ArgumentParser(description=cli.__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument(
+        "--tail-ms", type=int, default=0, help="Latency of the slow requests"
+    )
+    parser.add_argument(
+        "--tail-rate", type=float, default=0.0, help="Share of slow requests"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="Share of requests failing"
+    )
+    parser.add_argument(
+        "--responses",
+        type=Path,
+        help="JSON file with an answer, or a list of answers returned in turn",
+    )
+    args = parser.parse_args()
+
+    responses = []
+    if args.responses:
+        with open(args.responses) as f:
+            loaded = json.load(f)
+        responses = loaded if isinstance(loaded, list) else [loaded]
+
+    behavior = StubBehavior(
+        latency=args.latency_ms / 1000,
+        tail_latency=args.tail_ms / 1000,
+        tail_rate=args.tail_rate,
+        fail_rate=args.fail_rate,
+        responses=responses,
+    )
+    server = StubServer(behavior, args.host, args.port)
+    print(f"LLM_BACKENDS=stub:stub@{server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    cli()
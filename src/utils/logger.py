@@ -6,12 +6,21 @@ from src.config.settings import settings
 # Remove default logger
 logger.remove()
 
+# Correlation fields, set per application with logger.contextualize()
+logger.configure(extra={"application_id": None, "profile_id": None})
+
+# Every sink is queued: records are formatted and written, and log files
+# rotated and compressed, on loguru's background thread instead of the
+# caller's. Pass payloads as arguments ("Fields: {}", fields) rather than
+# f-strings so they are only formatted when the level is enabled.
+
 # Configure console logging
 logger.add(
     sys.stderr,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level=settings.LOG_LEVEL,
     colorize=True,
+    enqueue=True,
 )
 
 # Configure file logging
@@ -22,8 +31,21 @@ logger.add(
     rotation="500 MB",
     retention="10 days",
     compression="zip",
+    enqueue=True,
 )
 
+# Configure structured logging, one JSON object per line
+if settings.LOG_JSON_FILE:
+    logger.add(
+        Path(settings.LOG_JSON_FILE),
+        level=settings.LOG_LEVEL,
+        serialize=True,
+        rotation="500 MB",
+        retention="10 days",
+        compression="zip",
+        enqueue=True,
+    )
+
 
 def get_logger(name: str):
     """Get a logger instance with the specified name."""
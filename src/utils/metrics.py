@@ -0,0 +1,297 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from src.utils.process_stats import rss_bytes
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """A monotonically increasing value, optionally split by labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the value for a label set."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Get the value for a label set."""
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        """Set the value for a label set."""
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        """Decrease the value for a label set."""
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Observed values counted into fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        lock: threading.Lock,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = lock
+        # Per label set: [bucket counts..., +Inf count], sum, count
+        self._values: Dict[LabelKey, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels):
+        """Record an observation."""
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+                self._values[key] = state
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile from the buckets (upper bucket bound, or the
+        largest finite bound when it falls beyond it)."""
+        with self._lock:
+            state = self._values.get(_label_key(labels))
+            return self._quantile(state, q) if state else None
+
+    def _quantile(self, state: Dict[str, Any], q: float) -> Optional[float]:
+        if not state["count"]:
+            return None
+        target = q * state["count"]
+        running = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            running += count
+            if running >= target:
+                return bound
+        # In the overflow bucket: report its lower bound, as JSON has no inf
+        return self.buckets[-1] if self.buckets else None
+
+    def samples(self) -> List[Tuple[LabelKey, Dict[str, Any]]]:
+        with self._lock:
+            return [
+                (
+                    key,
+                    {
+                        "counts": list(state["counts"]),
+                        "sum": state["sum"],
+                        "count": state["count"],
+                        "p50": self._quantile(state, 0.5),
+                        "p95": self._quantile(state, 0.95),
+                    },
+                )
+                for key, state in self._values.items()
+            ]
+
+
+class Meter:
+    """Counts events in a sliding time window, for per-minute rates."""
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+
+    def mark(self):
+        """Record an event now."""
+        with self._lock:
+            self._events.append(time.monotonic())
+
+    def rate(self) -> int:
+        """Get the number of events within the window."""
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._events and self._events[0] < cutoff:
+                self._events.popleft()
+            return len(self._events)
+
+
+class MetricsRegistry:
+    """Process-wide registry of application metrics.
+
+    Besides counters, gauges and histograms updated by the code paths
+    themselves, collectors can be registered to compute gauge values at
+    read time (for example process memory).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], Dict[str, Any]]] = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(name, lambda: Counter(name, help, threading.Lock()))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(name, lambda: Gauge(name, help, threading.Lock()))
+
+    def histogram(
+        self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(
+            name, lambda: Histogram(name, help, threading.Lock(), buckets)
+        )
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def register_collector(self, collector: Callable[[], Dict[str, Any]]):
+        """Register a callable returning {name: (help, value)} gauges to read
+        at collection time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collect(self) -> Dict[str, Tuple[str, float]]:
+        collected = {}
+        for collector in list(self._collectors):
+            try:
+                collected.update(collector())
+            except Exception:
+                continue
+        return collected
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all metric values as JSON-serializable data."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        data = {}
+        for metric in metrics:
+            data[metric.name] = {
+                "type": metric.type,
+                "help": metric.help,
+                "values": [
+                    {"labels": dict(key), "value": value}
+                    for key, value in metric.samples()
+                ],
+            }
+            if metric.type == "histogram":
+                data[metric.name]["buckets"] = list(metric.buckets)
+
+        for name, (help, value) in self._collect().items():
+            data[name] = {
+                "type": "gauge",
+                "help": help,
+                "values": [{"labels": {}, "value": value}],
+            }
+        return data
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if metric.type != "histogram":
+                for key, value in metric.samples():
+                    lines.append(f"{metric.name}{_format_labels(key)} {value}")
+                continue
+
+            for key, state in metric.samples():
+                cumulative = 0
+                for bound, count in zip(
+                    metric.buckets + (float("inf"),), state["counts"]
+                ):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else str(bound)
+                    lines.append(
+                        f"{metric.name}_bucket{_format_labels(key, {'le': le})} {cumulative}"
+                    )
+                lines.append(f"{metric.name}_sum{_format_labels(key)} {state['sum']}")
+                lines.append(
+                    f"{metric.name}_count{_format_labels(key)} {state['count']}"
+                )
+
+        for name, (help, value) in self._collect().items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Create metrics registry instance
+metrics = MetricsRegistry()
+metrics.register_collector(
+    lambda: {
+        "process_resident_memory_bytes": (
+            "Resident memory of this process",
+            rss_bytes() or 0,
+        )
+    }
+)
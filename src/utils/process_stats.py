@@ -0,0 +1,58 @@
+import os
+import resource
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_PROC = Path("/proc")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Get the resident memory of a process.
+
+    Reads /proc where available. Elsewhere only the current process is
+    supported, and its peak RSS is returned instead.
+    """
+    pid = pid or os.getpid()
+    try:
+        with open(_PROC / str(pid) / "statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        if pid != os.getpid():
+            return None
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def descendant_pids(pid: Optional[int] = None) -> List[int]:
+    """Get the IDs of every process descended from a process (Linux only)."""
+    pid = pid or os.getpid()
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = list(_PROC.iterdir())
+    except OSError:
+        return []
+
+    for entry in entries:
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            # The command name may contain spaces, so parse after its closing paren
+            parent = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(int(entry.name))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def tree_rss_bytes(pids: List[int]) -> int:
+    """Get the summed resident memory of the given processes."""
+    return sum(rss_bytes(pid) or 0 for pid in pids)
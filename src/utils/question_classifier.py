@@ -0,0 +1,378 @@
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+from src.utils.text_features import DEFAULT_N_FEATURES, vectorize
+
+logger = get_logger(__name__)
+
+# Common Workable screening questions, by category
+QUESTION_TAXONOMY = {
+    # Work authorization fields
+    "work_auth": [
+        "authorized to work",
+        "work authorization",
+        "legally authorized",
+        "eligible to work",
+    ],
+    "visa_sponsor": [
+        "require sponsorship",
+        "visa sponsorship",
+        "immigration sponsorship",
+        "employment visa",
+    ],
+    # Education and experience fields
+    "education": ["education level", "highest education", "degree"],
+    "experience": [
+        "years of experience",
+        "relevant experience",
+        "work experience",
+    ],
+    # Salary and compensation
+    "salary": [
+        "salary expectations",
+        "compensation expectations",
+        "desired salary",
+    ],
+    # Location, and time zone (left to the AI mapping: profiles have none)
+    "location": ["location requirement", "based in", "current location"],
+    "timezone": ["time zone", "timezone", "utc offset"],
+    # Referral
+    "referral": ["referred by", "employee referral", "how did you hear"],
+}
+
+OTHER_CATEGORY = "other"
+
+# Extra phrasings used to bootstrap the classifier before any history exists
+_SEED_QUESTIONS = {
+    "work_auth": [
+        "Are you legally authorized to work in the United States?",
+        "Do you have the right to work in this country?",
+        "Do you hold a valid work permit?",
+    ],
+    "visa_sponsor": [
+        "Will you now or in the future require sponsorship for employment visa status?",
+        "Do you need H-1B sponsorship?",
+        "Will you require visa sponsorship to work for us?",
+    ],
+    "education": [
+        "What is your highest level of education?",
+        "Which degree have you completed?",
+        "Highest degree obtained",
+    ],
+    "experience": [
+        "How many years of experience do you have?",
+        "Years of professional experience",
+        "How many years of relevant experience do you have in this role?",
+    ],
+    "salary": [
+        "What is your expected salary?",
+        "Salary requirements",
+        "Desired annual compensation",
+    ],
+    "location": [
+        "Where are you currently located?",
+        "Which city are you based in?",
+        "Current location",
+    ],
+    "timezone": [
+        "Which time zone are you based in?",
+        "Are you able to work in the CET time zone?",
+        "How many hours of overlap can you have with US Eastern time?",
+    ],
+    "referral": [
+        "How did you hear about this job?",
+        "Who referred you to this position?",
+        "Were you referred by an employee?",
+    ],
+    OTHER_CATEGORY: [
+        "First name",
+        "Last name",
+        "Email",
+        "Phone number",
+        "LinkedIn profile",
+        "Website or portfolio URL",
+        "Cover letter",
+        "Resume",
+        "Why do you want to work here?",
+        "Tell us about yourself",
+        "Describe a challenging project you worked on",
+        "What motivates you?",
+        "Additional information",
+        "Summary",
+    ],
+}
+
+# Question templates the taxonomy phrases of each category read well in
+_SEED_TEMPLATES = {
+    "work_auth": ["{}", "{} in this country", "{} (required)"],
+    "visa_sponsor": ["{}", "{} for this role", "{} now or in the future"],
+    "education": ["{}", "What is your {}?", "Please state your {}"],
+    "experience": ["{}", "Your {}", "{} in this field"],
+    "salary": ["{}", "Your {}", "Please state your {}"],
+    "location": ["{}", "{} (city, country)"],
+    "timezone": ["{}", "Your {}", "What is your {}?"],
+    "referral": ["{}", "{} (optional)"],
+}
+
+
+def seed_examples() -> List[Tuple[str, str]]:
+    """Get bootstrap (question, category) examples built from the taxonomy."""
+    examples = []
+    for category, phrases in QUESTION_TAXONOMY.items():
+        templates = _SEED_TEMPLATES.get(category, ["{}"])
+        for phrase in phrases:
+            examples.extend(
+                (template.format(phrase), category) for template in templates
+            )
+    for category, questions in _SEED_QUESTIONS.items():
+        examples.extend((question, category) for question in questions)
+    return examples
+
+
+def load_history(path: Path) -> List[Tuple[str, str]]:
+    """Load logged (question, category) pairs from a JSON-lines file.
+
+    Each line holds an object with "question" and "category" keys.
+    """
+    examples = []
+    if not path.exists():
+        return examples
+
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                examples.append((record["question"], record["category"]))
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Skipping malformed question history line: {str(e)}")
+    return examples
+
+
+_history_lock = threading.Lock()
+# Pairs each history file holds, read once per process
+_recorded: Dict[Path, Set[Tuple[str, str]]] = {}
+
+
+def record_history(
+    examples: Iterable[Tuple[str, str]], path: Optional[Path] = None
+) -> int:
+    """Append confirmed (question, category) pairs to a JSON-lines history
+    file, skipping the pairs it already holds.
+
+    Args:
+        examples: The (question, category) pairs to record
+        path: The history file, by default QUESTION_HISTORY_PATH
+
+    Returns:
+        The number of pairs written
+    """
+    path = Path(path or settings.QUESTION_HISTORY_PATH)
+    with _history_lock:
+        recorded = _recorded.get(path)
+        if recorded is None:
+            recorded = set(load_history(path))
+            _recorded[path] = recorded
+
+        new = [
+            example for example in dict.fromkeys(examples) if example not in recorded
+        ]
+        if not new:
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            for question, category in new:
+                f.write(json.dumps({"question": question, "category": category}) + "\n")
+        recorded.update(new)
+        return len(new)
+
+
+class QuestionClassifier:
+    """Classifies screening questions into the common taxonomy.
+
+    Uses hashed n-gram features and a linear softmax model, so it runs on the
+    CPU with NumPy only. Weights are stored as a .npy file and memory-mapped
+    on load.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        classes: List[str],
+        n_features: int = DEFAULT_N_FEATURES,
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.classes = classes
+        self.n_features = n_features
+
+    @classmethod
+    def train(
+        cls,
+        examples: List[Tuple[str, str]],
+        n_features: int = DEFAULT_N_FEATURES,
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+    ) -> "QuestionClassifier":
+        """Train a classifier with full-batch gradient descent.
+
+        Args:
+            examples: (question, category) training pairs
+            n_features: Width of the hashed feature space
+            epochs: Number of gradient steps
+            learning_rate: Gradient step size
+            l2: L2 regularization strength
+
+        Returns:
+            The trained classifier
+        """
+        classes = sorted({category for _, category in examples})
+        class_index = {category: i for i, category in enumerate(classes)}
+
+        features = vectorize([question for question, _ in examples], n_features)
+        targets = np.zeros((len(examples), len(classes)), dtype=np.float32)
+        targets[
+            np.arange(len(examples)),
+            [class_index[category] for _, category in examples],
+        ] = 1.0
+
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = _softmax(features @ weights + bias)
+            error = (probabilities - targets) / len(examples)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(weights, bias, classes, n_features)
+
+    def predict(self, question: str) -> Tuple[str, float]:
+        """Classify a question.
+
+        Returns:
+            The predicted category and its probability
+        """
+        features = vectorize([question], self.n_features)[0]
+        active = np.flatnonzero(features)
+        logits = features[active] @ self.weights[active] + self.bias
+        probabilities = _softmax(logits[np.newaxis, :])[0]
+        best = int(np.argmax(probabilities))
+        return self.classes[best], float(probabilities[best])
+
+    def save(self, path: Path):
+        """Save weights to a .npy file and metadata to a .json sidecar."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, np.ascontiguousarray(self.weights, dtype=np.float32))
+        with open(path.with_suffix(".json"), "w") as f:
+            json.dump(
+                {
+                    "classes": self.classes,
+                    "bias": self.bias.tolist(),
+                    "n_features": self.n_features,
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "QuestionClassifier":
+        """Load a saved classifier, memory-mapping its weights."""
+        with open(path.with_suffix(".json"), "r") as f:
+            meta = json.load(f)
+        weights = np.load(path, mmap_mode="r")
+        return cls(
+            weights,
+            np.asarray(meta["bias"], dtype=np.float32),
+            meta["classes"],
+            meta["n_features"],
+        )
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+_classifier: Optional[QuestionClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_question_classifier() -> Optional[QuestionClassifier]:
+    """Get the process-wide classifier, training and saving it on first use
+    or when the saved one predates a taxonomy category.
+
+    Training takes a while, so async callers should run this in a thread.
+
+    Returns None if the classifier cannot be loaded or trained, in which
+    case callers should fall back to the AI mapping.
+    """
+    global _classifier
+    if _classifier is not None:
+        return _classifier
+
+    path = settings.QUESTION_CLASSIFIER_PATH
+    with _classifier_lock:
+        if _classifier is not None:
+            return _classifier
+        try:
+            classifier = QuestionClassifier.load(path) if path.exists() else None
+            if classifier is None or not set(QUESTION_TAXONOMY) <= set(
+                classifier.classes
+            ):
+                logger.info("No current question classifier, training from history")
+                examples = seed_examples() + load_history(
+                    settings.QUESTION_HISTORY_PATH
+                )
+                classifier = QuestionClassifier.train(examples)
+                classifier.save(path)
+        except Exception as e:
+            logger.error(f"Failed to load question classifier: {str(e)}")
+            return None
+
+        _classifier = classifier
+        return _classifier
+
+
+def cli():
+    """Command line interface for training the classifier."""
+    parser = argparse.ArgumentParser(
+        description="Train the screening question classifier"
+    )
+    parser.add_argument(
+        "--history",
+        default=settings.QUESTION_HISTORY_PATH,
+        type=Path,
+        help="Path to the question history JSON-lines file",
+    )
+    parser.add_argument(
+        "--output",
+        default=settings.QUESTION_CLASSIFIER_PATH,
+        type=Path,
+        help="Path of the .npy weight file to write",
+    )
+    args = parser.parse_args()
+
+    examples = seed_examples() + load_history(args.history)
+    start = time.perf_counter()
+    classifier = QuestionClassifier.train(examples)
+    classifier.save(args.output)
+    logger.info(
+        f"Trained question classifier on {len(examples)} examples "
+        f"in {time.perf_counter() - start:.2f}s, saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,50 @@
+import re
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+DEFAULT_N_FEATURES = 2**12
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall((text or "").lower())
+
+
+def hashed_ngrams(text: str) -> List[str]:
+    """Get the word unigrams, word bigrams and character trigrams of a text."""
+    words = tokenize(text)
+    grams = [f"w:{word}" for word in words]
+    grams.extend(f"b:{first}_{second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        grams.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return grams
+
+
+def vectorize(texts: Iterable[str], n_features: int = DEFAULT_N_FEATURES) -> np.ndarray:
+    """Turn texts into L2-normalized hashed n-gram count vectors.
+
+    Args:
+        texts: The texts to vectorize
+        n_features: Width of the hashed feature space
+
+    Returns:
+        A float32 matrix with one row per text
+    """
+    texts = list(texts)
+    matrix = np.zeros((len(texts), n_features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        indices = [
+            zlib.crc32(gram.encode("utf-8")) % n_features
+            for gram in hashed_ngrams(text)
+        ]
+        if indices:
+            np.add.at(matrix[row], indices, 1.0)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
@@ -3,5 +3,5 @@
 # Ensure the script fails on any error
 set -e
 
-# Start the Flask application
-python src/ui/app.py
+# Start the Flask application (pass --production for the production server)
+python src/ui/app.py "$@"
@@ -0,0 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def in_thread():
+    """Call a function in a thread of its own and return its result.
+
+    pytest-playwright's sync fixtures leave an event loop running in the main
+    thread for the rest of the session, so tests drive their own loops from
+    another thread.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield lambda fn, *args: executor.submit(fn, *args).result()
+
+
+@pytest.fixture
+def run_async(in_thread):
+    """Run a coroutine to completion on a new event loop."""
+    return lambda coro: in_thread(asyncio.run, coro)
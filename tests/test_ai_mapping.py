@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from src.utils.ai_helper import AIFieldMapper, MappingBatcher, MappingCache
+
+PROFILE = {"first_name": "John"}
+OTHER_PROFILE = {"first_name": "Jane"}
+
+
+def fields(*names):
+    return [{"name": name, "type": "text"} for name in names]
+
+
+def answer(form_fields):
+    return {"mapped_fields": {f["name"]: "x" for f in form_fields}}
+
+
+class FakeMapper:
+    def __init__(self, router="router"):
+        self.router = router
+        self.single_calls = []
+        self.batch_calls = []
+        self.error = None
+
+    async def _request_mapping(self, user_metadata, form_fields):
+        self.single_calls.append(form_fields)
+        return answer(form_fields)
+
+    async def _request_batch_mapping(self, user_metadata, form_field_sets):
+        self.batch_calls.append(form_field_sets)
+        if self.error:
+            raise self.error
+        return [answer(form_fields) for form_fields in form_field_sets]
+
+
+def test_cache_hit_and_namespaces():
+    cache = MappingCache(max_entries=4)
+    cache.put("a", PROFILE, fields("email"), answer(fields("email")))
+
+    assert cache.get("a", PROFILE, fields("email")) == answer(fields("email"))
+    assert cache.get("b", PROFILE, fields("email")) is None
+    # An edited profile does not get answers made for its old version
+    assert cache.get("a", OTHER_PROFILE, fields("email")) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = MappingCache(max_entries=2)
+    for name in ("one", "two"):
+        cache.put("a", PROFILE, fields(name), answer(fields(name)))
+    cache.get("a", PROFILE, fields("one"))
+    cache.put("a", PROFILE, fields("three"), answer(fields("three")))
+
+    assert cache.get("a", PROFILE, fields("one")) is not None
+    assert cache.get("a", PROFILE, fields("two")) is None
+    assert cache.get("a", PROFILE, fields("three")) is not None
+
+
+def test_cache_skips_empty_answers_and_clears():
+    cache = MappingCache(max_entries=2)
+    cache.put("a", PROFILE, fields("x"), {})
+    assert cache.get("a", PROFILE, fields("x")) is None
+
+    cache.put("a", PROFILE, fields("x"), answer(fields("x")))
+    cache.clear("a")
+    assert cache.get("a", PROFILE, fields("x")) is None
+
+
+def test_batcher_combines_requests_within_window(run_async):
+    async def run():
+        batcher = MappingBatcher(window=0.05, max_size=8)
+        mapper = FakeMapper()
+        results = await asyncio.gather(
+            batcher.submit(mapper, PROFILE, fields("a")),
+            batcher.submit(FakeMapper(), PROFILE, fields("b")),
+        )
+        return batcher, mapper, results
+
+    batcher, mapper, results = run_async(run())
+    assert results == [answer(fields("a")), answer(fields("b"))]
+    assert mapper.batch_calls == [[fields("a"), fields("b")]]
+    assert batcher.batch_count == 1
+    assert batcher.request_count == 2
+
+
+def test_batcher_keeps_profiles_and_routers_apart(run_async):
+    async def run():
+        batcher = MappingBatcher(window=0.05, max_size=8)
+        first, second, third = FakeMapper(), FakeMapper(), FakeMapper("other")
+        await asyncio.gather(
+            batcher.submit(first, PROFILE, fields("a")),
+            batcher.submit(second, OTHER_PROFILE, fields("b")),
+            batcher.submit(third, PROFILE, fields("c")),
+        )
+        return batcher, [first, second, third]
+
+    batcher, mappers = run_async(run())
+    assert batcher.batch_count == 3
+    assert [m.single_calls for m in mappers] == [
+        [fields("a")],
+        [fields("b")],
+        [fields("c")],
+    ]
+
+
+def test_batcher_flushes_when_full(run_async):
+    async def run():
+        batcher = MappingBatcher(window=60, max_size=2)
+        mapper = FakeMapper()
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit(mapper, PROFILE, fields("a")),
+                batcher.submit(mapper, PROFILE, fields("b")),
+            ),
+            timeout=1,
+        )
+        return mapper
+
+    assert len(run_async(run()).batch_calls) == 1
+
+
+def test_batcher_passes_errors_to_every_caller(run_async):
+    async def run():
+        batcher = MappingBatcher(window=0.01, max_size=8)
+        mapper = FakeMapper()
+        mapper.error = RuntimeError("backend down")
+        return await asyncio.gather(
+            batcher.submit(mapper, PROFILE, fields("a")),
+            batcher.submit(mapper, PROFILE, fields("b")),
+            return_exceptions=True,
+        )
+
+    results = run_async(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_one_batcher_per_loop(in_thread):
+    async def get():
+        return AIFieldMapper()._get_batcher()
+
+    def run():
+        loop_a, loop_b = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            batcher_a = loop_a.run_until_complete(get())
+            batcher_b = loop_b.run_until_complete(get())
+            return batcher_a, batcher_b, loop_a.run_until_complete(get())
+        finally:
+            loop_a.close()
+            loop_b.close()
+
+    batcher_a, batcher_b, batcher_a_again = in_thread(run)
+    if batcher_a is None:
+        pytest.skip("Batching disabled by AI_BATCH_WINDOW_MS")
+    assert batcher_a is not batcher_b
+    assert batcher_a_again is batcher_a
@@ -0,0 +1,255 @@
+import time
+
+import pytest
+
+from src.core.captcha_handler import (
+    _DETECT_SCRIPT,
+    _INJECT_SCRIPT,
+    TOKEN_LIFETIME,
+    CaptchaHandler,
+    CaptchaInfo,
+)
+
+RECAPTCHA = "https://www.google.com/recaptcha"
+HCAPTCHA_FRAME = "https://newassets.hcaptcha.com/captcha/v1/x/static/hcaptcha.html"
+
+
+def in_page(run_async, html, script, arg=None):
+    """Evaluate a script in chromium over static HTML, skipping without one."""
+    from playwright.async_api import async_playwright
+
+    async def run():
+        async with async_playwright() as playwright:
+            try:
+                browser = await playwright.chromium.launch()
+            except Exception as e:
+                pytest.skip(f"chromium is not available: {e}")
+            try:
+                page = await browser.new_page()
+                # Nothing is fetched: the widgets are judged from the markup
+                await page.route("**/*", lambda route: route.abort())
+                await page.set_content(html, wait_until="domcontentloaded")
+                return await page.evaluate(script, arg)
+            finally:
+                await browser.close()
+
+    return run_async(run())
+
+
+def detect(run_async, html):
+    widgets = in_page(run_async, html, _DETECT_SCRIPT)
+    return {widget["sitekey"]: CaptchaInfo(**widget) for widget in widgets}
+
+
+@pytest.mark.parametrize(
+    "html, sitekey, expected",
+    [
+        (
+            f'<iframe src="{RECAPTCHA}/api2/anchor?k=v2key&size=normal"></iframe>',
+            "v2key",
+            dict(type="recaptcha", version="v2", variant="checkbox", visible=True),
+        ),
+        (
+            '<div class="g-recaptcha" data-sitekey="invkey" data-size="invisible"'
+            ' data-callback="onSubmit"></div>',
+            "invkey",
+            dict(type="recaptcha", variant="invisible", callback="onSubmit"),
+        ),
+        (
+            f'<script src="{RECAPTCHA}/api.js?render=v3key"></script>',
+            "v3key",
+            dict(type="recaptcha", version="v3", variant="v3", enterprise=False),
+        ),
+        (
+            f'<script src="{RECAPTCHA}/enterprise.js?render=entkey"></script>',
+            "entkey",
+            dict(type="recaptcha", version="v3", enterprise=True),
+        ),
+        (
+            f'<iframe src="{RECAPTCHA}/enterprise/anchor?k=entv2"></iframe>',
+            "entv2",
+            dict(type="recaptcha", version="v2", enterprise=True, variant="checkbox"),
+        ),
+        (
+            f'<iframe src="{HCAPTCHA_FRAME}#frame=checkbox&sitekey=hkey"></iframe>',
+            "hkey",
+            dict(type="hcaptcha", variant="checkbox", visible=True),
+        ),
+        (
+            '<script src="https://js.hcaptcha.com/1/api.js"></script>'
+            '<div data-sitekey="barekey"></div>',
+            "barekey",
+            dict(type="hcaptcha"),
+        ),
+        (
+            '<div data-sitekey="unknown"></div>',
+            "unknown",
+            dict(type=None),
+        ),
+        (
+            f'<iframe src="{RECAPTCHA}/api2/bframe?k=chkey"></iframe>',
+            "chkey",
+            dict(type="recaptcha", challenge=True, visible=False),
+        ),
+        (
+            f'<iframe style="display:none" src="{RECAPTCHA}/api2/bframe?k=chkey">'
+            "</iframe>",
+            "chkey",
+            dict(challenge=False),
+        ),
+    ],
+)
+def test_detect_classifies_widgets(run_async, html, sitekey, expected):
+    info = detect(run_async, html)[sitekey]
+    for name, value in expected.items():
+        assert getattr(info, name) == value, name
+
+
+def test_detect_merges_a_widget_found_several_ways(run_async):
+    html = (
+        f'<script src="{RECAPTCHA}/api.js"></script>'
+        '<div class="g-recaptcha" data-sitekey="key" data-callback="done"></div>'
+        f'<iframe src="{RECAPTCHA}/api2/anchor?k=key"></iframe>'
+    )
+    widgets = detect(run_async, html)
+    assert list(widgets) == ["key"]
+    assert widgets["key"].callback == "done"
+    assert widgets["key"].visible
+
+
+def test_inject_fills_fields_and_invokes_callbacks(run_async):
+    html = """
+        <form><textarea name="g-recaptcha-response"></textarea></form>
+        <script>
+            window.received = [];
+            function onSolved(token) { window.received.push(token); }
+            window.grecaptcha = {};
+        </script>"""
+    script = f"""async () => {{
+        const injected = await ({_INJECT_SCRIPT})({{
+            type: 'recaptcha', token: 'tok', callback: 'onSolved', invokeCallback: true
+        }});
+        return {{
+            injected,
+            field: document.querySelector('textarea').value,
+            executed: await grecaptcha.execute(),
+            response: grecaptcha.getResponse(),
+            received: window.received,
+        }};
+    }}"""
+    result = in_page(run_async, html, script)
+
+    assert result["injected"] == {"filled": 1, "callbacks": 1}
+    assert result["field"] == "tok"
+    assert result["executed"] == result["response"] == "tok"
+    # Once when injected, once more from execute()
+    assert result["received"] == ["tok", "tok"]
+
+
+def test_inject_adds_hcaptcha_fields_to_the_form(run_async):
+    result = in_page(
+        run_async,
+        "<form></form>",
+        _INJECT_SCRIPT,
+        {"type": "hcaptcha", "token": "tok", "callback": None, "invokeCallback": False},
+    )
+    assert result == {"filled": 2, "callbacks": 0}
+
+
+@pytest.mark.parametrize(
+    "info, variant",
+    [
+        (CaptchaInfo("k", "recaptcha"), "checkbox"),
+        (CaptchaInfo("k", "hcaptcha", invisible=True), "invisible"),
+        (CaptchaInfo("k", "recaptcha", version="v3", invisible=True), "v3"),
+    ],
+)
+def test_variant(info, variant):
+    assert info.variant == variant
+
+
+class FakeSolver:
+    def __init__(self):
+        self.solved = []
+
+    def solve_recaptcha(self, sitekey, url, **kwargs):
+        self.solved.append(sitekey)
+        return f"token-{sitekey}"
+
+    def solve_hcaptcha(self, sitekey, url, **kwargs):
+        return self.solve_recaptcha(sitekey, url)
+
+
+class FakePage:
+    """Reports fixed widgets and records injected tokens."""
+
+    url = "https://apply.workable.com/acme/j/A/"
+
+    def __init__(self, *widgets):
+        self.widgets = widgets
+        self.injected = []
+
+    async def evaluate(self, script, arg=None):
+        if script == _DETECT_SCRIPT:
+            return [vars(widget) for widget in self.widgets]
+        self.injected.append((arg["token"], arg["invokeCallback"]))
+        return {"filled": 1, "callbacks": 0}
+
+
+CHECKBOX = CaptchaInfo("checkbox", "recaptcha")
+INVISIBLE = CaptchaInfo("invisible", "recaptcha", invisible=True)
+V3 = CaptchaInfo("v3", "recaptcha", version="v3", invisible=True)
+
+
+def prepare_submit(run_async, page, solved_ago):
+    handler = CaptchaHandler(FakeSolver())
+    for sitekey, ago in solved_ago.items():
+        handler._solved_at[sitekey] = time.monotonic() - ago
+    injected = run_async(handler.prepare_submit(page))
+    return injected, handler.solver.solved
+
+
+def test_prepare_submit_solves_deferred_widgets_without_callbacks(run_async):
+    page = FakePage(CHECKBOX, INVISIBLE, V3)
+    injected, solved = prepare_submit(run_async, page, {"checkbox": 1})
+
+    assert injected
+    # The fresh checkbox token is kept; the site's execute() runs the callback
+    assert solved == ["invisible", "v3"]
+    assert page.injected == [("token-invisible", False), ("token-v3", False)]
+
+
+def test_prepare_submit_leaves_unsolved_checkboxes_alone(run_async):
+    injected, solved = prepare_submit(run_async, FakePage(CHECKBOX), {})
+    assert not injected
+    assert solved == []
+
+
+def test_prepare_submit_resolves_expired_tokens(run_async):
+    stale = TOKEN_LIFETIME + 1
+    page = FakePage(CHECKBOX, INVISIBLE)
+    injected, solved = prepare_submit(
+        run_async, page, {"checkbox": stale, "invisible": stale}
+    )
+
+    assert injected
+    assert solved == ["checkbox", "invisible"]
+    # An expired checkbox is solved again as the widget would: with its callback
+    assert page.injected == [("token-checkbox", True), ("token-invisible", False)]
+
+
+def test_prepare_submit_skips_fresh_tokens(run_async):
+    page = FakePage(CHECKBOX, INVISIBLE, V3)
+    injected, solved = prepare_submit(
+        run_async, page, {"checkbox": 5, "invisible": 5, "v3": 5}
+    )
+    assert not injected
+    assert solved == []
+
+
+def test_prepare_submit_skips_widgets_of_unknown_type(run_async):
+    injected, solved = prepare_submit(
+        run_async, FakePage(CaptchaInfo("mystery", None, invisible=True)), {}
+    )
+    assert not injected
+    assert solved == []
@@ -0,0 +1,105 @@
+import asyncio
+
+from src.core.fill_scheduler import FillScheduler
+
+
+class Recorder:
+    """Fake field actions that log when they start and finish."""
+
+    def __init__(self):
+        self.events = []
+        self.active = 0
+        self.peak = 0
+
+    def action(self, name, delay=0.02, fail=False):
+        async def fill():
+            self.events.append(("start", name))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(delay)
+            self.active -= 1
+            self.events.append(("end", name))
+            if fail:
+                raise RuntimeError("boom")
+
+        return fill
+
+
+def test_focus_free_actions_run_concurrently(run_async):
+    recorder = Recorder()
+
+    async def run():
+        scheduler = FillScheduler(max_concurrency=3)
+        for name in ("resume", "cover_letter", "country"):
+            scheduler.submit(name, recorder.action(name), needs_focus=False)
+        return await scheduler.join()
+
+    assert run_async(run()) == {"resume", "cover_letter", "country"}
+    assert recorder.peak == 3
+
+
+def test_focus_free_actions_respect_the_concurrency_bound(run_async):
+    recorder = Recorder()
+
+    async def run():
+        scheduler = FillScheduler(max_concurrency=2)
+        for index in range(5):
+            scheduler.submit(f"file{index}", recorder.action(index), needs_focus=False)
+        await scheduler.join()
+
+    run_async(run())
+    assert recorder.peak == 2
+
+
+def test_focus_actions_run_one_at_a_time_in_order(run_async):
+    recorder = Recorder()
+    # A radio group and the field it reveals depend on each other
+    names = ["first_name", "visa_radio_group", "visa_details", "last_name"]
+
+    async def run():
+        scheduler = FillScheduler()
+        for name in names:
+            scheduler.submit(name, recorder.action(name, delay=0.005))
+        await scheduler.join()
+
+    run_async(run())
+    expected = [(kind, name) for name in names for kind in ("start", "end")]
+    assert recorder.events == expected
+    assert recorder.peak == 1
+
+
+def test_focus_free_actions_overlap_the_focus_lane(run_async):
+    recorder = Recorder()
+
+    async def run():
+        scheduler = FillScheduler()
+        scheduler.submit("first_name", recorder.action("first_name"))
+        scheduler.submit("resume", recorder.action("resume"), needs_focus=False)
+        scheduler.submit("last_name", recorder.action("last_name"))
+        await scheduler.join()
+
+    run_async(run())
+    assert recorder.events.index(("start", "resume")) < recorder.events.index(
+        ("end", "first_name")
+    )
+    assert recorder.events.index(("end", "first_name")) < recorder.events.index(
+        ("start", "last_name")
+    )
+
+
+def test_held_actions_wait_for_resume_and_failures_are_reported(run_async):
+    recorder = Recorder()
+
+    async def run():
+        scheduler = FillScheduler()
+        scheduler.hold()
+        scheduler.submit("email", recorder.action("email", delay=0))
+        scheduler.submit("phone", recorder.action("phone", delay=0, fail=True))
+        await asyncio.sleep(0.01)
+        started_while_held = list(recorder.events)
+        scheduler.resume()
+        return started_while_held, await scheduler.join()
+
+    started_while_held, succeeded = run_async(run())
+    assert started_while_held == []
+    assert succeeded == {"email"}
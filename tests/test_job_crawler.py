@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.core.batch_runner import BatchJob, BatchResult, BatchRunner
+from src.core.job_crawler import CrawlSource, JobCrawler, SeenJobStore
+
+
+def test_parse_company_sources():
+    assert CrawlSource.parse("acme") == CrawlSource("company", "acme")
+    assert CrawlSource.parse(
+        "https://apply.workable.com/acme/j/ABC123/", "jane"
+    ) == CrawlSource("company", "acme", profile_id="jane")
+
+
+def test_parse_search_source():
+    source = CrawlSource.parse(
+        "https://jobs.workable.com/search?query=python&location=Berlin"
+    )
+    assert source == CrawlSource("search", "python", "Berlin")
+    assert str(source) == "search 'python' in Berlin"
+
+
+def test_parse_rejects_other_sites():
+    with pytest.raises(ValueError):
+        CrawlSource.parse("https://example.com/jobs")
+
+
+def test_seen_job_store(tmp_path):
+    store = SeenJobStore(tmp_path / "crawler.db")
+    # Nothing has been seen before the database exists
+    assert store.unseen(["a", "b"]) == {"a", "b"}
+
+    store.mark("a", "https://apply.workable.com/acme/j/a/", "company 'acme'")
+    store.mark("a", "https://apply.workable.com/acme/j/a/", "company 'acme'")
+    assert store.unseen(["a", "b"]) == {"b"}
+    assert SeenJobStore(store.path).unseen(["a"]) == set()
+
+
+def crawler_with_jobs(tmp_path, record=True):
+    crawler = JobCrawler(SeenJobStore(tmp_path / "crawler.db"), record=record)
+    source = CrawlSource("company", "acme")
+    for job_id in ("ok", "failed"):
+        crawler._handed_out[f"https://acme/{job_id}"] = (job_id, source)
+    return crawler
+
+
+def test_only_successful_applications_are_marked(tmp_path, run_async):
+    crawler = crawler_with_jobs(tmp_path)
+    run_async(crawler.record_result(BatchResult("https://acme/ok", "p", True)))
+    run_async(crawler.record_result(BatchResult("https://acme/failed", "p", False)))
+
+    assert crawler.store.unseen(["ok", "failed"]) == {"failed"}
+
+
+def test_dry_run_crawl_marks_nothing(tmp_path, run_async):
+    crawler = crawler_with_jobs(tmp_path, record=False)
+    run_async(crawler.record_result(BatchResult("https://acme/ok", "p", True)))
+    skipped = BatchResult("https://acme/failed", "p", False, skipped=True)
+    run_async(crawler.record_result(skipped))
+
+    assert crawler.store.unseen(["ok", "failed"]) == {"ok", "failed"}
+
+
+def test_skipped_jobs_are_marked_with_their_status(tmp_path, run_async):
+    crawler = crawler_with_jobs(tmp_path)
+    run_async(crawler.record_result(BatchResult("https://acme/ok", "p", True)))
+    skipped = BatchResult("https://acme/failed", "p", False, score=0.1, skipped=True)
+    run_async(crawler.record_result(skipped))
+
+    assert crawler.store.unseen(["ok", "failed"]) == set()
+    assert crawler.store.status("ok") == SeenJobStore.APPLIED
+    assert crawler.store.status("failed") == SeenJobStore.SKIPPED
+    assert crawler.store.status("never") is None
+
+
+def test_seen_job_store_adds_status_to_old_databases(tmp_path):
+    path = tmp_path / "crawler.db"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE seen_jobs (job_id TEXT PRIMARY KEY, job_url TEXT NOT NULL, "
+        "source TEXT, first_seen REAL NOT NULL)"
+    )
+    with connection:
+        connection.execute("INSERT INTO seen_jobs VALUES ('old', 'https://old', '', 0)")
+    connection.close()
+
+    store = SeenJobStore(path)
+    assert store.status("old") == SeenJobStore.APPLIED
+    store.mark("new", "https://new", "", SeenJobStore.SKIPPED)
+    assert store.status("new") == SeenJobStore.SKIPPED
+
+
+class OneProfile:
+    def default_id(self):
+        return "p"
+
+
+def test_batch_runner_reports_skipped_jobs(run_async, monkeypatch):
+    reported = []
+
+    async def on_result(result):
+        reported.append(result)
+
+    runner = BatchRunner(min_score=0.5, profiles=OneProfile(), on_result=on_result)
+    monkeypatch.setattr(runner, "_score", lambda jobs: [0.9, 0.1, None])
+    jobs = [BatchJob("https://good"), BatchJob("https://bad"), BatchJob("https://x")]
+
+    async def enqueue():
+        queue = asyncio.PriorityQueue()
+        await runner._enqueue(queue, jobs)
+        return [queue.get_nowait()[2].job_url for _ in range(queue.qsize())]
+
+    assert run_async(enqueue()) == ["https://good", "https://x"]
+    assert reported == [BatchResult("https://bad", "p", False, score=0.1, skipped=True)]
+
+
+def pages(*pages):
+    """A _fetch_page stand-in serving pages of job IDs in turn."""
+    calls = []
+
+    async def fetch_page(client, source, token):
+        index = token or 0
+        calls.append(index)
+        postings = [(job_id, BatchJob(f"https://{job_id}")) for job_id in pages[index]]
+        return postings, index + 1 if index + 1 < len(pages) else None
+
+    return fetch_page, calls
+
+
+@pytest.mark.parametrize("kind, pages_read", [("company", [0]), ("search", [0, 1])])
+def test_only_company_boards_stop_at_a_seen_page(tmp_path, run_async, kind, pages_read):
+    crawler = JobCrawler(SeenJobStore(tmp_path / "crawler.db"))
+    crawler.store.mark("old", "https://old", "")
+    crawler._fetch_page, calls = pages(["old"], ["new"])
+
+    async def run():
+        queue = asyncio.Queue()
+        await crawler._crawl_source(None, CrawlSource(kind, "acme"), queue)
+        return queue.qsize()
+
+    found = run_async(run())
+    assert calls == pages_read
+    assert found == len(pages_read) - 1
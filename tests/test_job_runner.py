@@ -0,0 +1,64 @@
+from src.core.job_runner import JobRunner, JobStatus
+
+
+class FakeManager:
+    """Stands in for JobApplicationManager, reporting one phase."""
+
+    succeed = True
+
+    def __init__(self, job_url, metadata_path, on_progress, **kwargs):
+        self.on_progress = on_progress
+
+    async def apply_to_job(self):
+        self.on_progress("filling")
+        if self.succeed is None:
+            raise RuntimeError("browser crashed")
+        return self.succeed
+
+
+def run_job(monkeypatch, succeed):
+    monkeypatch.setattr("src.config.settings.settings.validate", lambda **kwargs: None)
+    monkeypatch.setattr(FakeManager, "succeed", succeed)
+    monkeypatch.setattr(
+        "src.core.application_manager.JobApplicationManager", FakeManager
+    )
+    closed = []
+
+    async def close_llm_clients():
+        closed.append(True)
+
+    monkeypatch.setattr("src.utils.llm_backends.close_llm_clients", close_llm_clients)
+
+    runner = JobRunner(max_workers=1)
+    job_id = runner.submit("https://apply.workable.com/acme/j/ABC123/")
+    events = []
+    while runner.get(job_id).status not in JobStatus.FINISHED or len(events) < 4:
+        new_events = runner.wait_for_events(job_id, len(events), timeout=5)
+        assert new_events, "the job stopped making progress"
+        events.extend(new_events)
+    runner.stop()
+    assert closed == [True]
+    return runner.get(job_id), [event["phase"] for event in events]
+
+
+def test_successful_job_moves_through_its_states(monkeypatch):
+    job, phases = run_job(monkeypatch, succeed=True)
+
+    assert phases == [
+        JobStatus.QUEUED,
+        JobStatus.RUNNING,
+        "filling",
+        JobStatus.SUCCEEDED,
+    ]
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.phase == "filling"
+    assert job.error is None
+    assert job.started_at <= job.finished_at
+
+
+def test_failed_job_records_its_error(monkeypatch):
+    job, phases = run_job(monkeypatch, succeed=None)
+
+    assert phases[-1] == JobStatus.FAILED
+    assert job.status == JobStatus.FAILED
+    assert job.error == "browser crashed"
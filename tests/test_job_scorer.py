@@ -0,0 +1,52 @@
+import pytest
+
+from src.core.job_scorer import JobScorer, title_from_url
+
+PROFILE = {
+    "relevant_job_titles": ["Backend Engineer", "Python Developer"],
+    "skills": ["Python", "Django", "PostgreSQL"],
+    "industries": ["Software"],
+}
+
+
+@pytest.mark.parametrize(
+    "url, title",
+    [
+        (
+            "https://jobs.workable.com/view/abc123/"
+            "senior-java-developer-(hybrid)-in-auburn-hills-at-detroit-labs",
+            "senior java developer hybrid",
+        ),
+        ("https://jobs.workable.com/view/abc123/data-engineer", "data engineer"),
+        ("https://apply.workable.com/acme/j/ABC123/", None),
+        ("https://jobs.workable.com/view/abc123", None),
+    ],
+)
+def test_title_from_url(url, title):
+    assert title_from_url(url) == title
+
+
+def test_relevant_postings_score_higher():
+    scorer = JobScorer(PROFILE)
+    scores = scorer.score(
+        ["Senior Python Developer", "Registered Nurse"],
+        ["Django and PostgreSQL services", "Night shifts at the ward"],
+    )
+
+    assert scorer.enabled
+    assert scores.shape == (2,)
+    assert scores[0] > scores[1]
+    assert all(0 <= score <= 1 for score in scores)
+
+
+def test_score_one_matches_batch_score():
+    scorer = JobScorer(PROFILE)
+    batch = scorer.score(["Backend Engineer"], ["Python"])
+    assert scorer.score_one("Backend Engineer", "Python") == pytest.approx(batch[0])
+
+
+def test_empty_profile_scores_nothing():
+    scorer = JobScorer({"relevant_job_titles": [], "skills": []})
+    assert not scorer.enabled
+    assert scorer.score([]).shape == (0,)
+    assert scorer.score_one("Backend Engineer") == 0
@@ -0,0 +1,56 @@
+from src.utils.json_stream import MappedFieldsStreamParser
+
+
+def feed_all(parser, chunks):
+    pairs = []
+    for chunk in chunks:
+        pairs.extend(parser.feed(chunk))
+    return pairs
+
+
+def test_pairs_emitted_as_they_complete():
+    parser = MappedFieldsStreamParser()
+    assert parser.feed('{"mapped_fields": {"first_name": "Jo') == []
+    assert parser.feed('hn", "last') == [("first_name", "John")]
+    assert parser.feed('_name": "Doe"}') == [("last_name", "Doe")]
+    assert parser.is_done
+    assert parser.pair_count == 2
+
+
+def test_number_split_across_chunks():
+    parser = MappedFieldsStreamParser()
+    pairs = feed_all(
+        parser, ['{"mapped_fields": {"years": 3.', '5, "email": "a@b.c"}}']
+    )
+    assert pairs == [("years", 3.5), ("email", "a@b.c")]
+    assert parser.is_done
+
+
+def test_number_waits_for_delimiter():
+    parser = MappedFieldsStreamParser()
+    assert parser.feed('{"mapped_fields": {"years": 1') == []
+    assert parser.feed("0") == []
+    assert parser.feed("}") == [("years", 10)]
+
+
+def test_literals_and_containers_char_by_char():
+    text = '{"mapped_fields": {"a": true, "b": [1, 2], "c": {"d": null}, "e": null}}'
+    parser = MappedFieldsStreamParser()
+    pairs = feed_all(parser, list(text))
+    assert pairs == [("a", True), ("b", [1, 2]), ("c", {"d": None}), ("e", None)]
+    assert parser.is_done
+
+
+def test_text_before_mapped_fields_is_ignored():
+    parser = MappedFieldsStreamParser()
+    pairs = feed_all(
+        parser, ['{"explanations": {"x": "y"}, ', '"mapped_fields": {"k": 1}}']
+    )
+    assert pairs == [("k", 1)]
+
+
+def test_unexpected_format_is_not_done():
+    parser = MappedFieldsStreamParser()
+    assert feed_all(parser, ['{"fields": {"k": 1}}']) == []
+    assert not parser.is_done
+    assert parser.text == '{"fields": {"k": 1}}'
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils.llm_backends import (
+    CircuitBreaker,
+    LLMBackend,
+    LLMRouter,
+    LLMUnavailableError,
+)
+from src.utils.llm_stub import StubBehavior, StubServer
+
+MESSAGES = [{"role": "user", "content": "Answer in JSON"}]
+
+
+def backend(name, server, **kwargs):
+    return LLMBackend(
+        name,
+        "stub",
+        base_url=server.base_url,
+        timeout=5,
+        breaker=CircuitBreaker(kwargs.pop("max_failures", 3), 60),
+        **kwargs,
+    )
+
+
+async def complete(router):
+    try:
+        completion = await router.complete(messages=MESSAGES)
+        return completion.choices[0].message.content
+    finally:
+        await router.aclose()
+
+
+def test_breaker_opens_after_failures_in_a_row():
+    breaker = CircuitBreaker(max_failures=2, cooldown=60)
+    assert not breaker.record(False)
+    assert not breaker.record(True)
+    assert not breaker.record(False)
+    assert breaker.record(False)
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_trial_through_after_cooldown():
+    breaker = CircuitBreaker(max_failures=1, cooldown=0.01)
+    breaker.record(False)
+    time.sleep(0.02)
+
+    assert breaker.ready
+    assert breaker.allow()
+    assert not breaker.allow()
+    # A cancelled trial frees the slot for another one
+    breaker.abandon()
+    assert breaker.allow()
+    assert breaker.record(False)
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.record(True)
+    assert breaker.allow() and breaker.allow()
+
+
+def test_openai_key_only_sent_to_openai(monkeypatch):
+    monkeypatch.setattr("src.config.settings.settings.OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("LOCAL_API_KEY", raising=False)
+
+    assert LLMBackend.parse("openai:gpt-4o-mini").api_key == "sk-test"
+    local = LLMBackend.parse("local:llama@http://127.0.0.1:8000/v1")
+    assert local.base_url == "http://127.0.0.1:8000/v1"
+    assert local.api_key is None
+
+
+def test_router_fails_over_to_next_backend(run_async):
+    with StubServer(StubBehavior(latency=0, fail_rate=1)) as down, StubServer(
+        StubBehavior(latency=0, responses=["ok"])
+    ) as up:
+        failing = backend("down", down, max_failures=1)
+        router = LLMRouter([failing, backend("up", up)], hedge_quantile=0)
+
+        assert run_async(complete(router)) == "ok"
+        assert failing.breaker.is_open
+        # The open circuit is skipped without sending it anything
+        assert run_async(complete(router)) == "ok"
+        assert [row["circuit_open"] for row in router.stats()] == [True, False]
+
+
+def test_router_raises_when_every_circuit_is_open(run_async):
+    with StubServer(StubBehavior(latency=0, responses=["ok"])) as server:
+        only = backend("only", server, max_failures=1)
+        only.breaker.record(False)
+        with pytest.raises(LLMUnavailableError):
+            run_async(complete(LLMRouter([only])))
+
+
+def test_router_hedges_slow_requests(run_async):
+    slow_behavior = StubBehavior(latency=0.01, responses=["slow"])
+    with StubServer(slow_behavior) as slow, StubServer(
+        StubBehavior(latency=0.01, responses=["fast"])
+    ) as fast:
+        primary = backend("slow", slow)
+        router = LLMRouter(
+            [primary, backend("fast", fast)], hedge_quantile=0.5, hedge_min_samples=1
+        )
+        assert run_async(complete(router)) == "slow"
+
+        # Much slower than its recent latency: the hedge answers first
+        slow_behavior.latency = 1.0
+        start = time.perf_counter()
+        assert run_async(complete(router)) == "fast"
+        assert time.perf_counter() - start < 0.9
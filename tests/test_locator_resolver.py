@@ -0,0 +1,123 @@
+import pytest
+
+from src.core.locator_resolver import (
+    APPLY_BUTTON,
+    Candidate,
+    LocatorResolver,
+    page_template,
+)
+
+
+def test_page_template():
+    assert (
+        page_template("https://apply.workable.com/acme/j/ABC123/apply/")
+        == "apply.workable.com/acme/j/*/apply"
+    )
+
+
+class FakePage:
+    """Answers the resolve script with the first candidate it has a match for."""
+
+    def __init__(self, url, present):
+        self.url = url
+        self.present = present
+        self.tried = []
+
+    async def evaluate(self, script, candidates):
+        self.tried.append([c["css"] for c in candidates])
+        for index, candidate in enumerate(candidates):
+            if candidate["css"] in self.present:
+                return [index, 0]
+        return None
+
+    def locator(self, css):
+        return FakeLocator(css)
+
+
+class FakeLocator:
+    def __init__(self, css):
+        self.css = css
+
+    def nth(self, match):
+        return self
+
+
+def resolver(**kwargs):
+    return LocatorResolver("widget", [Candidate("#a"), Candidate("#b")], **kwargs)
+
+
+def test_winning_candidate_is_tried_first_on_the_same_template(run_async):
+    widget = resolver()
+    page = FakePage("https://acme.test/jobs/1", {"#b"})
+    assert run_async(widget.resolve(page)).css == "#b"
+    assert run_async(widget.resolve(page)).css == "#b"
+
+    assert page.tried == [["#a", "#b"], ["#b", "#a"]]
+
+
+def test_memo_is_per_resolver(run_async):
+    first, second = resolver(), resolver()
+    run_async(first.resolve(FakePage("https://acme.test/jobs/1", {"#b"})))
+
+    page = FakePage("https://acme.test/jobs/2", {"#b"})
+    run_async(second.resolve(page))
+    assert page.tried == [["#a", "#b"]]
+
+
+def test_memo_forgets_the_least_recently_resolved_template(run_async):
+    widget = resolver(max_templates=2)
+    for site in ("one", "two", "one", "three"):
+        run_async(widget.resolve(FakePage(f"https://{site}.test/", {"#b"})))
+
+    assert list(widget._memo) == ["one.test/", "three.test/"]
+
+
+def resolve_in_page(run_async, resolver, html):
+    """Resolve over static HTML in chromium, skipping without one."""
+    from playwright.async_api import async_playwright
+
+    async def run():
+        async with async_playwright() as playwright:
+            try:
+                browser = await playwright.chromium.launch()
+            except Exception as e:
+                pytest.skip(f"chromium is not available: {e}")
+            try:
+                page = await browser.new_page()
+                await page.set_content(html)
+                locator = await resolver.resolve(page)
+                return await locator.inner_text() if locator else None
+            finally:
+                await browser.close()
+
+    return run_async(run())
+
+
+@pytest.mark.parametrize(
+    "html, clicked",
+    [
+        ('<a href="#faq">How to apply</a><a href="/apply">Apply</a>', "Apply"),
+        ('<a href="/careers">Apply for other jobs</a>', None),
+        (
+            '<a href="#faq">How to apply</a>'
+            '<a role="button" href="/apply">Apply now</a>',
+            "Apply now",
+        ),
+        (
+            '<footer><a href="/jobs">Apply</a></footer><button>Apply now</button>',
+            "Apply now",
+        ),
+        ('<nav><a href="/jobs">Apply</a></nav>', None),
+    ],
+)
+def test_apply_button_ignores_links_that_only_mention_applying(
+    run_async, html, clicked
+):
+    apply_button = LocatorResolver("apply_button", APPLY_BUTTON.candidates)
+    assert resolve_in_page(run_async, apply_button, html) == clicked
+
+
+def test_resolve_script_matches_exact_text_after_trimming(run_async):
+    html = "<a> Apply </a><a>Apply here</a>"
+    widget = LocatorResolver("apply", [Candidate("a", "apply", exact=True)])
+    assert resolve_in_page(run_async, widget, html) == "Apply"
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from src.utils.metrics import Meter, MetricsRegistry, metrics
+
+
+def test_histogram_quantiles_report_bucket_bounds():
+    histogram = MetricsRegistry().histogram("latency", "Latency", buckets=(1, 5, 10))
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.5, 0.7, 3, 4, 8):
+        histogram.observe(value)
+    assert histogram.quantile(0.4) == 1
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.8) == 5
+    assert histogram.quantile(1.0) == 10
+
+    # Beyond the last bucket the largest finite bound is reported, not inf
+    histogram.observe(60)
+    histogram.observe(90)
+    assert histogram.quantile(0.95) == 10
+
+
+def test_histogram_quantiles_are_per_label_set():
+    histogram = MetricsRegistry().histogram("phase", "Phase", buckets=(1, 5))
+    histogram.observe(0.5, phase="fill")
+    histogram.observe(4, phase="submit")
+
+    assert histogram.quantile(0.5, phase="fill") == 1
+    assert histogram.quantile(0.5, phase="submit") == 5
+    assert histogram.quantile(0.5, phase="other") is None
+
+
+def test_meter_counts_events_within_its_window():
+    meter = Meter(window=0.1)
+    meter.mark()
+    meter.mark()
+    assert meter.rate() == 2
+
+    time.sleep(0.15)
+    meter.mark()
+    assert meter.rate() == 1
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry()
+    registry.counter("applications_total", "Applications by result").inc(
+        2, result="success"
+    )
+    registry.gauge("queue_depth", "Jobs waiting").set(3)
+    histogram = registry.histogram("fill_seconds", "Fill time", buckets=(1, 5))
+    histogram.observe(0.5)
+    histogram.observe(7)
+    registry.register_collector(lambda: {"uptime_seconds": ("Uptime", 12)})
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines[:3] == [
+        "# HELP applications_total Applications by result",
+        "# TYPE applications_total counter",
+        'applications_total{result="success"} 2',
+    ]
+    assert "# TYPE queue_depth gauge" in lines
+    assert "queue_depth 3" in lines
+    assert "# TYPE fill_seconds histogram" in lines
+    assert [line for line in lines if line.startswith("fill_seconds")] == [
+        'fill_seconds_bucket{le="1"} 1',
+        'fill_seconds_bucket{le="5"} 1',
+        'fill_seconds_bucket{le="+Inf"} 2',
+        "fill_seconds_sum 7.5",
+        "fill_seconds_count 2",
+    ]
+    assert lines[-3:] == [
+        "# HELP uptime_seconds Uptime",
+        "# TYPE uptime_seconds gauge",
+        "uptime_seconds 12",
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, rendered",
+    [
+        ('say "hi"', r"say \"hi\""),
+        ("C:\\jobs", r"C:\\jobs"),
+        ("two\nlines", r"two\nlines"),
+    ],
+)
+def test_prometheus_label_values_are_escaped(value, rendered):
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors").inc(error=value)
+
+    assert f'errors_total{{error="{rendered}"}} 1' in registry.to_prometheus()
+
+
+def test_metrics_endpoint():
+    from src.ui.app import app
+
+    metrics.counter("test_endpoint_total", "Counted by the endpoint test").inc()
+    response = app.test_client().get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert "# TYPE test_endpoint_total counter" in body
+    assert "test_endpoint_total 1" in body
+    assert "# TYPE process_resident_memory_bytes gauge" in body
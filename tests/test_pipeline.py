@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from src.core.pipeline import PipelineStages
+
+
+def test_batch_limits():
+    stages = PipelineStages.for_batch(concurrency=2, prefetch=3)
+    assert stages.limits == {"prepare": 5, "fill": 2, "submit": 2}
+    assert stages.capacity == 5
+
+
+def test_unknown_stage_rejected():
+    with pytest.raises(ValueError):
+        PipelineStages({"review": 1})
+
+
+def test_stage_bounds_applications(run_async):
+    async def run():
+        stages = PipelineStages({"fill": 2})
+        busy = peak = 0
+
+        async def application():
+            nonlocal busy, peak
+            async with stages.stage("fill"):
+                busy += 1
+                peak = max(peak, busy)
+                await asyncio.sleep(0.01)
+                busy -= 1
+            # Stages without a limit never wait
+            async with stages.stage("submit"):
+                pass
+
+        tasks = [asyncio.ensure_future(application()) for _ in range(6)]
+        await asyncio.sleep(0)
+        full = stages.is_full("fill")
+        await asyncio.gather(*tasks)
+        return peak, full, stages.is_full("fill"), stages.is_full("submit")
+
+    assert run_async(run()) == (2, True, False, False)
@@ -0,0 +1,86 @@
+import json
+import os
+import stat
+
+import pytest
+
+from src.core.profile_store import ProfileDirectory, ProfileStore
+
+
+def test_save_and_reload(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    assert store.load() == {}
+
+    store.save({"first_name": "John"})
+    assert store.load() == {"first_name": "John"}
+    assert json.loads(store.path.read_text()) == {"first_name": "John"}
+    # Only the profile is left behind, no temporary files
+    assert os.listdir(tmp_path) == ["profile.json"]
+
+
+def test_load_returns_copies(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    store.save({"skills": ["Python"]})
+    store.load()["skills"].append("Java")
+    assert store.load() == {"skills": ["Python"]}
+
+
+def test_external_edits_are_picked_up(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    store.save({"first_name": "John"})
+    version = store.version
+
+    store.path.write_text(json.dumps({"first_name": "Johnny"}))
+    assert store.load() == {"first_name": "Johnny"}
+    assert store.version == version + 1
+
+
+def test_subscribers_are_notified(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    seen = []
+    unsubscribe = store.subscribe(lambda version, data: seen.append(data))
+    store.save({"a": 1})
+    unsubscribe()
+    store.save({"a": 2})
+    assert seen == [{"a": 1}]
+
+
+def test_save_keeps_file_mode(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text("{}")
+    path.chmod(0o644)
+
+    ProfileStore(path).save({"a": 1})
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+
+def test_directory_falls_back_to_single_profile(tmp_path):
+    fallback = tmp_path / "user_metadata.json"
+    directory = ProfileDirectory(tmp_path / "profiles", fallback)
+
+    assert directory.default_id() == "default"
+    assert directory.path_for() == fallback
+    with pytest.raises(KeyError):
+        directory.path_for("jane")
+
+
+def test_directory_index(tmp_path):
+    root = tmp_path / "profiles"
+    root.mkdir()
+    (root / "index.json").write_text(
+        json.dumps(
+            {
+                "default": "jane",
+                "profiles": {
+                    "john": {"file": "john.json", "label": "John"},
+                    "jane": {"file": "/abs/jane.json"},
+                },
+            }
+        )
+    )
+    directory = ProfileDirectory(root, tmp_path / "unused.json")
+
+    assert directory.default_id() == "jane"
+    assert directory.path_for("john") == root / "john.json"
+    assert [p["label"] for p in directory.list_profiles()] == ["John", "jane"]
+    assert str(directory.path_for()) == "/abs/jane.json"
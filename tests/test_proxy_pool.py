@@ -0,0 +1,90 @@
+import asyncio
+import random
+from collections import Counter
+
+import httpx
+
+from src.core.proxy_pool import Proxy, ProxyPool, StandInProxy, is_proxy_error
+from src.utils.llm_stub import StubServer
+
+GOOD = Proxy("http://good:1")
+BAD = Proxy("http://bad:1")
+
+
+def test_healthy_proxies_are_favored():
+    pool = ProxyPool([GOOD, BAD], cooldown=60, max_failures=100, rng=random.Random(1))
+    for _ in range(5):
+        pool.report(GOOD, ok=True, latency=0.5)
+        pool.report(BAD, ok=False)
+
+    picks = Counter()
+    for _ in range(1000):
+        proxy = pool.acquire()
+        picks[proxy] += 1
+        pool.release(proxy)
+    assert picks[GOOD] > 2 * picks[BAD] > 0
+
+
+def test_proxies_in_use_are_spread():
+    pool = ProxyPool([GOOD, BAD], rng=random.Random(1))
+    leased = [pool.acquire() for _ in range(40)]
+    counts = Counter(leased)
+    assert abs(counts[GOOD] - counts[BAD]) < 10
+
+    for proxy in leased:
+        pool.release(proxy)
+    pool.release(GOOD)
+    assert all(row["in_use"] == 0 for row in pool.stats())
+
+
+def test_failing_proxy_cools_down():
+    pool = ProxyPool([GOOD, BAD], cooldown=60, max_failures=2)
+    pool.report(BAD, ok=False)
+    pool.report(BAD, ok=True)
+    pool.report(BAD, ok=False)
+    assert {row["proxy"]: row["cooling_down_seconds"] for row in pool.stats()} == {
+        "http://good:1": 0,
+        "http://bad:1": 0,
+    }
+
+    pool.report(BAD, ok=False)
+    assert all(pool.acquire() == GOOD for _ in range(20))
+
+    # With every proxy cooling down, the one available soonest is used
+    pool.report(GOOD, ok=False)
+    pool.report(GOOD, ok=False)
+    assert pool.acquire() == BAD
+
+
+def test_only_proxy_errors_count():
+    assert is_proxy_error(Exception("net::ERR_PROXY_CONNECTION_FAILED at https://x"))
+    assert is_proxy_error(Exception("net::ERR_TUNNEL_CONNECTION_FAILED"))
+    assert not is_proxy_error(Exception("net::ERR_NAME_NOT_RESOLVED"))
+    assert not is_proxy_error(Exception("Timeout 30000ms exceeded."))
+
+
+def test_pool_over_stand_in_proxies(run_async):
+    async def run(target):
+        good, bad = StandInProxy(), StandInProxy(fail_rate=1.0)
+        urls = [await good.start(), await bad.start()]
+        pool = ProxyPool(
+            [Proxy.parse(url) for url in urls], cooldown=60, max_failures=2
+        )
+        try:
+            for _ in range(10):
+                proxy = pool.acquire()
+                async with httpx.AsyncClient(proxy=proxy.server) as client:
+                    response = await client.get(f"{target}/models")
+                pool.report(proxy, ok=response.status_code == 200, latency=0.01)
+                pool.release(proxy)
+        finally:
+            await good.close()
+            await bad.close()
+        return {row["proxy"]: row for row in pool.stats()}, urls
+
+    with StubServer() as target:
+        stats, (good_url, bad_url) = run_async(run(target.base_url))
+    assert stats[good_url]["successes"] >= 1
+    assert stats[bad_url]["successes"] == 0
+    assert stats[bad_url]["errors"] <= 2
+    assert stats[good_url]["health"] > stats[bad_url]["health"]
@@ -0,0 +1,39 @@
+from src.core.metadata_processor import ProfileAnswers
+from src.utils import question_classifier
+from src.utils.question_classifier import QuestionClassifier, seed_examples
+
+PROFILE = {"contact_information": {"current_address": {"city": "Berlin"}}}
+
+
+def test_time_zone_questions_have_no_local_answer():
+    classifier = QuestionClassifier.train(seed_examples())
+    category, _ = classifier.predict("What time zone are you in?")
+
+    assert category == "timezone"
+    assert ProfileAnswers(PROFILE).answer(category) is None
+    assert classifier.predict("Where are you currently located?")[0] == "location"
+
+
+def test_stale_saved_classifier_is_retrained(tmp_path, monkeypatch):
+    path = tmp_path / "classifier.npy"
+    examples = [(q, c) for q, c in seed_examples() if c != "timezone"]
+    QuestionClassifier.train(examples, epochs=1).save(path)
+    monkeypatch.setattr(question_classifier.settings, "QUESTION_CLASSIFIER_PATH", path)
+    monkeypatch.setattr(
+        question_classifier.settings, "QUESTION_HISTORY_PATH", tmp_path / "none.jsonl"
+    )
+    monkeypatch.setattr(question_classifier, "_classifier", None)
+
+    classifier = question_classifier.get_question_classifier()
+    assert "timezone" in classifier.classes
+    assert "timezone" in QuestionClassifier.load(path).classes
+
+
+def test_history_records_each_pair_once(tmp_path):
+    path = tmp_path / "history" / "questions.jsonl"
+    visa = ("Do you need a visa?", "sponsorship")
+    city = ("Which city do you live in?", "location")
+
+    assert question_classifier.record_history([visa, visa, city], path) == 2
+    assert question_classifier.record_history([city], path) == 0
+    assert question_classifier.load_history(path) == [visa, city]
@@ -0,0 +1,75 @@
+import pytest
+
+from src.core.result_store import ApplicationResult, ResultStore, parse_job_url
+
+
+def result(application_id, outcome, company="acme", phases=None, started_at=100.0):
+    return ApplicationResult(
+        application_id=application_id,
+        job_url=f"https://apply.workable.com/{company}/j/{application_id}/",
+        outcome=outcome,
+        started_at=started_at,
+        finished_at=started_at + 10,
+        company=company,
+        phase_durations=phases or {},
+    )
+
+
+@pytest.mark.parametrize(
+    "url, parsed",
+    [
+        ("https://apply.workable.com/acme/j/ABC123/", ("ABC123", "acme")),
+        ("https://apply.workable.com/acme/", (None, "acme")),
+        (
+            "https://jobs.workable.com/view/xyz/python-developer-at-detroit-labs",
+            ("xyz", "detroit labs"),
+        ),
+        ("https://example.com/jobs/1", (None, None)),
+    ],
+)
+def test_parse_job_url(url, parsed):
+    assert parse_job_url(url) == parsed
+
+
+def test_empty_store_has_no_rows(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    assert store.success_rate_by("company") == []
+    assert store.phase_percentiles() == []
+
+
+def test_success_rate_skips_dry_runs(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.record(result("a", "success"))
+    store.record(result("b", "failure"))
+    store.record(result("c", "dry_run"))
+    store.record(result("d", "success", company="other"))
+
+    rows = {row["name"]: row for row in store.success_rate_by("company")}
+    assert rows["acme"]["attempts"] == 2
+    assert rows["acme"]["success_rate"] == 0.5
+    assert rows["other"]["success_rate"] == 1.0
+
+    with pytest.raises(ValueError):
+        store.success_rate_by("error")
+
+
+def test_phase_percentiles(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    for i, seconds in enumerate([1.0, 2.0, 3.0, 4.0]):
+        store.record(result(f"r{i}", "success", phases={"fill": seconds, "open": 0.5}))
+    store.record(result("dry", "dry_run", phases={"fill": 100.0}))
+    store.record(result("old", "success", phases={"fill": 50.0}, started_at=1.0))
+
+    rows = {row["phase"]: row for row in store.phase_percentiles(since=50.0)}
+    assert rows["fill"] == {
+        "phase": "fill",
+        "count": 4,
+        "p50": 2.0,
+        "p95": 4.0,
+        "max": 4.0,
+    }
+    assert rows["open"]["count"] == 4
+    assert [row["phase"] for row in store.phase_percentiles(since=50.0)] == [
+        "fill",
+        "open",
+    ]
@@ -0,0 +1,37 @@
+from src.core.resume_manager import get_resume_manager
+
+PDF = b"%PDF-1.4\n"
+
+
+def write(path, data=PDF):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_each_profile_only_gets_its_own_resume(tmp_path):
+    alice = write(tmp_path / "alice.pdf")
+    alice_backend = write(tmp_path / "alice_backend_engineer.pdf")
+    bob = write(tmp_path / "bob_data_engineer.pdf")
+
+    alice_resumes = get_resume_manager("alice-test")
+    bob_resumes = get_resume_manager("bob-test")
+    assert get_resume_manager("alice-test") is alice_resumes
+    assert alice_resumes is not bob_resumes
+
+    title = "Data Engineer"
+    picked = alice_resumes.select(title, alice, [alice_backend])
+    assert picked.path.name == "alice_backend_engineer.pdf"
+    assert bob_resumes.select(title, bob).path.name == "bob_data_engineer.pdf"
+    # Bob's better-matching file, now cached, is never offered to Alice
+    assert alice_resumes.select(title, alice).path.name == "alice.pdf"
+    assert (
+        alice_resumes.select("Nurse", alice, [alice_backend]).path.name == "alice.pdf"
+    )
+
+
+def test_no_valid_resume_selects_nothing(tmp_path):
+    resumes = get_resume_manager("nobody-test")
+    assert resumes.select("Engineer") is None
+    assert (
+        resumes.select("Engineer", write(tmp_path / "fake.pdf", b"not a pdf")) is None
+    )
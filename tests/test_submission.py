@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+from tenacity import wait_none
+
+from src.core.application_manager import JobApplicationManager
+from src.core.form_handler import FormHandler, SubmissionUncertainError
+from src.utils.question_classifier import load_history
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, text="", content_type="application/json"):
+        self.status = status
+        self.headers = {"content-type": content_type} if content_type else {}
+        self._body = body
+        self._text = text
+
+    async def json(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self._body
+
+    async def text(self):
+        if isinstance(self._text, Exception):
+            raise self._text
+        return self._text
+
+
+class FakeButton:
+    def __init__(self, error=None):
+        self.error = error
+        self.clicks = 0
+
+    async def click(self):
+        self.clicks += 1
+        if self.error:
+            raise self.error
+
+
+class FakePage:
+    """Answers the application POST after a delay, or never."""
+
+    def __init__(self, response=None, delay=0):
+        self.response = response
+        self.delay = delay
+
+    async def wait_for_event(self, event, predicate=None, timeout=None):
+        if self.response is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        return self.response
+
+
+def form_handler(page=None):
+    handler = object.__new__(FormHandler)
+    handler.page = page or FakePage()
+    handler.captcha_handler = None
+    handler.submitted = False
+    handler.success_indicator = None
+    handler._unresolved_fields = set()
+    handler._filled_fields = set()
+    handler._classified_questions = {}
+    return handler
+
+
+@pytest.mark.parametrize(
+    "response, accepted",
+    [
+        (FakeResponse(200, {"id": "abc"}), True),
+        (FakeResponse(201, content_type=None, text="<html>Thanks</html>"), True),
+        (FakeResponse(200, ValueError("not JSON")), True),
+        (FakeResponse(200, {"errors": {"email": ["is invalid"]}}), False),
+        (FakeResponse(200, {"error": "Already applied"}), False),
+        (FakeResponse(422, {"errors": []}, text="Unprocessable"), False),
+        (FakeResponse(500, content_type="text/html", text="Server error"), False),
+    ],
+)
+def test_check_submission_response(run_async, response, accepted):
+    handler = form_handler()
+
+    assert run_async(handler._check_submission_response(response)) is accepted
+    assert handler.success_indicator == (
+        f"HTTP {response.status}" if accepted else None
+    )
+
+
+@pytest.mark.parametrize(
+    "page, expected",
+    [
+        (FakePage(FakeResponse(200)), 200),
+        # No response within SUBMIT_RESPONSE_TIMEOUT
+        (FakePage(FakeResponse(200), delay=1), None),
+        (FakePage(None), None),
+    ],
+)
+def test_click_submit_waits_for_the_response(run_async, monkeypatch, page, expected):
+    monkeypatch.setattr("src.config.settings.settings.SUBMIT_RESPONSE_TIMEOUT", 50)
+    handler = form_handler(page)
+    button = FakeButton()
+
+    response = run_async(handler._click_submit(button))
+    assert (response and response.status) == expected
+    assert button.clicks == 1
+    assert handler.submitted
+
+
+def test_failed_click_is_not_a_submission(run_async):
+    handler = form_handler()
+    with pytest.raises(RuntimeError):
+        run_async(handler._click_submit(FakeButton(RuntimeError("detached"))))
+    assert not handler.submitted
+
+
+@pytest.fixture
+def submit_button(monkeypatch):
+    button = FakeButton()
+
+    class Resolver:
+        async def resolve(self, page):
+            return button
+
+    monkeypatch.setattr("src.core.form_handler.SUBMIT_BUTTON", Resolver())
+    return button
+
+
+def test_uncertain_submission_is_not_retried(run_async, submit_button):
+    # Submitted, but the response cannot be read
+    page = FakePage(FakeResponse(500, content_type=None, text=OSError("closed")))
+    handler = form_handler(page)
+
+    with pytest.raises(SubmissionUncertainError):
+        run_async(handler.submit_form())
+    assert submit_button.clicks == 1
+    # Asking again never clicks a second time
+    assert run_async(handler.submit_form()) is False
+    assert submit_button.clicks == 1
+
+
+def test_rejected_submission_is_reported(run_async, submit_button):
+    handler = form_handler(FakePage(FakeResponse(422, {"errors": ["email"]})))
+
+    assert run_async(handler.submit_form()) is False
+    assert submit_button.clicks == 1
+
+
+def test_accepted_submission_records_classified_questions(
+    run_async, monkeypatch, tmp_path, submit_button
+):
+    history = tmp_path / "history.jsonl"
+    monkeypatch.setattr("src.config.settings.settings.QUESTION_HISTORY_PATH", history)
+    handler = form_handler(FakePage(FakeResponse(200, {"id": "abc"})))
+    handler._classified_questions = {
+        "visa": ("Do you need a visa?", "sponsorship"),
+        "city": ("Which city do you live in?", "location"),
+    }
+    # The city field could not be filled
+    handler._filled_fields = {"visa"}
+
+    assert run_async(handler.submit_form()) is True
+    assert load_history(history) == [("Do you need a visa?", "sponsorship")]
+
+
+def test_rejected_submission_records_nothing(
+    run_async, monkeypatch, tmp_path, submit_button
+):
+    history = tmp_path / "history.jsonl"
+    monkeypatch.setattr("src.config.settings.settings.QUESTION_HISTORY_PATH", history)
+    handler = form_handler(FakePage(FakeResponse(422, {"errors": ["visa"]})))
+    handler._classified_questions = {"visa": ("Do you need a visa?", "sponsorship")}
+    handler._filled_fields = {"visa"}
+
+    assert run_async(handler.submit_form()) is False
+    assert not history.exists()
+
+
+def attempts_until(run_async, monkeypatch, error):
+    monkeypatch.setattr(
+        JobApplicationManager._attempt_application.retry, "wait", wait_none()
+    )
+    calls = []
+
+    async def load_metadata(self):
+        calls.append(True)
+        raise error
+
+    monkeypatch.setattr(JobApplicationManager, "load_metadata", load_metadata)
+    manager = JobApplicationManager("https://apply.workable.com/acme/j/A/", "x.json")
+    with pytest.raises(type(error)):
+        run_async(manager._attempt_application())
+    return len(calls)
+
+
+def test_application_is_not_retried_after_an_uncertain_submission(
+    run_async, monkeypatch
+):
+    assert attempts_until(run_async, monkeypatch, SubmissionUncertainError("?")) == 1
+
+
+def test_application_is_retried_after_other_errors(run_async, monkeypatch):
+    assert attempts_until(run_async, monkeypatch, RuntimeError("navigation")) == 3